@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from seeder import (IdTable, article_rows, derive_seed, encode_rows, generate_in_pool, generate_prices, shard_args,
+                    user_rows)
+
+def int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+def shards_for(endpoint: str, users: int, articles: int, batch_size: int, seed: int):
+    """(builder, shards) d'une entité, avec les mêmes graines que seeder.py"""
+    if endpoint == "users":
+        ids = IdTable(users, derive_seed(seed, "user-ids"))
+        return user_rows, list(shard_args(ids, batch_size, derive_seed(seed, "users")))
+    ids = IdTable(articles, derive_seed(seed, "article-ids"))
+    prices = generate_prices(articles, derive_seed(seed, "prices"))
+    return article_rows, list(shard_args(ids, batch_size, derive_seed(seed, "articles"), prices))
+
+async def run(endpoint: str, workers: int, builder, shards, wire_format: str) -> dict:
+    """Génération + encodage de tous les shards ; workers=0 : dans le process principal.
+
+    `parent_cpu_s` est le temps CPU du process principal (lancement du pool, pickling des shards,
+    dépickling des Payload) : c'est la part sérielle, qui borne l'accélération à wall(0) / parent_cpu_s.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    rows = 0
+    began, cpu = time.perf_counter(), time.process_time()
+    if workers == 0:
+        for args in shards:
+            payload = encode_rows(endpoint, wire_format, builder, *args)
+            rows += payload.rows
+            digest.update(payload.body)
+    else:
+        with ProcessPoolExecutor(workers, mp_context=get_context("spawn")) as pool:
+            async for payload in generate_in_pool(pool, endpoint, builder, iter(shards), 2 * workers, wire_format):
+                rows += payload.rows
+                digest.update(payload.body)
+    wall = time.perf_counter() - began
+    return {"entity": endpoint, "workers": workers, "rows": rows, "wall_s": round(wall, 3),
+            "rows_per_s": round(rows / wall), "parent_cpu_s": round(time.process_time() - cpu, 3),
+            "digest": digest.hexdigest()}
+
+async def main():
+    parser = argparse.ArgumentParser(description="Génération Faker articles/users : GEN_WORKERS=0 contre N process")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--articles", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int_list, default=[0, 1, 2, 4])
+    parser.add_argument("--wire-format", default="json", choices=["json", "ndjson", "columnar"])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Fichier JSON des résultats")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cœurs | {args.users} users, {args.articles} articles | batch {args.batch_size} | "
+          f"{args.wire_format}")
+    results = []
+    for endpoint in ("articles", "users"):
+        builder, shards = shards_for(endpoint, args.users, args.articles, args.batch_size, args.seed)
+        baseline = None
+        for workers in args.workers:
+            result = await run(endpoint, workers, builder, shards, args.wire_format)
+            baseline = baseline or result
+            result["speedup"] = round(baseline["wall_s"] / result["wall_s"], 2)
+            # Accélération maximale avec assez de cœurs : tout sauf la part sérielle du parent est parallèle
+            result["max_speedup"] = round(baseline["wall_s"] / result["parent_cpu_s"], 1) if workers else 1.0
+            results.append(result)
+            same = "identique" if result["digest"] == baseline["digest"] else "DIFFÉRENT"
+            print(f"{endpoint:<9} workers={workers:<2} {result['wall_s']:>7.2f}s {result['rows_per_s']:>9,} rows/s "
+                  f"x{result['speedup']:<5} parent CPU {result['parent_cpu_s']:.2f}s "
+                  f"(borne x{result['max_speedup']}) | sortie {same}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "cpu_count": os.cpu_count(), "results": results}, f, indent=2)
+        print(f"\nRésultats: {args.output}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
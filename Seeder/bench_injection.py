@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+import aiohttp
+import csv
+import json
+import os
+import subprocess
+import time
+from itertools import product
+
+from seeder import IdTable, build_pipelines, derive_seed, generate_prices, percentile, post_stream
+
+FIELDS = [
+    "label", "mode", "users", "articles", "orders", "batch_size", "concurrency", "target", "entity",
+    "rows", "batches", "failed_rows", "retries", "wall_s", "rows_per_s",
+    "p50_ms", "p95_ms", "p99_ms", "server_p50_ms", "server_p95_ms", "server_p99_ms",
+    "server_share", "neo4j_retries", "neo4j_deadlocks",
+]
+
+def int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+def git_label() -> str:
+    """Commit courant, pour comparer les résultats d'un commit à l'autre"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def summarize(stats, **run) -> dict:
+    """Une ligne de résultats par entité : débit, latences client et temps d'import serveur.
+
+    `server_share` = temps base de données / latence client cumulée : le reste est du réseau,
+    de la (dé)sérialisation et de l'attente côté serveur.
+    """
+    client_ms = [latency * 1000 for latency in stats.latencies]
+    return {
+        **run,
+        "entity": stats.endpoint,
+        "rows": stats.rows,
+        "batches": stats.batches,
+        "failed_rows": stats.failed_rows,
+        "retries": stats.retries,
+        "wall_s": round(stats.elapsed, 3),
+        "rows_per_s": round(stats.rows_per_second),
+        "p50_ms": round(percentile(client_ms, 50), 1),
+        "p95_ms": round(percentile(client_ms, 95), 1),
+        "p99_ms": round(percentile(client_ms, 99), 1),
+        "server_p50_ms": round(percentile(stats.server_ms, 50), 1),
+        "server_p95_ms": round(percentile(stats.server_ms, 95), 1),
+        "server_p99_ms": round(percentile(stats.server_ms, 99), 1),
+        "server_share": round(sum(stats.server_ms) / sum(client_ms), 3) if client_ms else 0.0,
+        "neo4j_retries": stats.neo4j_retries,
+        "neo4j_deadlocks": stats.neo4j_deadlocks,
+    }
+
+async def run_once(session, users: int, articles: int, orders: int, batch_size: int, concurrency: int,
+                   target: str, entities: set[str], seed: int, wire_format: str, label: str) -> list[dict]:
+    """Injecte un jeu de données complet vers une seule base.
+
+    Chaque combinaison a sa propre graine : les ids ne rentrent pas en conflit avec les runs précédents.
+    Les entités hors `entities` sont quand même injectées (clés étrangères) mais pas rapportées.
+    """
+    run_seed = derive_seed(seed, f"{users}-{batch_size}-{concurrency}-{target}")
+    article_ids = IdTable(articles, derive_seed(run_seed, "article-ids"))
+    prices = generate_prices(articles, derive_seed(run_seed, "prices"))
+    user_ids = IdTable(users, derive_seed(run_seed, "user-ids"))
+    run = {"label": label, "mode": "api", "users": users, "articles": articles, "orders": orders,
+           "batch_size": batch_size, "concurrency": concurrency, "target": target}
+
+    results = []
+    for endpoint, batches in build_pipelines(article_ids, prices, user_ids, orders, batch_size, run_seed,
+                                             wire_format=wire_format):
+        stats = await post_stream(session, endpoint, batches(), target, concurrency)
+        if endpoint in entities:
+            results.append(summarize(stats, **run))
+    return results
+
+def write_results(path: str, results: list[dict], meta: dict):
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(path, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"\nRésultats: {path}")
+
+def compare(before_path: str, after_path: str):
+    """Débit de deux runs JSON (ex. sans-index / avec-index), pour chaque configuration présente dans les deux"""
+    def load(path):
+        with open(path) as f:
+            return {(r["users"], r["batch_size"], r["concurrency"], r["target"], r["entity"]): r
+                    for r in json.load(f)["results"]}
+    before, after = load(before_path), load(after_path)
+    print(f"{'users':>8} {'batch':>6} {'conc':>4} {'cible':<8} {'entité':<13} {'avant':>10} {'après':>10} {'gain':>6}")
+    for key in sorted(before.keys() & after.keys(), key=str):
+        old, new = before[key]["rows_per_s"], after[key]["rows_per_s"]
+        print(f"{key[0]:>8} {key[1]:>6} {key[2]:>4} {key[3]:<8} {key[4]:<13} {old:>10,} {new:>10,} "
+              f"{f'x{new / old:.2f}' if old else '-':>6}")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark d'injection Postgres vs Neo4j (taille × batch × concurrence)")
+    parser.add_argument("--users", type=int_list, default=[10_000], help="Tailles de jeu de données, ex. 10000,100000")
+    parser.add_argument("--articles-per-user", type=float, default=0.1)
+    parser.add_argument("--orders-per-user", type=float, default=5)
+    parser.add_argument("--batch-sizes", type=int_list, default=[1000, 5000])
+    parser.add_argument("--concurrency", type=int_list, default=[1, 8])
+    parser.add_argument("--targets", default="Postgres,Neo4j")
+    parser.add_argument("--entities", default="articles,users,social-graph,orders")
+    parser.add_argument("--wire-format", default="json")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default=None, help="Libellé du run (défaut: commit git courant)")
+    parser.add_argument("--output", default=None, help="Fichier .json ou .csv (défaut: bench_injection-<label>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("AVANT", "APRÈS"), default=None,
+                        help="Compare le débit de deux fichiers de résultats JSON au lieu de lancer un run")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    label = args.label or git_label()
+    output = args.output or f"bench_injection-{label}.json"
+    targets = [t for t in args.targets.split(",") if t]
+    entities = set(args.entities.split(","))
+    meta = {"label": label, "server": os.getenv("SERVER_URL", "http://localhost:3001"),
+            "wire_format": args.wire_format, "seed": args.seed, "started_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+    results = []
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=30)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=None)) as session:
+        for users, batch_size, concurrency, target in product(args.users, args.batch_sizes, args.concurrency, targets):
+            articles = max(1, int(users * args.articles_per_user))
+            orders = int(users * args.orders_per_user)
+            print(f"\n=== {users} users / {articles} articles / {orders} orders, "
+                  f"batch={batch_size}, concurrency={concurrency} → {target}")
+            results += await run_once(session, users, articles, orders, batch_size, concurrency, target,
+                                      entities, args.seed, args.wire_format, label)
+
+    print(f"\n{'users':>8} {'batch':>6} {'conc':>4} {'cible':<8} {'entité':<13} {'rows/s':>10} "
+          f"{'p50':>8} {'p95':>8} {'p99':>8} {'srv p50':>8} {'srv %':>6} {'rejeux':>6} {'deadl.':>6}")
+    for r in results:
+        print(f"{r['users']:>8} {r['batch_size']:>6} {r['concurrency']:>4} {r['target']:<8} {r['entity']:<13} "
+              f"{r['rows_per_s']:>10,} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+              f"{r['server_p50_ms']:>8.1f} {r['server_share']:>6.0%} {r['neo4j_retries']:>6} {r['neo4j_deadlocks']:>6}")
+    write_results(output, results, meta)
+
+if __name__ == "__main__":
+    asyncio.run(main())
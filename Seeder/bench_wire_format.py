@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import aiohttp
+import os
+import time
+
+from seeder import IdTable, Payload, WIRE_FORMATS, build_pipelines, derive_seed, encode_batch, generate_prices, post_stream
+
+ENTITIES = ["articles", "users", "social-graph", "orders"]  # Ordre de dépendance
+
+def entity_batches(endpoint: str, wire_format: str, users: int, articles: int, orders: int, batch_size: int, seed: int):
+    """Mêmes pipelines que le seeder, pour une entité et un format fil"""
+    article_ids = IdTable(articles, derive_seed(seed, "article-ids"))
+    prices = generate_prices(articles, derive_seed(seed, "prices"))
+    user_ids = IdTable(users, derive_seed(seed, "user-ids"))
+    pipelines = dict(build_pipelines(article_ids, prices, user_ids, orders, batch_size, seed, wire_format=wire_format))
+    return pipelines[endpoint]()
+
+def bench_encoding(endpoint: str, wire_format: str, args) -> dict:
+    """Temps de génération + encodage côté client, et volume envoyé sur le fil"""
+    rows = size = 0
+    start = time.perf_counter()
+    for batch in entity_batches(endpoint, wire_format, args.users, args.articles, args.orders, args.batch_size, args.seed):
+        if not isinstance(batch, Payload):
+            # aiohttp encode avec json.dumps au moment du POST : on le compte ici
+            batch = encode_batch(endpoint, batch, "json")
+        rows += batch.rows
+        size += len(batch.body)
+    elapsed = time.perf_counter() - start
+    return {"rows": rows, "bytes": size, "elapsed": elapsed}
+
+async def bench_upload(wire_format: str, args) -> dict[str, float]:
+    """Débit de bout en bout (génération + encodage + HTTP + décodage serveur + insertion).
+
+    Chaque format insère son propre jeu de données complet (graine dérivée du format),
+    dans l'ordre de dépendance, pour ne pas entrer en conflit avec les autres formats.
+    """
+    seed = derive_seed(args.seed, wire_format)
+    results = {}
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=100, limit_per_host=30)) as session:
+        for endpoint in ENTITIES:
+            batches = entity_batches(endpoint, wire_format, args.users, args.articles, args.orders, args.batch_size, seed)
+            stats = await post_stream(session, endpoint, batches, args.targets, args.concurrency)
+            results[endpoint] = stats.rows_per_second
+    return results
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare JSON / NDJSON / colonnaire sur les endpoints DataSeeder")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--articles", type=int, default=10_000)
+    parser.add_argument("--orders", type=int, default=500_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--entities", default="users,social-graph,orders")
+    parser.add_argument("--formats", default=",".join(WIRE_FORMATS))
+    parser.add_argument("--upload", action="store_true",
+                        help="POST réellement vers SERVER_URL (insère un jeu complet par format)")
+    parser.add_argument("--targets", default="Postgres")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    formats = args.formats.split(",")
+
+    print(f"{'entité':<13} {'format':<9} {'rows':>10} {'Mo':>9} {'octets/row':>11} {'encodage s':>11} {'rows/s':>12}")
+    for endpoint in args.entities.split(","):
+        for wire_format in formats:
+            result = bench_encoding(endpoint, wire_format, args)
+            print(f"{endpoint:<13} {wire_format:<9} {result['rows']:>10} {result['bytes'] / 1e6:>9.1f} "
+                  f"{result['bytes'] / max(result['rows'], 1):>11.1f} {result['elapsed']:>11.2f} "
+                  f"{result['rows'] / result['elapsed']:>12,.0f}")
+
+    if args.upload:
+        uploads = {wire_format: await bench_upload(wire_format, args) for wire_format in formats}
+        print(f"\nUpload → {args.targets} (rows/s)")
+        print(f"{'entité':<13} " + " ".join(f"{wire_format:>12}" for wire_format in formats))
+        for endpoint in ENTITIES:
+            print(f"{endpoint:<13} " + " ".join(f"{uploads[wire_format][endpoint]:>12,.0f}" for wire_format in formats))
+
+if __name__ == "__main__":
+    print(f"Serveur: {os.getenv('SERVER_URL', 'http://localhost:3001')}")
+    asyncio.run(main())
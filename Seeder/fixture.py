@@ -0,0 +1,256 @@
+import argparse
+import asyncio
+import aiohttp
+import json
+import os
+from dataclasses import asdict, dataclass
+from uuid import NAMESPACE_DNS, uuid5
+
+from seeder import post_stream
+
+@dataclass(frozen=True)
+class FixtureSpec:
+    """Jeu de données déterministe en cercles k-aires, à réponses attendues calculables.
+
+    `communities` arbres disjoints de profondeur `depth` : l'utilisateur (c, niveau, i) suit
+    ses `fanout` enfants (c, niveau + 1, i * fanout + j). Avec `cycles`, chacun suit aussi son
+    parent et les feuilles suivent la racine (cycles courts et longs entre niveaux).
+
+    Achats : chaque utilisateur de niveau ℓ achète le produit « Niveau ℓ » (quantité 1 + i % 3),
+    un utilisateur sur `viral_every` de chaque niveau achète aussi le produit « Viral ».
+    `unsold` produits ne sont jamais achetés.
+    """
+    communities: int = 10
+    fanout: int = 3
+    depth: int = 4
+    cycles: bool = True
+    viral_every: int = 2
+    unsold: int = 3
+    name: str = "fixture"
+
+    def level_size(self, level: int) -> int:
+        return self.fanout ** level
+
+    @property
+    def community_size(self) -> int:
+        return sum(self.level_size(level) for level in range(self.depth + 1))
+
+    @property
+    def user_count(self) -> int:
+        return self.communities * self.community_size
+
+    @property
+    def product_count(self) -> int:
+        return 1 + (self.depth + 1) + self.unsold
+
+    def viral_buyers(self, size: int) -> int:
+        """Acheteurs du produit viral parmi `size` utilisateurs d'un niveau (i % viral_every == 0)"""
+        return -(-size // self.viral_every)
+
+def fixture_id(spec: FixtureSpec, kind: str, *parts) -> str:
+    return str(uuid5(NAMESPACE_DNS, "-".join(map(str, (spec.name, kind, *parts)))))
+
+def user_id(spec: FixtureSpec, community: int, level: int, index: int) -> str:
+    return fixture_id(spec, "user", community, level, index)
+
+def product_name(spec: FixtureSpec, product: int) -> str:
+    """0 : Viral, 1..depth+1 : produit du niveau product-1, puis les invendus"""
+    if product == 0:
+        return "Viral"
+    if product <= spec.depth + 1:
+        return f"Niveau {product - 1}"
+    return f"Invendu {product - spec.depth - 1}"
+
+def product_price(product: int) -> float:
+    return 10.0 + product
+
+def batched(rows, size: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# --- GÉNÉRATION (flux de lignes, mémoire bornée par la taille d'un niveau) ---
+
+def generate_articles(spec: FixtureSpec):
+    for product in range(spec.product_count):
+        yield {"id": fixture_id(spec, "product", product), "name": product_name(spec, product),
+               "price": product_price(product)}
+
+def generate_users(spec: FixtureSpec):
+    for community in range(spec.communities):
+        for level in range(spec.depth + 1):
+            for index in range(spec.level_size(level)):
+                name = f"{spec.name}_c{community}_l{level}_{index}"
+                yield {"id": user_id(spec, community, level, index), "userName": name,
+                       "email": f"{name}@example.com"}
+
+def generate_follows(spec: FixtureSpec):
+    for community in range(spec.communities):
+        root = user_id(spec, community, 0, 0)
+        parents = [root]
+        for level in range(1, spec.depth + 1):
+            children = [user_id(spec, community, level, index) for index in range(spec.level_size(level))]
+            for index, child in enumerate(children):
+                parent = parents[index // spec.fanout]
+                yield {"followerId": parent, "followingId": child}
+                if spec.cycles:
+                    yield {"followerId": child, "followingId": parent}
+                    if level == spec.depth and level >= 2:
+                        yield {"followerId": child, "followingId": root}
+            parents = children
+
+def generate_orders(spec: FixtureSpec):
+    for community in range(spec.communities):
+        for level in range(spec.depth + 1):
+            for index in range(spec.level_size(level)):
+                buyer = user_id(spec, community, level, index)
+                purchases = [(level + 1, 1 + index % 3)]
+                if index % spec.viral_every == 0:
+                    purchases.append((0, 1))
+                for product, quantity in purchases:
+                    yield {"id": fixture_id(spec, "order", community, level, index, product), "userId": buyer,
+                           "articleId": fixture_id(spec, "product", product), "quantity": quantity,
+                           "totalPrice": round(quantity * product_price(product), 2)}
+
+# --- RÉPONSES ATTENDUES (formules fermées, pour la racine de chaque communauté) ---
+
+def circle_buyers(spec: FixtureSpec, level: int) -> dict[int, list[int]]:
+    """Acheteurs distincts par produit et par niveau le plus proche, dans le cercle de niveau `level` d'une racine.
+
+    Niveaux 1..min(level, depth) : l'arbre sous la racine. Avec les cycles, la racine elle-même est
+    atteinte au niveau 2 (un enfant la suit) ; rien d'autre n'est nouveau au-delà.
+    """
+    buyers = {product: [0] * level for product in range(spec.product_count)}
+    for depth in range(1, min(level, spec.depth) + 1):
+        size = spec.level_size(depth)
+        buyers[depth + 1][depth - 1] += size
+        buyers[0][depth - 1] += spec.viral_buyers(size)
+    if spec.cycles and level >= 2:
+        buyers[1][1] += 1
+        buyers[0][1] += 1
+    return buyers
+
+def circle_size(spec: FixtureSpec, level: int) -> int:
+    tree = sum(spec.level_size(depth) for depth in range(1, min(level, spec.depth) + 1))
+    return tree + (1 if spec.cycles and level >= 2 else 0)
+
+def total_buyers(spec: FixtureSpec, product: int) -> int:
+    """Acheteurs distincts du produit sur toutes les communautés (Article.buyers / ArticleBuyerStats)"""
+    if product == 0:
+        per_community = sum(spec.viral_buyers(spec.level_size(level)) for level in range(spec.depth + 1))
+    elif product <= spec.depth + 1:
+        per_community = spec.level_size(product - 1)
+    else:
+        per_community = 0
+    return spec.communities * per_community
+
+def expected_answers(spec: FixtureSpec, levels: list[int], top: int, roots: int) -> dict:
+    """Requêtes QueryBuilder / analytics et leurs réponses, pour les racines des `roots` premières communautés"""
+    leaves = spec.level_size(spec.depth)
+    follows_per_community = (spec.community_size - 1) * (2 if spec.cycles else 1)
+    if spec.cycles and spec.depth >= 2:
+        follows_per_community += leaves
+    orders_per_community = spec.community_size + sum(
+        spec.viral_buyers(spec.level_size(level)) for level in range(spec.depth + 1))
+
+    queries = [{"name": "users", "request": {"entity": "Users", "pageSize": 1},
+                "expected": {"totalCount": spec.user_count}},
+               {"name": "orders", "request": {"entity": "Orders", "pageSize": 1},
+                "expected": {"totalCount": spec.communities * orders_per_community}}]
+    # Followers de la racine : ses enfants (cycles) et les feuilles (cycle long)
+    root_followers = (spec.fanout if spec.cycles else 0) + (leaves if spec.cycles and spec.depth >= 2 else 0)
+    queries.append({"name": "root-followers",
+                    "request": {"entity": "Users", "pageSize": 1, "filters": [
+                        {"fieldId": 0, "operator": "Equals", "value": user_id(spec, 0, 0, 0)}]},
+                    "expected": {"totalCount": 1, "followersCount": root_followers}})
+
+    for community in range(min(roots, spec.communities)):
+        root = user_id(spec, community, 0, 0)
+        for level in levels:
+            buyers = circle_buyers(spec, level)
+            bought = [product for product, per_level in buyers.items() if sum(per_level)]
+            circle = {"userId": root, "followingLevel": level, "pageSize": 1}
+            queries += [
+                {"name": f"c{community}-users-l{level}", "request": {"entity": "Users", **circle},
+                 "expected": {"totalCount": circle_size(spec, level)}},
+                {"name": f"c{community}-articles-l{level}", "request": {"entity": "Articles", **circle},
+                 "expected": {"totalCount": len(bought)}},
+                {"name": f"c{community}-orders-l{level}", "request": {"entity": "Orders", **circle},
+                 "expected": {"totalCount": sum(sum(per_level) for per_level in buyers.values())}},
+            ]
+            for product in (0, 1, min(level, spec.depth) + 1):
+                queries.append({
+                    "name": f"c{community}-buyers-p{product}-l{level}",
+                    "request": {"entity": "Orders", **circle, "filters": [
+                        {"fieldId": 2, "operator": "Equals", "value": fixture_id(spec, "product", product)}]},
+                    "expected": {"totalCount": sum(buyers[product])}})
+
+            ranking = sorted(
+                ({"articleId": fixture_id(spec, "product", product), "name": product_name(spec, product),
+                  "buyers": sum(buyers[product]), "buyersByLevel": buyers[product],
+                  "totalBuyers": total_buyers(spec, product)} for product in bought),
+                key=lambda item: (-item["buyers"], item["articleId"]))
+            queries.append({"name": f"c{community}-viral-l{level}", "analytics": "viral-products",
+                            "params": {"userId": root, "level": level, "top": top},
+                            "expected": {"circleSize": circle_size(spec, level), "items": ranking[:top]}})
+
+    return {
+        "spec": asdict(spec),
+        "counts": {"users": spec.user_count, "articles": spec.product_count,
+                   "follows": spec.communities * follows_per_community,
+                   "orders": spec.communities * orders_per_community},
+        "queries": queries,
+    }
+
+async def upload(spec: FixtureSpec, targets: str, batch_size: int, concurrency: int):
+    """Import par l'API DataSeeder, batch par batch (Articles → Users → Social graph → Orders)"""
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=30)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=None)) as session:
+        for endpoint, rows in (("articles", generate_articles(spec)), ("users", generate_users(spec)),
+                               ("social-graph", generate_follows(spec)), ("orders", generate_orders(spec))):
+            stats = await post_stream(session, endpoint, batched(rows, batch_size), targets, concurrency)
+            if stats.failed_rows:
+                raise RuntimeError(f"{endpoint}: {stats.failed_rows} lignes en échec")
+
+def int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+def main():
+    parser = argparse.ArgumentParser(description="Fixture déterministe en cercles k-aires + réponses attendues")
+    parser.add_argument("--communities", type=int, default=10)
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--no-cycles", action="store_true", help="Arbres seuls, sans arêtes enfant → parent / feuille → racine")
+    parser.add_argument("--viral-every", type=int, default=2)
+    parser.add_argument("--unsold", type=int, default=3)
+    parser.add_argument("--name", default="fixture", help="Préfixe des ids : deux fixtures de noms différents ne se chevauchent pas")
+    parser.add_argument("--levels", type=int_list, default=None, help="Niveaux à vérifier (défaut: 1..depth+1)")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--roots", type=int, default=3, help="Communautés dont la racine sert de point de départ")
+    parser.add_argument("--expected", default="fixture_expected.json", help="Fichier des réponses attendues")
+    parser.add_argument("--upload", action="store_true", help="Importe aussi la fixture par l'API DataSeeder")
+    parser.add_argument("--targets", default="Both")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    spec = FixtureSpec(args.communities, args.fanout, args.depth, not args.no_cycles, args.viral_every,
+                       args.unsold, args.name)
+    expected = expected_answers(spec, args.levels or list(range(1, spec.depth + 2)), args.top, args.roots)
+    with open(args.expected, "w") as f:
+        json.dump(expected, f, indent=2)
+    counts = expected["counts"]
+    print(f"Fixture {spec.name}: {counts['users']} users, {counts['articles']} produits, {counts['follows']} follows, "
+          f"{counts['orders']} orders → {len(expected['queries'])} réponses attendues dans {args.expected}")
+
+    if args.upload:
+        print(f"Import vers {args.targets} ({os.getenv('SERVER_URL', 'http://localhost:3001')})")
+        asyncio.run(upload(spec, args.targets, args.batch_size, args.concurrency))
+
+if __name__ == "__main__":
+    main()
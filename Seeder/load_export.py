@@ -0,0 +1,136 @@
+import argparse
+import json
+import os
+import subprocess
+import time
+import urllib.request
+
+from bench_injection import git_label, write_results
+
+# (table, fichier, colonnes) dans l'ordre des clés étrangères
+PG_TABLES = [
+    ("Articles", "articles", ["Id", "Name", "Price"]),
+    ("Users", "users", ["Id", "Name", "Email", "FollowersCount", "FollowingCount"]),
+    ("UserFollows", "follows", ["FollowerId", "FollowingId"]),
+    ("Orders", "orders", ["Id", "UserId", "ArticleId", "Quantity"]),
+    ("UserPurchases", "user_purchases", ["UserId", "ArticleId"]),
+    ("ArticleBuyerStats", "article_buyer_stats", ["ArticleId", "Buyers"]),
+]
+
+NEO4J_NODES = [("User", "users"), ("Article", "neo4j_articles")]
+NEO4J_RELATIONSHIPS = [("FOLLOWS", "follows"), ("BOUGHT", "neo4j_bought")]
+
+def compose(*args, **kwargs) -> subprocess.CompletedProcess:
+    return subprocess.run(["docker", "compose", *args], check=True, **kwargs)
+
+def psql(*args, stdin=None):
+    """psql dans le conteneur postgres-db, avec l'utilisateur et la base du conteneur"""
+    compose("exec", "-T", "postgres-db", "sh", "-c",
+            'exec psql -q -v ON_ERROR_STOP=1 -U "$POSTGRES_USER" -d "$POSTGRES_DB" "$@"', "psql", *args, stdin=stdin)
+
+def count_lines(path: str) -> int:
+    with open(path, "rb") as f:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+
+def server_call(method: str, path: str):
+    url = f"{os.getenv('SERVER_URL', 'http://localhost:3001')}{path}"
+    with urllib.request.urlopen(urllib.request.Request(url, method=method), timeout=600) as resp:
+        return resp.status
+
+def load_postgres(export_dir: str) -> list[dict]:
+    """Vide les tables puis COPY de chaque fichier (contrôles de clés étrangères désactivés pendant la copie)"""
+    tables = ", ".join(f'"{table}"' for table, _, _ in PG_TABLES)
+    psql("-c", f"TRUNCATE {tables}")
+
+    results = []
+    for table, name, columns in PG_TABLES:
+        path = os.path.join(export_dir, f"{name}.csv")
+        column_list = ", ".join(f'"{c}"' for c in columns)
+        start = time.perf_counter()
+        with open(path, "rb") as f:
+            psql("-c", "SET session_replication_role = replica",
+                 "-c", f'COPY "{table}" ({column_list}) FROM STDIN WITH (FORMAT csv)', stdin=f)
+        elapsed = time.perf_counter() - start
+        results.append({"entity": table, "rows": count_lines(path), "wall_s": elapsed})
+        print(f"COPY {table:<18} {results[-1]['rows']:>10} lignes en {elapsed:.2f}s")
+
+    start = time.perf_counter()
+    psql("-c", "ANALYZE")
+    print(f"ANALYZE en {time.perf_counter() - start:.2f}s")
+    return results
+
+def wait_healthy(container: str, timeout: float = 300):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = subprocess.run(["docker", "inspect", "-f", "{{.State.Health.Status}}", container],
+                                capture_output=True, text=True).stdout.strip()
+        if status == "healthy":
+            return
+        time.sleep(2)
+    raise TimeoutError(f"{container} n'est pas healthy après {timeout:.0f}s")
+
+def load_neo4j(export_dir: str) -> list[dict]:
+    """neo4j-admin database import full : base arrêtée, remplacée par les fichiers, puis schéma recréé par le serveur"""
+    mount = f"{os.path.abspath(export_dir)}:/import:ro"
+    files = lambda name: f"/import/{name}_header.csv,/import/{name}.csv"
+    command = ["neo4j-admin", "database", "import", "full", "--overwrite-destination=true"]
+    command += [f"--nodes={label}={files(name)}" for label, name in NEO4J_NODES]
+    command += [f"--relationships={kind}={files(name)}" for kind, name in NEO4J_RELATIONSHIPS]
+    command.append("neo4j")
+
+    results = []
+    compose("stop", "neo4j")
+    start = time.perf_counter()
+    compose("run", "--rm", "--no-deps", "-T", "-v", mount, "neo4j", *command)
+    elapsed = time.perf_counter() - start
+    rows = sum(count_lines(os.path.join(export_dir, f"{name}.csv")) for _, name in NEO4J_NODES + NEO4J_RELATIONSHIPS)
+    results.append({"entity": "import", "rows": rows, "wall_s": elapsed})
+    print(f"neo4j-admin import: {rows} nœuds + relations en {elapsed:.2f}s")
+
+    # Redémarrage, puis contraintes / index (attendus ONLINE par le serveur) : comptés à part
+    start = time.perf_counter()
+    compose("start", "neo4j")
+    wait_healthy("tpnosql_neo4j")
+    server_call("POST", "/api/DataSeeder/schema")
+    elapsed = time.perf_counter() - start
+    results.append({"entity": "restart+schema", "rows": rows, "wall_s": elapsed})
+    print(f"Redémarrage + schéma en {elapsed:.2f}s")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Charge un export du seeder (UPLOAD_MODE=export) avec COPY et neo4j-admin import")
+    parser.add_argument("--dir", default="export", help="Dossier de l'export (EXPORT_DIR)")
+    parser.add_argument("--targets", default="Postgres,Neo4j")
+    parser.add_argument("--label", default=None, help="Libellé du run (défaut: commit git courant)")
+    parser.add_argument("--output", default=None, help="Résultats .json ou .csv, au format de bench_injection.py")
+    args = parser.parse_args()
+
+    with open(os.path.join(args.dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    counts = manifest["counts"]
+    targets = [t for t in args.targets.split(",") if t]
+    label = args.label or git_label()
+    print(f"Export {args.dir}: {counts['users']} users, {counts['articles']} articles, "
+          f"{counts['orders']} orders, {counts['follows']} follows (seed={manifest['seed']})")
+
+    results = []
+    run = {"label": label, "mode": "native", "users": counts["users"], "articles": counts["articles"],
+           "orders": counts["orders"], "batch_size": "", "concurrency": 1, "batches": 1}
+    for target in targets:
+        print(f"\n=== {target}")
+        loaded = load_postgres(args.dir) if target == "Postgres" else load_neo4j(args.dir)
+        for row in loaded:
+            results.append({**run, **row, "target": target, "wall_s": round(row["wall_s"], 3),
+                            "rows_per_s": round(row["rows"] / row["wall_s"]) if row["wall_s"] else 0})
+
+    # Les cercles en cache côté serveur ne correspondent plus aux bases rechargées
+    server_call("DELETE", "/api/querybuilder/circle-cache")
+
+    total = {target: sum(r["wall_s"] for r in results if r["target"] == target) for target in targets}
+    print("\n" + ", ".join(f"{target}: {seconds:.2f}s" for target, seconds in total.items()))
+    if args.output:
+        write_results(args.output, results, {"label": label, "mode": "native", "manifest": manifest,
+                                             "started_at": time.strftime("%Y-%m-%dT%H:%M:%S")})
+
+if __name__ == "__main__":
+    main()
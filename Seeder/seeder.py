@@ -1,20 +1,104 @@
 import asyncio
 import aiohttp
+import csv
 import json
+import numpy as np
 import os
 import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from faker import Faker
 from faker_commerce import Provider
+from itertools import islice
+from multiprocessing import get_context
 import signal
+import struct
 import sys
-from uuid import uuid4
+import time
+import zlib
 
 fake = Faker('fr_FR')
 fake.add_provider(Provider)
 
+MAX_FOLLOWERS = 20          # Spec : 0 à 20 followers directs par utilisateur
+GRAPH_CHUNK_SIZE = 100_000  # Utilisateurs suivis traités par tranche numpy
+MAX_PRODUCTS_PER_USER = 5   # Spec : chaque utilisateur commande 0 à 5 produits
+
+BATCH_TIMEOUT = aiohttp.ClientTimeout(total=120)  # Timeout par batch en mode stream
+RETRY_BASE_DELAY = 0.5                            # Backoff : 0.5s, 1s, 2s, 4s... (+ jitter)
+
+# Formats fil acceptés par /api/DataSeeder/* (choisis par Content-Type, JSON par défaut)
+WIRE_FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "columnar": "application/vnd.nosqlproject.columnar",
+}
+COLUMNAR_ENTITIES = {"articles": 0, "users": 1, "orders": 2, "social-graph": 3}
+
+# Jitter des retries isolé du `random` global pour ne pas décaler les données seedées
+_retry_random = random.Random()
+
+@dataclass
+class UploadStats:
+    """Bilan d'upload d'une entité vers une cible (Postgres/Neo4j/Both)"""
+    endpoint: str
+    targets: str
+    rows: int = 0
+    batches: int = 0
+    failed_batches: int = 0
+    failed_rows: int = 0
+    retries: int = 0
+    elapsed: float = 0.0
+    latencies: list[float] = field(default_factory=list)  # Secondes, par batch réussi (dernière tentative)
+    server_ms: list[float] = field(default_factory=list)  # Temps d'import côté serveur, par batch réussi
+    neo4j_retries: int = 0    # Transactions d'import Neo4j rejouées par le serveur (`neo4jBatches`)
+    neo4j_deadlocks: int = 0  # ... dont deadlocks
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+def percentile(values, q: float) -> float:
+    """Percentile `q` (0-100) d'une série de mesures, 0 si vide"""
+    return float(np.percentile(values, q)) if len(values) else 0.0
+
+def server_time(body: bytes) -> float:
+    """Temps d'import serveur d'un batch : la plus lente des bases (`timings`, ms par base),
+    qui tournent en parallèle pour targets=Both"""
+    try:
+        return float(max(json.loads(body).get("timings", {}).values(), default=0.0))
+    except (ValueError, AttributeError):
+        return 0.0
+
+def neo4j_conflicts(body: bytes) -> tuple[int, int]:
+    """(retries, deadlocks) des transactions d'import Neo4j d'un batch, d'après `neo4jBatches`"""
+    try:
+        batches = json.loads(body).get("neo4jBatches") or []
+        return sum(b["attempts"] - 1 for b in batches), sum(b["deadlocks"] for b in batches)
+    except (ValueError, AttributeError, KeyError, TypeError):
+        return 0, 0
+
+@dataclass(frozen=True)
+class Payload:
+    """Batch déjà encodé (corps HTTP prêt à envoyer), produit hors du process principal"""
+    rows: int
+    body: bytes
+    content_type: str = "application/json"
+
+    def __len__(self) -> int:
+        return self.rows
+
+def dataseeder_url(endpoint: str, targets: str) -> str:
+    """URL d'import ; FRESH_IDS=true annonce des ids neufs (base vide) : Neo4j fait des CREATE au lieu de MERGE"""
+    url = f"{os.getenv('SERVER_URL', 'http://localhost:3001')}/api/DataSeeder/{endpoint}?targets={targets}"
+    if os.getenv('FRESH_IDS', 'false').lower() == 'true':
+        url += "&fresh=true"
+    return url
+
 async def post_bulk(session, endpoint, data, targets="Both"):
     """POST bulk avec targets=Postgres/Neo4j/Both"""
-    url = f"{os.getenv('SERVER_URL', 'http://localhost:3001')}/api/DataSeeder/{endpoint}?targets={targets}"
+    url = dataseeder_url(endpoint, targets)
     print(f"POST {endpoint} ({len(data)} items) → {targets}")
     
     try:
@@ -31,62 +115,540 @@ async def post_bulk(session, endpoint, data, targets="Both"):
         print(f"Server{endpoint}: {e}")
         raise
 
-def generate_articles(count: int) -> list[dict]:
-    """Articles avec prix réalistes"""
+def chunked(rows, size: int):
+    """Découpe un itérable en listes de `size` éléments, sans tout matérialiser"""
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+async def iterate(batches):
+    """Itère indifféremment un générateur classique ou asynchrone (pool de génération)"""
+    if hasattr(batches, "__aiter__"):
+        async for batch in batches:
+            yield batch
+    else:
+        for batch in batches:
+            yield batch
+
+async def post_batch(session, url, batch, stats: UploadStats, max_retries: int) -> bool:
+    """POST d'un batch avec retry + backoff exponentiel. False si le batch est abandonné."""
+    for attempt in range(max_retries + 1):
+        sent_at = time.perf_counter()
+        try:
+            if isinstance(batch, Payload):
+                request = session.post(url, data=batch.body, headers={"Content-Type": batch.content_type},
+                                       timeout=BATCH_TIMEOUT)
+            else:
+                request = session.post(url, json=batch, timeout=BATCH_TIMEOUT)
+            async with request as resp:
+                if resp.status < 400:
+                    body = await resp.read()
+                    stats.latencies.append(time.perf_counter() - sent_at)
+                    stats.server_ms.append(server_time(body))
+                    retries, deadlocks = neo4j_conflicts(body)
+                    stats.neo4j_retries += retries
+                    stats.neo4j_deadlocks += deadlocks
+                    return True
+                error = f"HTTP {resp.status}: {(await resp.text())[:200]}"
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = f"{type(e).__name__}: {e}"
+
+        if attempt < max_retries:
+            stats.retries += 1
+            delay = RETRY_BASE_DELAY * 2 ** attempt * (1 + _retry_random.random())
+            print(f"Retry {attempt + 1}/{max_retries} {stats.endpoint} → {stats.targets} dans {delay:.1f}s ({error})")
+            await asyncio.sleep(delay)
+
+    print(f"Batch {stats.endpoint} → {stats.targets} abandonné ({len(batch)} items): {error}")
+    return False
+
+async def post_stream(session, endpoint, batches, targets="Both", concurrency: int = 8, max_retries: int = 5) -> UploadStats:
+    """Upload d'une entité batch par batch, au plus `concurrency` requêtes en vol.
+
+    Le générateur `batches` n'est consommé qu'au rythme des slots libérés : la mémoire
+    reste bornée à `concurrency` batches. Retourne quand tous les batches sont terminés,
+    ce qui préserve l'ordre de dépendance entre entités.
+    """
+    url = dataseeder_url(endpoint, targets)
+    stats = UploadStats(endpoint, targets)
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = set()
+
+    async def send(batch):
+        try:
+            if await post_batch(session, url, batch, stats, max_retries):
+                stats.rows += len(batch)
+            else:
+                stats.failed_batches += 1
+                stats.failed_rows += len(batch)
+        finally:
+            semaphore.release()
+
+    start = time.perf_counter()
+    async for batch in iterate(batches):
+        await semaphore.acquire()
+        stats.batches += 1
+        task = asyncio.create_task(send(batch))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    await asyncio.gather(*pending)
+    stats.elapsed = time.perf_counter() - start
+
+    print(f"STREAM {endpoint} → {targets}: {stats.rows} items en {stats.elapsed:.2f}s "
+          f"({stats.rows_per_second:,.0f} rows/s, {stats.batches} batches, "
+          f"{stats.retries} retries, {stats.failed_batches} en échec"
+          + (f", {stats.neo4j_retries} transactions Neo4j rejouées dont {stats.neo4j_deadlocks} deadlocks"
+             if stats.neo4j_retries else "") + ")")
+    return stats
+
+class IdTable:
+    """Table compacte d'UUID v4 : 16 octets par entrée (numpy uint8), pour les clés étrangères"""
+
+    def __init__(self, count: int, seed):
+        raw = np.random.default_rng(seed).integers(0, 256, size=(count, 16), dtype=np.uint8)
+        raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+        raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # variante RFC 4122
+        self.raw = raw
+        self._text = None
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def strings(self, start: int, stop: int) -> list[str]:
+        """UUID texte des entrées [start, stop)"""
+        return format_uuids(self.raw[start:stop])
+
+    def strings_at(self, indices) -> list[str]:
+        """UUID texte des entrées aux index donnés (tableau numpy ou liste)"""
+        return format_uuids(self.raw[indices])
+
+    def text(self) -> np.ndarray:
+        """UUID texte de toute la table, (n, 36) octets ASCII, calculé une fois (36 octets/entrée en plus)"""
+        if self._text is None:
+            self._text = uuid_text(self.raw)
+        return self._text
+
+# Octet → deux chiffres hexadécimaux ASCII, lus comme un uint16 little-endian
+_HEX_PAIRS = np.array([ord(f"{b:02x}"[0]) | ord(f"{b:02x}"[1]) << 8 for b in range(256)], "<u2")
+_UUID_GROUPS = ((0, 8), (9, 13), (14, 18), (19, 23), (24, 36))  # Colonnes des 5 groupes hex du texte
+
+def put_uuids(rows: np.ndarray, col: int, raw: np.ndarray):
+    """Écrit les UUID texte de `raw` (n, 16) dans les colonnes [col, col + 36) de `rows` (tirets déjà en place)"""
+    hexed = _HEX_PAIRS[raw].view(np.uint8)
+    src = 0
+    for start, stop in _UUID_GROUPS:
+        rows[:, col + start:col + stop] = hexed[:, src:src + stop - start]
+        src += stop - start
+
+def uuid_text(raw: np.ndarray) -> np.ndarray:
+    """UUID texte d'un tableau (n, 16) d'octets, en (n, 36) octets ASCII"""
+    text = np.full((len(raw), 36), ord("-"), np.uint8)
+    put_uuids(text, 0, raw)
+    return text
+
+def format_uuids(raw: np.ndarray) -> list[str]:
+    """Formate un tableau (n, 16) d'octets en UUID texte, en vectorisé (sans uuid.UUID)"""
+    text = uuid_text(raw).tobytes().decode("ascii")
+    return [text[i:i + 36] for i in range(0, len(text), 36)]
+
+def put_digits(rows: np.ndarray, col: int, values: np.ndarray, width: int, pad: str = " "):
+    """Écrit des entiers >= 0 en décimal, alignés à droite sur `width` colonnes ; zéros de tête remplacés par `pad`"""
+    values = values.astype(np.int64)
+    for i in range(width - 1, -1, -1):
+        rows[:, col + i] = values % 10 + ord("0")
+        values //= 10
+    if pad != "0":
+        leading = np.ones(len(rows), dtype=bool)
+        for i in range(width - 1):
+            leading &= rows[:, col + i] == ord("0")
+            rows[leading, col + i] = ord(pad)
+
+def generate_prices(count: int, seed) -> np.ndarray:
+    """Prix des articles (float64), gardés en mémoire pour calculer les TotalPrice"""
+    return np.round(np.random.default_rng(seed).uniform(5, 500, size=count), 2)
+
+def columnar_header(endpoint: str, rows: int) -> bytes:
+    """En-tête du format colonnaire : magic, version, entité, nombre de lignes (little-endian)"""
+    return struct.pack("<4sBBHI", b"NSQC", 1, COLUMNAR_ENTITIES[endpoint], 0, rows)
+
+def uuid_column(values: list[str]) -> bytes:
+    """Colonne uuid : 16 octets bruts (ordre RFC) par ligne"""
+    return bytes.fromhex("".join(values).replace("-", ""))
+
+def string_column(values: list[str]) -> bytes:
+    """Colonne texte : offsets u32[n + 1] puis octets UTF-8 concaténés"""
+    encoded = [value.encode() for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets.tobytes() + b"".join(encoded)
+
+def columnar_orders(ids: np.ndarray, user_ids: np.ndarray, article_ids: np.ndarray,
+                    quantity: np.ndarray, total_price: np.ndarray) -> bytes:
+    """Batch d'orders colonnaire directement depuis les colonnes numpy (ids en (n, 16) octets)"""
+    return b"".join([
+        columnar_header("orders", len(quantity)), ids.tobytes(), user_ids.tobytes(), article_ids.tobytes(),
+        quantity.astype("<i4").tobytes(), total_price.astype("<f8").tobytes(),
+    ])
+
+def json_orders(ids: np.ndarray, user_text: np.ndarray, article_text: np.ndarray, quantity: np.ndarray,
+                total_price: np.ndarray, ndjson: bool = False) -> bytes:
+    """Batch d'orders JSON (ou NDJSON) écrit d'un bloc dans une matrice d'octets, sans dict ni json.dumps.
+
+    Chaque ligne a la même largeur : les nombres sont alignés à droite avec des espaces
+    (blancs autorisés par JSON), le prix est écrit en centimes avec deux décimales.
+    `ids` en (n, 16) octets bruts, `user_text` / `article_text` en (n, 36) octets ASCII.
+    """
+    cents = np.rint(total_price * 100).astype(np.int64)
+    int_width = len(str(int(cents.max()) // 100)) if len(cents) else 1
+    quantity_width = len(str(int(quantity.max()))) if len(quantity) else 1
+    pieces = [b'{"id":"', 36, b'","userId":"', 36, b'","articleId":"', 36, b'","quantity":', quantity_width,
+              b',"totalPrice":', int_width, b".", 2, b"}\n" if ndjson else b"},"]
+    template = b"".join(piece if isinstance(piece, bytes) else b"-" * piece for piece in pieces)
+    columns, offset = [], 0
+    for piece in pieces:
+        if isinstance(piece, int):
+            columns.append(offset)
+        offset += piece if isinstance(piece, int) else len(piece)
+
+    rows = np.empty((len(cents), len(template)), np.uint8)
+    rows[:] = np.frombuffer(template, np.uint8)
+    put_uuids(rows, columns[0], ids)
+    rows[:, columns[1]:columns[1] + 36] = user_text
+    rows[:, columns[2]:columns[2] + 36] = article_text
+    put_digits(rows, columns[3], quantity, quantity_width)
+    put_digits(rows, columns[4], cents // 100, int_width)
+    put_digits(rows, columns[5], cents % 100, 2, pad="0")
+    body = rows.tobytes()
+    return body[:-1] if ndjson else b"[" + body[:-1] + b"]"
+
+def columnar_follows(follower_ids: np.ndarray, following_ids: np.ndarray) -> bytes:
+    """Batch de follows colonnaire directement depuis les colonnes numpy"""
+    return columnar_header("social-graph", len(follower_ids)) + follower_ids.tobytes() + following_ids.tobytes()
+
+def encode_batch(endpoint: str, rows: list[dict], wire_format: str) -> Payload:
+    """Encode un batch de lignes au format fil demandé"""
+    if wire_format == "json":
+        body = json.dumps(rows).encode()
+    elif wire_format == "ndjson":
+        body = "\n".join(map(json.dumps, rows)).encode()
+    else:
+        def column(key):
+            return [row[key] for row in rows]
+
+        parts = [columnar_header(endpoint, len(rows))]
+        if endpoint == "articles":
+            parts += [uuid_column(column("id")), np.array(column("price"), "<f8").tobytes(),
+                      string_column(column("name"))]
+        elif endpoint == "users":
+            parts += [uuid_column(column("id")), string_column(column("userName")), string_column(column("email"))]
+        elif endpoint == "orders":
+            parts += [uuid_column(column("id")), uuid_column(column("userId")), uuid_column(column("articleId")),
+                      np.array(column("quantity"), "<i4").tobytes(), np.array(column("totalPrice"), "<f8").tobytes()]
+        else:
+            parts += [uuid_column(column("followerId")), uuid_column(column("followingId"))]
+        body = b"".join(parts)
+    return Payload(len(rows), body, WIRE_FORMATS[wire_format])
+
+def encode_batches(endpoint: str, batches, wire_format: str | None):
+    """Encode à la volée les batches de lignes ; JSON est laissé à aiohttp, les Payload passent tels quels.
+    wire_format=None : lignes Python seulement (mode bulk)"""
+    for batch in batches:
+        yield batch if wire_format in (None, "json") or isinstance(batch, Payload) \
+            else encode_batch(endpoint, batch, wire_format)
+
+def shard_args(ids: IdTable, batch_size: int, seed, *columns):
+    """Découpe une table d'ids en shards de `batch_size` lignes : (ids bruts, colonnes..., graine).
+
+    La graine dépend uniquement de la position du shard : le résultat est identique
+    quel que soit le nombre de workers (ou sans pool).
+    """
+    for start in range(0, len(ids), batch_size):
+        stop = min(start + batch_size, len(ids))
+        yield (ids.raw[start:stop].tobytes(), *(column[start:stop].tolist() for column in columns),
+               derive_seed(seed, f"shard-{start}"))
+
+def article_rows(raw_ids: bytes, prices: list[float], seed) -> list[dict]:
+    """Un shard d'articles avec prix réalistes"""
+    fake.seed_instance(seed)
+    random.seed(seed)  # faker_commerce tire une partie du nom avec le `random` global
     return [
-        {
-            "id": str(uuid4()),
-            "name": fake.ecommerce_name(),
-            "price": round(random.uniform(5, 500), 2)
-        }
-        for _ in range(count)
+        {"id": article_id, "name": fake.ecommerce_name(), "price": price}
+        for article_id, price in zip(format_uuids(np.frombuffer(raw_ids, np.uint8).reshape(-1, 16)), prices)
     ]
 
-def generate_users(count: int) -> list[dict]:
-    """Users réalistes"""
+def user_rows(raw_ids: bytes, seed) -> list[dict]:
+    """Un shard de users réalistes"""
+    fake.seed_instance(seed)
     return [
-        {
-            "id": str(uuid4()),
-            "userName": fake.user_name(),
-            "email": fake.email()
-        }
-        for _ in range(count)
+        {"id": user_id, "userName": fake.user_name(), "email": fake.email()}
+        for user_id in format_uuids(np.frombuffer(raw_ids, np.uint8).reshape(-1, 16))
     ]
 
-def generate_orders(users: list[dict], articles: list[dict], count: int) -> list[dict]:
-    """Orders AVEC TotalPrice = Quantity × Article.Price Server"""
-    orders = []
-    for _ in range(count):
-        user = random.choice(users)
-        article = random.choice(articles)
-        quantity = random.randint(1, 5)
-        
-        # ServerCALCUL TotalPrice automatique !
-        total_price = round(quantity * article["price"], 2)
-        
-        order = {
-            "id": str(uuid4()),
-            "userId": user["id"],
-            "articleId": article["id"],
-            "quantity": quantity,
-            "totalPrice": total_price  # ServerParfait pour OrderDto !
-        }
-        orders.append(order)
-    return orders
-
-def generate_social_graph(users: list[dict], edges_per_user: int = 5) -> list[dict]:
-    """Social graph réaliste"""
-    follows = []
-    for user in users:
-        candidates = [u for u in users if u["id"] != user["id"]]
-        for _ in range(random.randint(1, min(edges_per_user, len(candidates)))):
-            if candidates:
-                target = random.choice(candidates)
-                follows.append({
-                    "followerId": user["id"], 
-                    "followingId": target["id"]
-                })
-    return follows
+def encode_rows(endpoint: str, wire_format: str, builder, *args) -> Payload:
+    """Exécuté dans un worker : génère un shard et l'encode au format fil, prêt à POSTer"""
+    return encode_batch(endpoint, builder(*args), wire_format)
+
+def generate_articles(ids: IdTable, prices: np.ndarray, batch_size: int, seed):
+    """Articles avec prix réalistes, par batches"""
+    for args in shard_args(ids, batch_size, seed, prices):
+        yield article_rows(*args)
+
+def generate_users(ids: IdTable, batch_size: int, seed):
+    """Users réalistes, par batches"""
+    for args in shard_args(ids, batch_size, seed):
+        yield user_rows(*args)
+
+async def generate_in_pool(pool: ProcessPoolExecutor, endpoint: str, builder, shards, window: int,
+                           wire_format: str = "json"):
+    """Génère les shards dans un pool de process, dans l'ordre, au plus `window` shards d'avance"""
+    loop = asyncio.get_running_loop()
+    pending = deque()
+    for args in shards:
+        pending.append(loop.run_in_executor(pool, encode_rows, endpoint, wire_format, builder, *args))
+        if len(pending) >= window:
+            yield await pending.popleft()
+    while pending:
+        yield await pending.popleft()
+
+def distinct_per_row(values: np.ndarray, degrees: np.ndarray, sentinel: int) -> np.ndarray:
+    """Garde les `degrees[i]` premiers tirages de chaque ligne, sans doublon.
+
+    Trie `values` en place (lignes de quelques entiers → coût linéaire) et retourne le
+    masque des cellules à conserver. `sentinel` doit être supérieur à toute valeur tirée.
+    """
+    values[np.arange(values.shape[1]) >= degrees[:, None]] = sentinel
+    values.sort(axis=1)
+    keep = values < sentinel
+    keep[:, 1:] &= values[:, 1:] != values[:, :-1]
+    return keep
+
+def generate_order_columns(user_count: int, prices: np.ndarray, count: int, seed, per_user: bool = False):
+    """Colonnes des orders tirées en une passe numpy : (user_idx, article_idx, quantity, total_price).
+
+    - per_user=False : `count` orders d'utilisateurs uniformément aléatoires (historique)
+    - per_user=True  : spec, chaque utilisateur commande 0 à 5 produits distincts (`count` ignoré)
+    """
+    rng = np.random.default_rng(seed)
+    article_count = len(prices)
+    if per_user:
+        width = min(MAX_PRODUCTS_PER_USER, article_count)
+        articles = rng.integers(0, article_count, size=(user_count, width), dtype=np.int32)
+        keep = distinct_per_row(articles, rng.integers(0, width + 1, size=user_count), article_count)
+        user_idx = np.broadcast_to(np.arange(user_count, dtype=np.int32)[:, None], articles.shape)[keep]
+        article_idx = articles[keep]
+    else:
+        user_idx = rng.integers(0, user_count, size=count, dtype=np.int32)
+        article_idx = rng.integers(0, article_count, size=count, dtype=np.int32)
+
+    quantity = rng.integers(1, 6, size=len(user_idx), dtype=np.int8)
+    total_price = np.round(quantity * prices[article_idx], 2)
+    return user_idx, article_idx, quantity, total_price
+
+def generate_orders(user_ids: IdTable, article_ids: IdTable, prices: np.ndarray, count: int, batch_size: int, seed,
+                    per_user: bool = False, wire_format: str | None = None):
+    """Orders AVEC TotalPrice = Quantity × Article.Price, par batches.
+
+    Les colonnes sont calculées d'un bloc. Avec un format fil, chaque batch est encodé
+    directement depuis numpy (JSON / NDJSON par json_orders, colonnaire) au moment où
+    l'uploader le consomme ; les dicts ne sont construits que pour wire_format=None
+    (mode bulk). Les UUID des orders ne sont jamais stockés.
+    """
+    user_idx, article_idx, quantity, total_price = generate_order_columns(len(user_ids), prices, count, seed, per_user)
+    id_rng = np.random.default_rng(derive_seed(seed, "order-ids"))
+    for start in range(0, len(user_idx), batch_size):
+        stop = start + batch_size
+        size = len(user_idx[start:stop])
+        if wire_format == "columnar":
+            yield Payload(size, columnar_orders(
+                IdTable(size, id_rng).raw, user_ids.raw[user_idx[start:stop]], article_ids.raw[article_idx[start:stop]],
+                quantity[start:stop], total_price[start:stop]), WIRE_FORMATS["columnar"])
+            continue
+        if wire_format in ("json", "ndjson"):
+            yield Payload(size, json_orders(
+                IdTable(size, id_rng).raw, user_ids.text()[user_idx[start:stop]], article_ids.text()[article_idx[start:stop]],
+                quantity[start:stop], total_price[start:stop], ndjson=wire_format == "ndjson"), WIRE_FORMATS[wire_format])
+            continue
+        yield [
+            {
+                "id": order_id,
+                "userId": user_id,
+                "articleId": article_id,
+                "quantity": q,
+                "totalPrice": total
+            }
+            for order_id, user_id, article_id, q, total in zip(
+                IdTable(size, id_rng).strings(0, size), user_ids.strings_at(user_idx[start:stop]),
+                article_ids.strings_at(article_idx[start:stop]), quantity[start:stop].tolist(),
+                total_price[start:stop].tolist())
+        ]
+
+def generate_follow_edges(user_count: int, max_followers: int = MAX_FOLLOWERS, seed: int | None = None,
+                          chunk_size: int = GRAPH_CHUNK_SIZE):
+    """Graphe social en O(n) : chaque utilisateur reçoit 0..max_followers followers tirés par index.
+
+    Yield des couples (follower_idx, following_idx) de tableaux int32, par tranches de
+    `chunk_size` utilisateurs suivis, pour garder une mémoire bornée. Les doublons sont
+    supprimés ligne par ligne (tri d'au plus max_followers entiers), l'in-degree ne
+    dépasse donc jamais max_followers et personne ne se suit lui-même.
+    """
+    width = min(max_followers, user_count - 1)
+    if width <= 0:
+        return
+
+    rng = np.random.default_rng(seed)
+    for start in range(0, user_count, chunk_size):
+        stop = min(start + chunk_size, user_count)
+        targets = np.arange(start, stop, dtype=np.int32)
+
+        # Tirage dans [0, n-1) puis décalage au-delà de la cible → jamais d'auto-follow
+        followers = rng.integers(0, user_count - 1, size=(len(targets), width), dtype=np.int32)
+        followers += followers >= targets[:, None]
+
+        # Slots au-delà du degré tiré → sentinelle user_count, triée en fin de ligne
+        keep = distinct_per_row(followers, rng.integers(0, width + 1, size=len(targets)), user_count)
+        yield followers[keep], np.broadcast_to(targets[:, None], followers.shape)[keep]
+
+def generate_social_graph(user_ids: IdTable, batch_size: int, seed, max_followers: int = MAX_FOLLOWERS,
+                          wire_format: str = "json"):
+    """Social graph réaliste (0 à max_followers followers par user), par batches.
+
+    Les UUID texte ne sont formatés qu'au moment de construire chaque batch
+    (en colonnaire, les octets bruts de la table d'ids sont envoyés tels quels).
+    """
+    for followers, followings in generate_follow_edges(len(user_ids), max_followers, seed):
+        for start in range(0, len(followers), batch_size):
+            stop = start + batch_size
+            if wire_format == "columnar":
+                yield Payload(len(followers[start:stop]), columnar_follows(
+                    user_ids.raw[followers[start:stop]], user_ids.raw[followings[start:stop]]), WIRE_FORMATS["columnar"])
+                continue
+            yield [
+                {"followerId": follower, "followingId": following}
+                for follower, following in zip(user_ids.strings_at(followers[start:stop]),
+                                               user_ids.strings_at(followings[start:stop]))
+            ]
+
+def derive_seed(seed: int, stream: str) -> int:
+    """Graine stable par flux (ids, prix, noms...) : chaque flux se regénère à l'identique"""
+    return int(np.random.SeedSequence([seed, zlib.crc32(stream.encode())]).generate_state(1)[0])
+
+def build_pipelines(article_ids: IdTable, prices: np.ndarray, user_ids: IdTable, order_count: int, batch_size: int,
+                    seed, orders_per_user: bool = False, wire_format: str | None = "json"):
+    """(endpoint, fabrique de batches) dans l'ordre de dépendance Articles → Users → Social → Orders.
+
+    Pipelines paresseux : chaque appel de la fabrique regénère les mêmes batches (graines dérivées),
+    ce qui permet d'envoyer des données identiques à plusieurs cibles successives.
+    """
+    articles_seed, users_seed = derive_seed(seed, "articles"), derive_seed(seed, "users")
+    return [
+        ("articles", lambda: encode_batches("articles", generate_articles(
+            article_ids, prices, batch_size, articles_seed), wire_format)),
+        ("users", lambda: encode_batches("users", generate_users(user_ids, batch_size, users_seed), wire_format)),
+        ("social-graph", lambda: encode_batches("social-graph", generate_social_graph(
+            user_ids, batch_size, derive_seed(seed, "social-graph"), wire_format=wire_format or "json"), wire_format)),
+        ("orders", lambda: encode_batches("orders", generate_orders(
+            user_ids, article_ids, prices, order_count, batch_size, derive_seed(seed, "orders"),
+            orders_per_user, wire_format), wire_format)),
+    ]
+
+# Export hors ligne : fichiers pour COPY (Postgres) et neo4j-admin database import (Neo4j).
+# Les fichiers partagés n'ont pas d'en-tête (COPY nomme les colonnes) ; Neo4j lit ses en-têtes à part.
+NEO4J_HEADERS = {
+    "users": "id:ID(User),name,email,followersCount:long,followingCount:long",
+    "follows": ":START_ID(User),:END_ID(User)",
+    "neo4j_articles": "id:ID(Article),name,price:double,buyers:long",
+    "neo4j_bought": ":START_ID(User),:END_ID(Article),quantity:long,totalPrice:double",
+}
+
+def write_csv_rows(path: str, rows):
+    """Écrit des lignes CSV (guillemets RFC 4180, lus tels quels par COPY et neo4j-admin)"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        for batch in rows:
+            writer.writerows(batch)
+
+def export_dataset(out_dir: str, article_ids: IdTable, prices: np.ndarray, user_ids: IdTable, order_count: int,
+                   batch_size: int, seed, orders_per_user: bool = False) -> dict:
+    """Écrit le jeu de données de `build_pipelines` (mêmes graines, même BATCH_SIZE → mêmes ids) dans `out_dir`.
+
+    Les agrégats maintenus par les imports de l'API sont calculés ici : compteurs de followers,
+    couples (user, article) distincts, acheteurs par article. Comme le `MERGE` de l'API, un seul
+    BOUGHT par couple, avec la quantité et le prix de la dernière commande.
+    Retourne le manifeste (volumes, graine, fichiers), aussi écrit dans manifest.json.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    path = lambda name: os.path.join(out_dir, f"{name}.csv")
+    counts = {}
+    began = time.perf_counter()
+
+    # Social graph d'abord : les compteurs sont des colonnes des users
+    followers_count = np.zeros(len(user_ids), dtype=np.int64)
+    following_count = np.zeros(len(user_ids), dtype=np.int64)
+    counts["follows"] = 0
+    with open(path("follows"), "w", encoding="utf-8") as f:
+        for followers, followings in generate_follow_edges(len(user_ids), seed=derive_seed(seed, "social-graph")):
+            followers_count += np.bincount(followings, minlength=len(user_ids))
+            following_count += np.bincount(followers, minlength=len(user_ids))
+            f.write("".join(f"{a},{b}\n" for a, b in zip(user_ids.strings_at(followers), user_ids.strings_at(followings))))
+            counts["follows"] += len(followers)
+    print(f"EXPORT follows: {counts['follows']} lignes")
+
+    def user_batches():
+        for offset, args in zip(range(0, len(user_ids), batch_size), shard_args(user_ids, batch_size, users_seed)):
+            yield [(row["id"], row["userName"], row["email"], followers_count[offset + i], following_count[offset + i])
+                   for i, row in enumerate(user_rows(*args))]
+
+    users_seed = derive_seed(seed, "users")
+    write_csv_rows(path("users"), user_batches())
+    counts["users"] = len(user_ids)
+    print(f"EXPORT users: {counts['users']} lignes")
+
+    # Orders : mêmes colonnes et mêmes ids (tirés batch par batch) que generate_orders
+    orders_seed = derive_seed(seed, "orders")
+    user_idx, article_idx, quantity, total_price = generate_order_columns(
+        len(user_ids), prices, order_count, orders_seed, orders_per_user)
+    id_rng = np.random.default_rng(derive_seed(orders_seed, "order-ids"))
+
+    def order_batches():
+        for start in range(0, len(user_idx), batch_size):
+            stop = start + batch_size
+            size = len(user_idx[start:stop])
+            yield zip(IdTable(size, id_rng).strings(0, size), user_ids.strings_at(user_idx[start:stop]),
+                      article_ids.strings_at(article_idx[start:stop]), quantity[start:stop].tolist())
+
+    write_csv_rows(path("orders"), order_batches())
+    counts["orders"] = len(user_idx)
+
+    # Dernière commande de chaque couple (user, article) : ordre inverse puis première occurrence
+    pairs = user_idx.astype(np.int64) * len(article_ids) + article_idx
+    _, last = np.unique(pairs[::-1], return_index=True)
+    last = np.sort(len(pairs) - 1 - last)
+    buyers = np.bincount(article_idx[last], minlength=len(article_ids))
+    pair_users, pair_articles = user_ids.strings_at(user_idx[last]), article_ids.strings_at(article_idx[last])
+    write_csv_rows(path("user_purchases"), [zip(pair_users, pair_articles)])
+    write_csv_rows(path("neo4j_bought"), [zip(pair_users, pair_articles, quantity[last].tolist(),
+                                              total_price[last].tolist())])
+    bought = np.flatnonzero(buyers)
+    write_csv_rows(path("article_buyer_stats"), [zip(article_ids.strings_at(bought), buyers[bought].tolist())])
+    counts["purchases"] = len(last)
+    print(f"EXPORT orders: {counts['orders']} lignes, {counts['purchases']} couples (user, article) distincts")
+
+    articles = [row for batch in generate_articles(article_ids, prices, batch_size, derive_seed(seed, "articles"))
+                for row in batch]
+    write_csv_rows(path("articles"), [[(a["id"], a["name"], a["price"]) for a in articles]])
+    write_csv_rows(path("neo4j_articles"), [[(a["id"], a["name"], a["price"], buyers[i]) for i, a in enumerate(articles)]])
+    counts["articles"] = len(articles)
+    print(f"EXPORT articles: {counts['articles']} lignes")
+
+    for name, header in NEO4J_HEADERS.items():
+        with open(path(f"{name}_header"), "w", encoding="utf-8") as f:
+            f.write(header + "\n")
+
+    manifest = {"seed": seed, "batch_size": batch_size, "orders_per_user": orders_per_user, "counts": counts,
+                "export_s": round(time.perf_counter() - began, 3)}
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
 
 async def main():
     print("ServerStarting HYBRIDE Postgres+Neo4j Data Seeder...")
@@ -95,16 +657,55 @@ async def main():
     user_count = int(os.getenv('USER_COUNT', '1000'))
     article_count = int(os.getenv('ARTICLE_COUNT', '500'))
     order_count = int(os.getenv('ORDER_COUNT', '5000'))
+    seed = int(os.environ['SEED']) if os.getenv('SEED') else random.randrange(2 ** 32)
+    
+    upload_mode = os.getenv('UPLOAD_MODE', 'bulk')
+    batch_size = int(os.getenv('BATCH_SIZE', '5000'))
+    concurrency = int(os.getenv('CONCURRENCY', '8'))
+    max_retries = int(os.getenv('MAX_RETRIES', '5'))
+    targets_list = [t.strip() for t in os.getenv('TARGETS', 'Both').split(',') if t.strip()]
+    gen_workers = int(os.getenv('GEN_WORKERS', '0'))
+    orders_per_user = os.getenv('ORDER_DISTRIBUTION', 'uniform') == 'per-user'
+    # Mode bulk : lignes Python, un seul POST par entité (aiohttp encode en JSON)
+    wire_format = os.getenv('WIRE_FORMAT', 'json') if upload_mode == "stream" else None
+    
+    orders_label = f"0-{MAX_PRODUCTS_PER_USER} orders/user" if orders_per_user else f"{order_count} orders"
+    print(f"ServerGenerating: {user_count} users, {article_count} articles, {orders_label} (seed={seed})")
+    if upload_mode == "stream":
+        print(f"Format fil: {wire_format} ({WIRE_FORMATS[wire_format]})")
     
-    print(f"ServerGenerating: {user_count} users, {article_count} articles, {order_count} orders")
+    # Seules les tables d'ids (16 octets/entrée) et les prix restent en mémoire
+    article_ids = IdTable(article_count, derive_seed(seed, "article-ids"))
+    prices = generate_prices(article_count, derive_seed(seed, "prices"))
+    user_ids = IdTable(user_count, derive_seed(seed, "user-ids"))
     
-    # Génération
-    articles = generate_articles(article_count)
-    users = generate_users(user_count)
-    orders = generate_orders(users, articles, order_count)
-    follows = generate_social_graph(users)
+    # Export hors ligne : aucun appel HTTP, les fichiers sont chargés par load_export.py
+    if upload_mode == "export":
+        export_dir = os.getenv('EXPORT_DIR', 'export')
+        manifest = export_dataset(export_dir, article_ids, prices, user_ids, order_count, batch_size, seed,
+                                  orders_per_user)
+        print(f"\nEXPORT terminé en {manifest['export_s']:.2f}s → {export_dir}/ (python load_export.py --dir {export_dir})")
+        return
+
+    # Ordre important: Articles → Users → Social → Orders
+    articles_seed, users_seed = derive_seed(seed, "articles"), derive_seed(seed, "users")
+    entities = build_pipelines(article_ids, prices, user_ids, order_count, batch_size, seed, orders_per_user, wire_format)
+    
+    # Faker domine le coût CPU : en mode stream, articles et users peuvent être générés
+    # (et encodés au format fil) par un pool de process, shard par shard
+    pool = None
+    if gen_workers > 0 and upload_mode == "stream":
+        pool = ProcessPoolExecutor(gen_workers, mp_context=get_context("spawn"))
+        window = 2 * gen_workers
+        entities[0] = ("articles", lambda: generate_in_pool(
+            pool, "articles", article_rows, shard_args(article_ids, batch_size, articles_seed, prices), window,
+            wire_format))
+        entities[1] = ("users", lambda: generate_in_pool(
+            pool, "users", user_rows, shard_args(user_ids, batch_size, users_seed), window, wire_format))
+        print(f"Génération articles/users sur {gen_workers} process")
     
-    print(f"ServerData ready: {len(follows)} follows")
+    sent = {}
+    report = []
     
     connector = aiohttp.TCPConnector(limit=100, limit_per_host=30)
     timeout = aiohttp.ClientTimeout(total=None)  # Pas de timeout global
@@ -115,30 +716,44 @@ async def main():
         headers={'Content-Type': 'application/json'}
     ) as session:
         try:
-            # Ordre important: Articles → Users → Social → Orders
-            await post_bulk(session, "articles", articles, "Both")
-            await post_bulk(session, "users", users, "Both")
-            await post_bulk(session, "social-graph", follows, "Both")
-            await post_bulk(session, "orders", orders, "Both")
+            for targets in targets_list:
+                for endpoint, batches in entities:
+                    if upload_mode == "stream":
+                        stats = await post_stream(session, endpoint, batches(), targets, concurrency, max_retries)
+                        report.append(stats)
+                        sent[endpoint] = stats.rows
+                    else:
+                        data = [row for batch in batches() for row in batch]
+                        await post_bulk(session, endpoint, data, targets)
+                        sent[endpoint] = len(data)
         except Exception as e:
             print(f"SEEDER FAILED: {e}")
             raise
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+    if report:
+        print("\nDébit par entité / cible :")
+        for stats in report:
+            print(f"   {stats.endpoint:<13} → {stats.targets:<8} {stats.rows:>10} rows "
+                  f"{stats.elapsed:>8.2f}s {stats.rows_per_second:>12,.0f} rows/s"
+                  + (f"  ({stats.failed_rows} rows en échec)" if stats.failed_rows else ""))
 
     print("\nServerHYBRIDE SEEDING COMPLETED SUCCESSFULLY!")
-    print(f"   → Postgres: {user_count} users + {order_count} orders")
-    print(f"   → Neo4j: {user_count} users + {len(follows)} follows + {order_count} BOUGHT")
+    print(f"   → Postgres: {user_count} users + {sent.get('orders', 0)} orders")
+    print(f"   → Neo4j: {user_count} users + {sent.get('social-graph', 0)} follows + {sent.get('orders', 0)} BOUGHT")
 
 async def test_small(session):
     """Test rapide 10 records"""
-    users = generate_users(10)
-    articles = generate_articles(5)
-    orders = generate_orders(users, articles, 20)
-    follows = generate_social_graph(users, 2)
+    users = IdTable(10, 1)
+    articles = IdTable(5, 2)
+    prices = generate_prices(5, 3)
     
     async with aiohttp.ClientSession() as session:
-        await post_bulk(session, "articles", articles, "Both")
-        await post_bulk(session, "users", users, "Both")
-        await post_bulk(session, "orders", orders, "Both")
+        await post_bulk(session, "articles", next(generate_articles(articles, prices, 5, 4)), "Both")
+        await post_bulk(session, "users", next(generate_users(users, 10, 5)), "Both")
+        await post_bulk(session, "orders", next(generate_orders(users, articles, prices, 20, 20, 6)), "Both")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,55 @@
+﻿using Microsoft.AspNetCore.Mvc;
+using Server.Models.Queries.Enums;
+using Server.Models.Responses;
+using Server.Services;
+
+/// <summary>
+/// 
+/// </summary>
+[ApiController]
+[Route("api/[controller]")]
+public class AnalyticsController : ControllerBase
+{
+    private readonly PostgresDbService _pgService;
+    private readonly Neo4jDbService _neo4jService;
+
+    /// <summary>
+    /// 
+    /// </summary>
+    public AnalyticsController(PostgresDbService pgService, Neo4jDbService neo4jService)
+    {
+        _pgService = pgService;
+        _neo4jService = neo4jService;
+    }
+
+    /// <summary>
+    /// Top products by distinct buyers in the level-n follower circle of a user, with buyers per level
+    /// </summary>
+    [HttpGet("viral-products")]
+    public async Task<ActionResult<List<ViralProductsResult>>> ViralProducts([FromQuery] Guid userId, [FromQuery] int level = 3, [FromQuery] int top = 10, [FromQuery] Database targets = Database.Both, [FromQuery] bool parallel = true)
+    {
+        if (level < 1 || top < 1)
+            return BadRequest("level and top must be at least 1");
+
+        var outcomes = await DatabaseTargets.RunAsync(targets, parallel,
+            () => _pgService.GetViralProductsAsync(userId, level, top),
+            () => _neo4jService.GetViralProductsAsync(userId, level, top));
+
+        var results = new List<ViralProductsResult>();
+        foreach (var outcome in outcomes)
+        {
+            var result = outcome.Result ?? new ViralProductsResult
+            {
+                UserId = userId,
+                Level = level,
+                Error = outcome.Error?.Message
+            };
+            result.Database = outcome.Database;
+            results.Add(result);
+        }
+
+        if (outcomes.All(o => o.Error is not null))
+            return StatusCode(StatusCodes.Status500InternalServerError, results);
+        return Ok(results);
+    }
+}
@@ -25,119 +25,84 @@ public class DataSeederController : ControllerBase
     }
 
     /// <summary>
-    /// Bulk Articles → Postgres/Neo4j/Both
+    /// Bulk Articles → Postgres/Neo4j/Both (fresh=true: new ids, Neo4j uses CREATE instead of MERGE)
     /// </summary>
     [HttpPost("articles")]
-    public async Task<IActionResult> BulkImportArticles([FromBody] List<ArticleDto> articles, [FromQuery] Database targets = Database.Both)
+    public async Task<IActionResult> BulkImportArticles([FromBody] List<ArticleDto> articles, [FromQuery] Database targets = Database.Both, [FromQuery] bool parallel = true, [FromQuery] bool fresh = false)
     {
-        var results = new List<string>();
-
-        if (targets == Database.Postgres || targets == Database.Both)
-        {
-            await _pgService.BulkImportArticles(articles);
-            results.Add("Postgres: Articles imported");
-        }
+        var outcomes = await DatabaseTargets.RunImportAsync(targets, parallel,
+            () => _pgService.BulkImportArticles(articles, fresh),
+            () => _neo4jService.BulkImportArticles(articles, fresh));
 
-        if (targets == Database.Neo4j || targets == Database.Both)
-        {
-            await _neo4jService.BulkImportArticles(articles);
-            results.Add($"Neo4j: Articles imported");
-        }
-
-        return Ok(new { Message = string.Join(", ", results) });
+        return ImportResult("Articles", outcomes);
     }
 
     /// <summary>
-    /// Bulk Users → Postgres/Neo4j/Both  
+    /// Bulk Users → Postgres/Neo4j/Both (fresh=true: new ids, Neo4j uses CREATE instead of MERGE)
     /// </summary>
     [HttpPost("users")]
-    public async Task<IActionResult> BulkImportUsers([FromBody] List<UserDto> users, [FromQuery] Database targets = Database.Both)
+    public async Task<IActionResult> BulkImportUsers([FromBody] List<UserDto> users, [FromQuery] Database targets = Database.Both, [FromQuery] bool parallel = true, [FromQuery] bool fresh = false)
     {
-        var results = new List<string>();
+        var outcomes = await DatabaseTargets.RunImportAsync(targets, parallel,
+            () => _pgService.BulkImportUsers(users, fresh),
+            () => _neo4jService.BulkImportUsers(users, fresh));
 
-        if (targets == Database.Postgres || targets == Database.Both)
-        {
-            await _pgService.BulkImportUsers(users);
-            results.Add("Postgres: Users imported");
-        }
-
-        if (targets == Database.Neo4j || targets == Database.Both)
-        {
-            await _neo4jService.BulkImportUsers(users);
-            results.Add("Neo4j: Users imported");
-        }
-
-        return Ok(new { Message = string.Join(", ", results) });
+        return ImportResult("Users", outcomes);
     }
 
     /// <summary>
     /// Bulk Orders → Postgres/Neo4j/Both
     /// </summary>
     [HttpPost("orders")]
-    public async Task<IActionResult> BulkImportOrders([FromBody] List<OrderDto> orders, [FromQuery] Database targets = Database.Both)
+    public async Task<IActionResult> BulkImportOrders([FromBody] List<OrderDto> orders, [FromQuery] Database targets = Database.Both, [FromQuery] bool parallel = true)
     {
-        var results = new List<string>();
+        var outcomes = await DatabaseTargets.RunImportAsync(targets, parallel,
+            () => _pgService.BulkImportOrders(orders),
+            () => _neo4jService.BulkImportOrders(orders));
 
-        if (targets == Database.Postgres || targets == Database.Both)
-        {
-            await _pgService.BulkImportOrders(orders);
-            results.Add("Postgres: Orders imported");
-        }
-
-        if (targets == Database.Neo4j || targets == Database.Both)
-        {
-            await _neo4jService.BulkImportOrders(orders);
-            results.Add("Neo4j: Orders imported");
-        }
-
-        return Ok(new { Message = string.Join(", ", results) });
+        return ImportResult("Orders", outcomes);
     }
 
     /// <summary>
-    /// Bulk Social Graph → Postgres/Neo4j/Both
+    /// Bulk Social Graph → Postgres/Neo4j/Both (fresh=true: new edges, Neo4j uses CREATE instead of MERGE)
     /// </summary>
     [HttpPost("social-graph")]
-    public async Task<IActionResult> BulkImportSocialGraph([FromBody] List<FollowDto> follows, [FromQuery] Database targets = Database.Both)
+    public async Task<IActionResult> BulkImportSocialGraph([FromBody] List<FollowDto> follows, [FromQuery] Database targets = Database.Both, [FromQuery] bool parallel = true, [FromQuery] bool fresh = false)
     {
-        var results = new List<string>();
+        var outcomes = await DatabaseTargets.RunImportAsync(targets, parallel,
+            () => _pgService.BulkImportSocialGraph(follows, fresh),
+            () => _neo4jService.BulkImportSocialGraph(follows, fresh));
 
-        if (targets == Database.Postgres || targets == Database.Both)
-        {
-            await _pgService.BulkImportSocialGraph(follows);
-            results.Add("Postgres: Social graph imported");
-        }
-
-        if (targets == Database.Neo4j || targets == Database.Both)
-        {
-            await _neo4jService.BulkImportSocialGraph(follows);
-            results.Add("Neo4j: Social graph imported");
-        }
-
-        return Ok(new { Message = string.Join(", ", results) });
+        return ImportResult("Social graph", outcomes);
     }
 
     /// <summary>
     /// Full setup → 4000 users/articles/orders + social graph
     /// </summary>
     [HttpPost("full-setup")]
-    public async Task<IActionResult> FullBulkSetup([FromBody] SetupDto setup, [FromQuery] Database targets = Database.Both)
+    public async Task<IActionResult> FullBulkSetup([FromBody] SetupDto setup, [FromQuery] Database targets = Database.Both, [FromQuery] bool parallel = true, [FromQuery] bool fresh = false)
     {
         var results = new List<string>();
+        IActionResult step;
 
         // Articles
-        await BulkImportArticles(setup.Articles, targets);
+        if (Failed(step = await BulkImportArticles(setup.Articles, targets, parallel, fresh)))
+            return step;
         results.Add("Articles OK");
 
         // Users  
-        await BulkImportUsers(setup.Users, targets);
+        if (Failed(step = await BulkImportUsers(setup.Users, targets, parallel, fresh)))
+            return step;
         results.Add("Users OK");
 
         // Social Graph
-        await BulkImportSocialGraph(setup.Follows, targets);
+        if (Failed(step = await BulkImportSocialGraph(setup.Follows, targets, parallel, fresh)))
+            return step;
         results.Add("Social graph OK");
 
         // Orders
-        await BulkImportOrders(setup.Orders, targets);
+        if (Failed(step = await BulkImportOrders(setup.Orders, targets, parallel)))
+            return step;
         results.Add("Orders OK");
 
         return Ok(new
@@ -146,4 +111,66 @@ public class DataSeederController : ControllerBase
             Targets = targets.ToString()
         });
     }
+
+    /// <summary>
+    /// Neo4j constraints / indexes and their state
+    /// </summary>
+    [HttpGet("schema")]
+    public async Task<IActionResult> GetNeo4jSchema()
+    {
+        return Ok(await _neo4jService.GetSchemaStatusAsync());
+    }
+
+    /// <summary>
+    /// (Re)apply the Neo4j constraints / indexes, e.g. after wiping the graph
+    /// </summary>
+    [HttpPost("schema")]
+    public async Task<IActionResult> EnsureNeo4jSchema()
+    {
+        return Ok(await _neo4jService.EnsureSchemaAsync());
+    }
+
+    /// <summary>
+    /// Recompute the viral products aggregates (buyers per article, purchase sets) from the orders
+    /// and the follower / following counters from the social graph.
+    /// Bulk imports keep them up to date; this is for data imported before they existed.
+    /// </summary>
+    [HttpPost("aggregates")]
+    public async Task<IActionResult> RebuildAggregates([FromQuery] Database targets = Database.Both, [FromQuery] bool parallel = true)
+    {
+        var outcomes = await DatabaseTargets.RunImportAsync(targets, parallel,
+            async () =>
+            {
+                await _pgService.RebuildViralAggregatesAsync();
+                await _pgService.RebuildFollowCountersAsync();
+            },
+            async () =>
+            {
+                await _neo4jService.RebuildViralAggregatesAsync();
+                await _neo4jService.RebuildFollowCountersAsync();
+            });
+
+        return ImportResult("Aggregates", outcomes);
+    }
+
+    /// <summary>
+    /// Per-backend message, import duration (ms, excludes model binding and network), errors
+    /// and the Neo4j per-batch timings. 500 when a backend failed; the other backend's import is kept.
+    /// </summary>
+    private IActionResult ImportResult(string entity, List<BackendOutcome<bool>> outcomes)
+    {
+        var message = string.Join(", ", outcomes.Select(o =>
+            o.Error is null ? $"{o.Database}: {entity} imported" : $"{o.Database}: {entity} failed"));
+        var timings = outcomes.ToDictionary(o => o.Database.ToString(), o => o.ElapsedMs);
+        var errors = outcomes.Where(o => o.Error is not null)
+            .ToDictionary(o => o.Database.ToString(), o => o.Error!.Message);
+
+        var batches = _neo4jService.ImportBatches;
+
+        var body = new { Message = message, Timings = timings, Errors = errors.Count > 0 ? errors : null, Neo4jBatches = batches.Count > 0 ? batches : null };
+        return errors.Count > 0 ? StatusCode(StatusCodes.Status500InternalServerError, body) : Ok(body);
+    }
+
+    private static bool Failed(IActionResult result) =>
+        result is ObjectResult { StatusCode: >= 400 };
 }
@@ -1,8 +1,12 @@
 ﻿using Microsoft.AspNetCore.Mvc;
+using Microsoft.Extensions.Options;
 using Server.Models.Queries.Enums;
 using Server.Models.Requests;
 using Server.Models.Responses;
 using Server.Services;
+using System.Globalization;
+using System.Text.Json;
+using System.Threading.Channels;
 
 /// <summary>
 /// 
@@ -13,36 +17,174 @@ public class QueryBuilderController : ControllerBase
 {
     private readonly PostgresDbService _pgService;
     private readonly Neo4jDbService _neo4jService;
+    private readonly QueryShapeTracker _shapes;
+    private readonly FollowerCircleCache _circles;
+    private readonly IServiceScopeFactory _scopes;
+    private readonly JsonSerializerOptions _json;
 
     /// <summary>
     /// 
     /// </summary>
-    public QueryBuilderController(PostgresDbService pgService, Neo4jDbService neo4jService)
+    public QueryBuilderController(PostgresDbService pgService, Neo4jDbService neo4jService, QueryShapeTracker shapes, FollowerCircleCache circles,
+        IServiceScopeFactory scopes, IOptions<JsonOptions> json)
     {
         _pgService = pgService;
         _neo4jService = neo4jService;
+        _shapes = shapes;
+        _circles = circles;
+        _scopes = scopes;
+        _json = json.Value.JsonSerializerOptions;
     }
 
     /// <summary>
-    /// 
+    /// Execute the query on Postgres/Neo4j/Both (in parallel unless parallel=false)
     /// </summary>
     [HttpPost("execute")]
-    public async Task<ActionResult<List<PaginatedResult<dynamic>>>> Execute([FromBody] QueryBuilderRequest request, [FromQuery] Database targets = Database.Both)
+    public async Task<ActionResult<List<PaginatedResult<dynamic>>>> Execute([FromBody] QueryBuilderRequest request, [FromQuery] Database targets = Database.Both, [FromQuery] bool parallel = true)
+    {
+        var outcomes = await DatabaseTargets.RunAsync(targets, parallel,
+            () => _pgService.ExecuteQueryAsync(request),
+            () => _neo4jService.ExecuteQueryAsync(request));
+
+        var serverTiming = new List<string>();
+        var results = ToResults(request, outcomes, serverTiming);
+
+        Response.Headers["Server-Timing"] = string.Join(", ", serverTiming);
+        if (outcomes.All(o => o.Error is not null))
+            return StatusCode(StatusCodes.Status500InternalServerError, results);
+        return Ok(results);
+    }
+
+    /// <summary>
+    /// Execute several queries, at most maxParallelism at a time, on Postgres/Neo4j/Both.
+    /// The follower circles of the whole batch are resolved first, per backend, by one multi-source BFS
+    /// (overlapping circles share their traversal); each request then runs with its circle, so its
+    /// circleCache and traversal settings are ignored. Results are streamed as NDJSON, one QueryBatchItem
+    /// per line in completion order.
+    /// </summary>
+    [HttpPost("batch")]
+    public async Task<IActionResult> ExecuteBatch([FromBody] List<QueryBuilderRequest> requests, [FromQuery] Database targets = Database.Both,
+        [FromQuery] bool parallel = true, [FromQuery] int maxParallelism = 4)
     {
-        var results = new List<PaginatedResult<dynamic>> ();
+        if (requests.Count == 0)
+            return BadRequest("Empty batch");
+
+        var cancellation = HttpContext.RequestAborted;
+        var wanted = requests
+            .Where(r => r.UserId.HasValue && r.FollowingLevel > 0)
+            .Select(r => (r.UserId!.Value, r.FollowingLevel!.Value))
+            .Distinct()
+            .ToList();
+        var circles = await DatabaseTargets.RunAsync(targets, parallel,
+            () => _pgService.ResolveCirclesAsync(wanted),
+            () => _neo4jService.ResolveCirclesAsync(wanted));
 
-        if (targets == Database.Postgres || targets == Database.Both)
+        Response.Headers["Server-Timing"] = string.Join(", ", circles.Select(c =>
+            $"{(c.Database == Database.Postgres ? "pg" : "neo4j")}-circles;dur={c.ElapsedMs.ToString("0.###", CultureInfo.InvariantCulture)}"));
+        Response.ContentType = "application/x-ndjson";
+
+        var pgCircles = circles.FirstOrDefault(c => c.Database == Database.Postgres);
+        var neo4jCircles = circles.FirstOrDefault(c => c.Database == Database.Neo4j);
+        var completed = Channel.CreateUnbounded<QueryBatchItem>();
+        var options = new ParallelOptions { MaxDegreeOfParallelism = Math.Clamp(maxParallelism, 1, 64), CancellationToken = cancellation };
+
+        var producer = Task.Run(async () =>
+        {
+            try
+            {
+                await Parallel.ForEachAsync(Enumerable.Range(0, requests.Count), options, async (index, token) =>
+                {
+                    // Un scope par requête : le DbContext ne supporte pas les requêtes concurrentes
+                    await using var scope = _scopes.CreateAsyncScope();
+                    var pg = scope.ServiceProvider.GetRequiredService<PostgresDbService>();
+                    var neo4j = scope.ServiceProvider.GetRequiredService<Neo4jDbService>();
+                    var request = requests[index];
+
+                    var outcomes = await DatabaseTargets.RunAsync(targets, parallel,
+                        () => pg.ExecuteQueryAsync(request, CircleOf(pgCircles, request)),
+                        () => neo4j.ExecuteQueryAsync(request, CircleOf(neo4jCircles, request)));
+                    await completed.Writer.WriteAsync(new QueryBatchItem { Index = index, Results = ToResults(request, outcomes, []) }, token);
+                });
+                completed.Writer.Complete();
+            }
+            catch (Exception ex)
+            {
+                completed.Writer.Complete(ex);
+            }
+        });
+
+        await foreach (var item in completed.Reader.ReadAllAsync(cancellation))
         {
-            var pgResult = await _pgService.ExecuteQueryAsync(request);
-            results.Add(pgResult);
+            await JsonSerializer.SerializeAsync(Response.Body, item, _json, cancellation);
+            await Response.Body.WriteAsync("\n"u8.ToArray(), cancellation);
+            await Response.Body.FlushAsync(cancellation);
         }
+        await producer;
+        return new EmptyResult();
+    }
 
-        if (targets == Database.Neo4j || targets == Database.Both)
+    /// <summary>
+    /// One PaginatedResult per backend outcome (a failed backend carries its error), with its Server-Timing metrics
+    /// </summary>
+    private static List<PaginatedResult<dynamic>> ToResults(QueryBuilderRequest request,
+        List<BackendOutcome<PaginatedResult<dynamic>>> outcomes, List<string> serverTiming)
+    {
+        var results = new List<PaginatedResult<dynamic>>();
+        foreach (var outcome in outcomes)
         {
-            var neoResult = await _neo4jService.ExecuteQueryAsync(request);
-            results.Add(neoResult);
+            var result = outcome.Result ?? new PaginatedResult<dynamic>
+            {
+                Page = request.Page,
+                PageSize = request.PageSize,
+                Error = outcome.Error?.Message
+            };
+            result.Database = outcome.Database;
+            result.Timings ??= new QueryTimings();
+            result.Timings.TotalMs = outcome.ElapsedMs;
+            results.Add(result);
+            serverTiming.AddRange(result.Timings.ToServerTiming(outcome.Database == Database.Postgres ? "pg" : "neo4j"));
         }
+        return results;
+    }
 
-        return Ok(results);
+    /// <summary>
+    /// Circle of request in a backend's batch circles, null when the request has none.
+    /// Throws when that backend failed to resolve the circles: the request fails on this backend only.
+    /// </summary>
+    private static Guid[]? CircleOf(BackendOutcome<Dictionary<(Guid UserId, int Level), Guid[]>>? circles, QueryBuilderRequest request)
+    {
+        if (!(request.UserId.HasValue && request.FollowingLevel > 0))
+            return null;
+        if (circles?.Result is null)
+            throw new InvalidOperationException($"Follower circles not resolved: {circles?.Error?.Message}");
+        return circles.Result[(request.UserId.Value, request.FollowingLevel.Value)];
+    }
+
+    /// <summary>
+    /// Query shape reuse per backend since startup (shapes already executed by this process / executions)
+    /// </summary>
+    [HttpGet("shape-stats")]
+    public ActionResult<Dictionary<string, QueryShapeStats>> ShapeStats()
+    {
+        return Ok(_shapes.Snapshot());
+    }
+
+    /// <summary>
+    /// Follower circle cache counters per backend
+    /// </summary>
+    [HttpGet("circle-cache")]
+    public ActionResult<Dictionary<string, CircleCacheStats>> CircleCache()
+    {
+        return Ok(_circles.Snapshot());
+    }
+
+    /// <summary>
+    /// Empty the follower circle cache (e.g. after wiping the databases)
+    /// </summary>
+    [HttpDelete("circle-cache")]
+    public IActionResult ClearCircleCache()
+    {
+        _circles.Clear();
+        return NoContent();
     }
 }
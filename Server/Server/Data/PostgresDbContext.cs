@@ -29,6 +29,16 @@ public class PostgresDbContext(DbContextOptions<PostgresDbContext> options) : Db
     /// </summary>
     public DbSet<Order> Orders { get; set; }
 
+    /// <summary>
+    /// UserPurchases DbSet (distinct user → article)
+    /// </summary>
+    public DbSet<UserPurchase> UserPurchases { get; set; }
+
+    /// <summary>
+    /// ArticleBuyerStats DbSet (distinct buyers per article)
+    /// </summary>
+    public DbSet<ArticleBuyerStats> ArticleBuyerStats { get; set; }
+
     /// <summary>
     /// 
     /// </summary>
@@ -37,6 +47,15 @@ public class PostgresDbContext(DbContextOptions<PostgresDbContext> options) : Db
     {
         base.OnModelCreating(modelBuilder);
 
+        modelBuilder.Entity<User>(entity =>
+        {
+            entity.ToTable("Users");
+
+            // Tri / filtre sur les compteurs : parcours d'index dans l'ordre de la pagination (compteur, Id)
+            entity.HasIndex(u => new { u.FollowersCount, u.Id });
+            entity.HasIndex(u => new { u.FollowingCount, u.Id });
+        });
+
         modelBuilder.Entity<UserFollow>(entity =>
         {
             entity.ToTable("UserFollows");
@@ -70,5 +89,17 @@ public class PostgresDbContext(DbContextOptions<PostgresDbContext> options) : Db
         {
             entity.ToTable("Articles");
         });
+
+        modelBuilder.Entity<UserPurchase>(entity =>
+        {
+            entity.ToTable("UserPurchases");
+            entity.HasKey(p => new { p.UserId, p.ArticleId });
+        });
+
+        modelBuilder.Entity<ArticleBuyerStats>(entity =>
+        {
+            entity.ToTable("ArticleBuyerStats");
+            entity.HasKey(s => s.ArticleId);
+        });
     }
 }
\ No newline at end of file
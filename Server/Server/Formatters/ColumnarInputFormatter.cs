@@ -0,0 +1,222 @@
+﻿using Microsoft.AspNetCore.Mvc.Formatters;
+using Microsoft.Net.Http.Headers;
+using Server.Models.Dtos;
+using System.Buffers.Binary;
+using System.Text;
+
+namespace Server.Formatters;
+
+/// <summary>
+/// Compact columnar binary body reader for the DataSeeder bulk endpoints.
+/// </summary>
+/// <remarks>
+/// Layout (little-endian) :
+/// <code>
+/// header   : "NSQC" | version u8 (1) | entity u8 | reserved u16 | rowCount u32
+/// articles : id uuid[n] | price f64[n] | name str[n]
+/// users    : id uuid[n] | userName str[n] | email str[n]
+/// orders   : id uuid[n] | userId uuid[n] | articleId uuid[n] | quantity i32[n] | totalPrice f64[n]
+/// follows  : followerId uuid[n] | followingId uuid[n]
+/// </code>
+/// A uuid is 16 raw bytes in RFC 4122 (big-endian) order. A str column is
+/// offsets u32[n + 1] followed by the concatenated UTF-8 bytes.
+/// </remarks>
+public class ColumnarInputFormatter : InputFormatter
+{
+    /// <summary>
+    /// Content type selecting this formatter
+    /// </summary>
+    public const string ContentType = "application/vnd.nosqlproject.columnar";
+
+    private const byte Version = 1;
+    private const int HeaderSize = 12;
+    private static readonly byte[] Magic = "NSQC"u8.ToArray();
+
+    private static readonly Dictionary<Type, byte> EntityCodes = new()
+    {
+        [typeof(List<ArticleDto>)] = 0,
+        [typeof(List<UserDto>)] = 1,
+        [typeof(List<OrderDto>)] = 2,
+        [typeof(List<FollowDto>)] = 3,
+    };
+
+    /// <summary>
+    /// 
+    /// </summary>
+    public ColumnarInputFormatter()
+    {
+        SupportedMediaTypes.Add(MediaTypeHeaderValue.Parse(ContentType));
+    }
+
+    /// <inheritdoc />
+    protected override bool CanReadType(Type type) => EntityCodes.ContainsKey(type);
+
+    /// <inheritdoc />
+    public override async Task<InputFormatterResult> ReadRequestBodyAsync(InputFormatterContext context)
+    {
+        using var buffer = new MemoryStream();
+        await context.HttpContext.Request.Body.CopyToAsync(buffer);
+
+        try
+        {
+            var reader = new ColumnarReader(buffer.GetBuffer().AsMemory(0, (int)buffer.Length));
+            var count = reader.ReadHeader(EntityCodes[context.ModelType]);
+
+            object items = context.ModelType switch
+            {
+                var t when t == typeof(List<ArticleDto>) => ReadArticles(reader, count),
+                var t when t == typeof(List<UserDto>) => ReadUsers(reader, count),
+                var t when t == typeof(List<OrderDto>) => ReadOrders(reader, count),
+                _ => ReadFollows(reader, count)
+            };
+
+            reader.EnsureConsumed();
+            return await InputFormatterResult.SuccessAsync(items);
+        }
+        catch (Exception ex) when (ex is FormatException or OverflowException)
+        {
+            context.ModelState.TryAddModelError(context.ModelName, $"Columnar body: {ex.Message}");
+            return await InputFormatterResult.FailureAsync();
+        }
+    }
+
+    private static List<ArticleDto> ReadArticles(ColumnarReader reader, int count)
+    {
+        var ids = reader.ReadGuids(count);
+        var prices = reader.ReadDoubles(count);
+        var names = reader.ReadStrings(count);
+
+        var articles = new List<ArticleDto>(count);
+        for (int i = 0; i < count; i++)
+            articles.Add(new ArticleDto(ids[i], names[i], (decimal)prices[i]));
+        return articles;
+    }
+
+    private static List<UserDto> ReadUsers(ColumnarReader reader, int count)
+    {
+        var ids = reader.ReadGuids(count);
+        var userNames = reader.ReadStrings(count);
+        var emails = reader.ReadStrings(count);
+
+        var users = new List<UserDto>(count);
+        for (int i = 0; i < count; i++)
+            users.Add(new UserDto(ids[i], userNames[i], emails[i]));
+        return users;
+    }
+
+    private static List<OrderDto> ReadOrders(ColumnarReader reader, int count)
+    {
+        var ids = reader.ReadGuids(count);
+        var userIds = reader.ReadGuids(count);
+        var articleIds = reader.ReadGuids(count);
+        var quantities = reader.ReadInt32s(count);
+        var totalPrices = reader.ReadDoubles(count);
+
+        var orders = new List<OrderDto>(count);
+        for (int i = 0; i < count; i++)
+            orders.Add(new OrderDto(ids[i], userIds[i], articleIds[i], quantities[i], (decimal)totalPrices[i]));
+        return orders;
+    }
+
+    private static List<FollowDto> ReadFollows(ColumnarReader reader, int count)
+    {
+        var followerIds = reader.ReadGuids(count);
+        var followingIds = reader.ReadGuids(count);
+
+        var follows = new List<FollowDto>(count);
+        for (int i = 0; i < count; i++)
+            follows.Add(new FollowDto(followerIds[i], followingIds[i]));
+        return follows;
+    }
+
+    /// <summary>
+    /// Sequential reader over the buffered body, validating every length before slicing
+    /// </summary>
+    private sealed class ColumnarReader(ReadOnlyMemory<byte> body)
+    {
+        private int _position;
+
+        public int ReadHeader(byte expectedEntity)
+        {
+            var header = Take(HeaderSize);
+            if (!header[..4].SequenceEqual(Magic))
+                throw new FormatException("bad magic, expected NSQC");
+            if (header[4] != Version)
+                throw new FormatException($"unsupported version {header[4]}");
+            if (header[5] != expectedEntity)
+                throw new FormatException($"entity code {header[5]} does not match endpoint ({expectedEntity})");
+
+            var count = BinaryPrimitives.ReadUInt32LittleEndian(header[8..]);
+            if (count > int.MaxValue)
+                throw new FormatException("row count too large");
+            return (int)count;
+        }
+
+        public Guid[] ReadGuids(int count)
+        {
+            var column = Take(checked(count * 16));
+            var guids = new Guid[count];
+            for (int i = 0; i < count; i++)
+                guids[i] = new Guid(column.Slice(i * 16, 16), bigEndian: true);
+            return guids;
+        }
+
+        public double[] ReadDoubles(int count)
+        {
+            var column = Take(checked(count * 8));
+            var values = new double[count];
+            for (int i = 0; i < count; i++)
+                values[i] = BinaryPrimitives.ReadDoubleLittleEndian(column[(i * 8)..]);
+            return values;
+        }
+
+        public int[] ReadInt32s(int count)
+        {
+            var column = Take(checked(count * 4));
+            var values = new int[count];
+            for (int i = 0; i < count; i++)
+                values[i] = BinaryPrimitives.ReadInt32LittleEndian(column[(i * 4)..]);
+            return values;
+        }
+
+        public string[] ReadStrings(int count)
+        {
+            var offsets = ReadOffsets(count + 1);
+            var data = Take((int)offsets[count]);
+            var values = new string[count];
+            for (int i = 0; i < count; i++)
+                values[i] = Encoding.UTF8.GetString(data[(int)offsets[i]..(int)offsets[i + 1]]);
+            return values;
+        }
+
+        public void EnsureConsumed()
+        {
+            if (_position != body.Length)
+                throw new FormatException($"{body.Length - _position} trailing bytes");
+        }
+
+        private uint[] ReadOffsets(int count)
+        {
+            var column = Take(checked(count * 4));
+            var offsets = new uint[count];
+            for (int i = 0; i < count; i++)
+            {
+                offsets[i] = BinaryPrimitives.ReadUInt32LittleEndian(column[(i * 4)..]);
+                if (i > 0 && offsets[i] < offsets[i - 1])
+                    throw new FormatException("string offsets are not increasing");
+            }
+            if (offsets[0] != 0 || offsets[^1] > int.MaxValue)
+                throw new FormatException("invalid string offsets");
+            return offsets;
+        }
+
+        private ReadOnlySpan<byte> Take(int length)
+        {
+            if (length < 0 || length > body.Length - _position)
+                throw new FormatException("body truncated");
+            var slice = body.Span.Slice(_position, length);
+            _position += length;
+            return slice;
+        }
+    }
+}
@@ -0,0 +1,70 @@
+﻿using Microsoft.AspNetCore.Mvc;
+using Microsoft.AspNetCore.Mvc.Formatters;
+using Microsoft.Extensions.Options;
+using Microsoft.Net.Http.Headers;
+using Server.Models.Dtos;
+using System.Collections;
+using System.Text;
+using System.Text.Json;
+
+namespace Server.Formatters;
+
+/// <summary>
+/// NDJSON (one JSON object per line) body reader for the DataSeeder bulk endpoints.
+/// The body is consumed line by line, so chunked uploads never need to be buffered whole.
+/// </summary>
+public class NdjsonInputFormatter : TextInputFormatter
+{
+    /// <summary>
+    /// Content type selecting this formatter
+    /// </summary>
+    public const string ContentType = "application/x-ndjson";
+
+    private static readonly Type[] SupportedTypes =
+    {
+        typeof(List<ArticleDto>), typeof(List<UserDto>), typeof(List<OrderDto>), typeof(List<FollowDto>)
+    };
+
+    /// <summary>
+    /// 
+    /// </summary>
+    public NdjsonInputFormatter()
+    {
+        SupportedMediaTypes.Add(MediaTypeHeaderValue.Parse(ContentType));
+        SupportedEncodings.Add(Encoding.UTF8);
+    }
+
+    /// <inheritdoc />
+    protected override bool CanReadType(Type type) => SupportedTypes.Contains(type);
+
+    /// <inheritdoc />
+    public override async Task<InputFormatterResult> ReadRequestBodyAsync(InputFormatterContext context, Encoding encoding)
+    {
+        var elementType = context.ModelType.GetGenericArguments()[0];
+        var options = context.HttpContext.RequestServices.GetRequiredService<IOptions<JsonOptions>>().Value.JsonSerializerOptions;
+        var items = (IList)Activator.CreateInstance(context.ModelType)!;
+
+        using var reader = new StreamReader(context.HttpContext.Request.Body, encoding);
+        var lineNumber = 0;
+        string? line;
+
+        while ((line = await reader.ReadLineAsync()) != null)
+        {
+            lineNumber++;
+            if (string.IsNullOrWhiteSpace(line))
+                continue;
+
+            try
+            {
+                items.Add(JsonSerializer.Deserialize(line, elementType, options));
+            }
+            catch (JsonException ex)
+            {
+                context.ModelState.TryAddModelError(context.ModelName, $"NDJSON line {lineNumber}: {ex.Message}");
+                return await InputFormatterResult.FailureAsync();
+            }
+        }
+
+        return await InputFormatterResult.SuccessAsync(items);
+    }
+}
@@ -0,0 +1,58 @@
+﻿using System;
+using Microsoft.EntityFrameworkCore.Migrations;
+
+#nullable disable
+
+namespace Server.Migrations
+{
+    /// <inheritdoc />
+    public partial class AddViralAggregates : Migration
+    {
+        /// <inheritdoc />
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.CreateTable(
+                name: "ArticleBuyerStats",
+                columns: table => new
+                {
+                    ArticleId = table.Column<Guid>(type: "uuid", nullable: false),
+                    Buyers = table.Column<int>(type: "integer", nullable: false)
+                },
+                constraints: table =>
+                {
+                    table.PrimaryKey("PK_ArticleBuyerStats", x => x.ArticleId);
+                });
+
+            migrationBuilder.CreateTable(
+                name: "UserPurchases",
+                columns: table => new
+                {
+                    UserId = table.Column<Guid>(type: "uuid", nullable: false),
+                    ArticleId = table.Column<Guid>(type: "uuid", nullable: false)
+                },
+                constraints: table =>
+                {
+                    table.PrimaryKey("PK_UserPurchases", x => new { x.UserId, x.ArticleId });
+                });
+
+            // Commandes déjà importées : les imports suivants maintiennent les agrégats
+            migrationBuilder.Sql("""
+                INSERT INTO "UserPurchases" ("UserId", "ArticleId")
+                SELECT DISTINCT "UserId", "ArticleId" FROM "Orders";
+
+                INSERT INTO "ArticleBuyerStats" ("ArticleId", "Buyers")
+                SELECT "ArticleId", count(*) FROM "UserPurchases" GROUP BY "ArticleId";
+                """);
+        }
+
+        /// <inheritdoc />
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropTable(
+                name: "ArticleBuyerStats");
+
+            migrationBuilder.DropTable(
+                name: "UserPurchases");
+        }
+    }
+}
@@ -0,0 +1,74 @@
+﻿using Microsoft.EntityFrameworkCore.Migrations;
+
+#nullable disable
+
+namespace Server.Migrations
+{
+    /// <inheritdoc />
+    public partial class AddFollowCounters : Migration
+    {
+        /// <inheritdoc />
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.AddColumn<int>(
+                name: "FollowersCount",
+                table: "Users",
+                type: "integer",
+                nullable: false,
+                defaultValue: 0);
+
+            migrationBuilder.AddColumn<int>(
+                name: "FollowingCount",
+                table: "Users",
+                type: "integer",
+                nullable: false,
+                defaultValue: 0);
+
+            // Graphe déjà importé : les imports suivants maintiennent les compteurs
+            migrationBuilder.Sql("""
+                UPDATE "Users" u
+                SET "FollowersCount" = c.followers, "FollowingCount" = c.following
+                FROM (
+                    SELECT id, count(*) FILTER (WHERE followed) AS followers, count(*) FILTER (WHERE NOT followed) AS following
+                    FROM (
+                        SELECT "FollowingId" AS id, true AS followed FROM "UserFollows"
+                        UNION ALL
+                        SELECT "FollowerId", false FROM "UserFollows"
+                    ) edges
+                    GROUP BY id
+                ) c
+                WHERE u."Id" = c.id;
+                """);
+
+            migrationBuilder.CreateIndex(
+                name: "IX_Users_FollowersCount_Id",
+                table: "Users",
+                columns: new[] { "FollowersCount", "Id" });
+
+            migrationBuilder.CreateIndex(
+                name: "IX_Users_FollowingCount_Id",
+                table: "Users",
+                columns: new[] { "FollowingCount", "Id" });
+        }
+
+        /// <inheritdoc />
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropIndex(
+                name: "IX_Users_FollowersCount_Id",
+                table: "Users");
+
+            migrationBuilder.DropIndex(
+                name: "IX_Users_FollowingCount_Id",
+                table: "Users");
+
+            migrationBuilder.DropColumn(
+                name: "FollowersCount",
+                table: "Users");
+
+            migrationBuilder.DropColumn(
+                name: "FollowingCount",
+                table: "Users");
+        }
+    }
+}
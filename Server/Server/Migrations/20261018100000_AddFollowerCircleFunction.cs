@@ -0,0 +1,54 @@
+﻿using Microsoft.EntityFrameworkCore.Migrations;
+
+#nullable disable
+
+namespace Server.Migrations
+{
+    /// <inheritdoc />
+    public partial class AddFollowerCircleFunction : Migration
+    {
+        /// <inheritdoc />
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            // Cercle de followers en BFS : chaque user n'est retenu qu'une fois (à son niveau le plus proche)
+            // et seuls les nouveaux venus d'un niveau sont étendus au suivant. Ensemble des users vus dans
+            // un tableau local (anti-jointure sur unnest) : ni table temporaire ni écriture, la fonction
+            // est STABLE et tourne aussi sur un réplica en lecture
+            migrationBuilder.Sql("""
+                CREATE OR REPLACE FUNCTION follower_circle(root uuid, levels integer)
+                RETURNS TABLE (user_id uuid, depth integer)
+                LANGUAGE plpgsql STABLE AS $$
+                DECLARE
+                    level integer := 1;
+                    frontier uuid[];
+                    visited uuid[];
+                BEGIN
+                    SELECT array_agg(DISTINCT f."FollowingId") INTO frontier
+                    FROM "UserFollows" f
+                    WHERE f."FollowerId" = root;
+                    visited := frontier;
+
+                    -- array_agg sans ligne renvoie NULL : plus personne de nouveau à étendre
+                    WHILE frontier IS NOT NULL AND level <= levels LOOP
+                        RETURN QUERY SELECT id, level FROM unnest(frontier) AS id;
+                        EXIT WHEN level = levels;
+
+                        SELECT array_agg(DISTINCT f."FollowingId") INTO frontier
+                        FROM unnest(frontier) AS current(id)
+                        JOIN "UserFollows" f ON f."FollowerId" = current.id
+                        WHERE NOT EXISTS (SELECT 1 FROM unnest(visited) AS seen(id) WHERE seen.id = f."FollowingId");
+                        visited := visited || frontier;
+                        level := level + 1;
+                    END LOOP;
+                END;
+                $$;
+                """);
+        }
+
+        /// <inheritdoc />
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.Sql("DROP FUNCTION IF EXISTS follower_circle(uuid, integer);");
+        }
+    }
+}
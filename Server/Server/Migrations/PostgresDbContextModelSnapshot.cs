@@ -40,6 +40,20 @@ namespace Server.Migrations
                     b.ToTable("Articles", (string)null);
                 });
 
+            modelBuilder.Entity("Server.Models.Domains.ArticleBuyerStats", b =>
+                {
+                    b.Property<Guid>("ArticleId")
+                        .ValueGeneratedOnAdd()
+                        .HasColumnType("uuid");
+
+                    b.Property<int>("Buyers")
+                        .HasColumnType("integer");
+
+                    b.HasKey("ArticleId");
+
+                    b.ToTable("ArticleBuyerStats", (string)null);
+                });
+
             modelBuilder.Entity("Server.Models.Domains.Order", b =>
                 {
                     b.Property<Guid>("Id")
@@ -74,12 +88,22 @@ namespace Server.Migrations
                         .IsRequired()
                         .HasColumnType("text");
 
+                    b.Property<int>("FollowersCount")
+                        .HasColumnType("integer");
+
+                    b.Property<int>("FollowingCount")
+                        .HasColumnType("integer");
+
                     b.Property<string>("Name")
                         .IsRequired()
                         .HasColumnType("text");
 
                     b.HasKey("Id");
 
+                    b.HasIndex("FollowersCount", "Id");
+
+                    b.HasIndex("FollowingCount", "Id");
+
                     b.ToTable("Users");
                 });
 
@@ -98,6 +122,19 @@ namespace Server.Migrations
                     b.ToTable("UserFollows", (string)null);
                 });
 
+            modelBuilder.Entity("Server.Models.Domains.UserPurchase", b =>
+                {
+                    b.Property<Guid>("UserId")
+                        .HasColumnType("uuid");
+
+                    b.Property<Guid>("ArticleId")
+                        .HasColumnType("uuid");
+
+                    b.HasKey("UserId", "ArticleId");
+
+                    b.ToTable("UserPurchases", (string)null);
+                });
+
             modelBuilder.Entity("Server.Models.Domains.Order", b =>
                 {
                     b.HasOne("Server.Models.Domains.Article", "Article")
@@ -0,0 +1,14 @@
+﻿namespace Server.Models.Domains
+{
+    /// <summary>
+    /// Number of distinct buyers of an article, maintained by the orders bulk import
+    /// </summary>
+    public class ArticleBuyerStats
+    {
+        /// Article ID
+        public Guid ArticleId { get; set; }
+
+        /// Distinct users who ordered the article
+        public int Buyers { get; set; }
+    }
+}
@@ -12,6 +12,12 @@
         /// User email
         public string Email { get; set; } = null!;
 
+        /// Number of followers (maintained by the social graph import)
+        public int FollowersCount { get; set; }
+
+        /// Number of followed users (maintained by the social graph import)
+        public int FollowingCount { get; set; }
+
         /// Followers
         public List<UserFollow> Followers { get; set; } = new();
 
@@ -0,0 +1,14 @@
+﻿namespace Server.Models.Domains
+{
+    /// <summary>
+    /// Distinct (user, article) purchase, maintained by the orders bulk import
+    /// </summary>
+    public class UserPurchase
+    {
+        /// Composite key of UserId and ArticleId
+        public Guid UserId { get; set; }
+
+        /// Composite key of UserId and ArticleId
+        public Guid ArticleId { get; set; }
+    }
+}
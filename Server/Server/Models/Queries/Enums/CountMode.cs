@@ -0,0 +1,26 @@
+﻿using System.Text.Json.Serialization;
+
+namespace Server.Models.Requests.Enums;
+
+/// <summary>
+/// How PaginatedResult.TotalCount is computed
+/// </summary>
+[JsonConverter(typeof(JsonStringEnumConverter<CountMode>))]
+public enum CountMode
+{
+    /// <summary>
+    /// Full count of the matching rows (second query over the whole result set)
+    /// </summary>
+    Exact,
+
+    /// <summary>
+    /// No count: TotalCount is null, use NextCursor / HasNextPage to page
+    /// </summary>
+    Skip,
+
+    /// <summary>
+    /// Count stopped at QueryBuilderRequest.EstimateCountCap rows: exact below the cap,
+    /// otherwise TotalCount is the cap and TotalCountIsEstimate is set
+    /// </summary>
+    Estimate,
+}
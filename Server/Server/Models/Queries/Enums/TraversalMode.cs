@@ -0,0 +1,22 @@
+﻿using System.Text.Json.Serialization;
+
+namespace Server.Models.Requests.Enums;
+
+/// <summary>
+/// How the follower circle (FollowingLevel) is resolved
+/// </summary>
+[JsonConverter(typeof(JsonStringEnumConverter<TraversalMode>))]
+public enum TraversalMode
+{
+    /// <summary>
+    /// Set-based expansion, deduplicated at each level, inside the database:
+    /// follower_circle BFS over a visited set (Postgres), ANY SHORTEST path per reached user (Neo4j)
+    /// </summary>
+    SetBased,
+
+    /// <summary>
+    /// Original strategy: one round trip per level with the id set sent back (Postgres),
+    /// variable-length path enumeration -[:FOLLOWS*1..n]-> (Neo4j)
+    /// </summary>
+    Legacy,
+}
@@ -1,6 +1,7 @@
 ﻿using Microsoft.EntityFrameworkCore.Metadata.Internal;
 using Server.Models.Requests.Enums;
 using Server.Models.Requests.Enums.Fields;
+using System.Text.Json;
 using System.Text.Json.Serialization;
 
 namespace Server.Models.Requests;
@@ -31,6 +32,15 @@ public record QueryBuilderRequest
     /// </summary>
     public Guid? UserId { get; init; }
     /// <summary>
+    /// Follower circle resolution strategy
+    /// </summary>
+    public TraversalMode Traversal { get; init; } = TraversalMode.SetBased;
+    /// <summary>
+    /// Use the server's follower circle cache instead of the in-database traversal (opt-in: the cache
+    /// ships the circle to the database as a parameter). Ignored with Traversal = Legacy
+    /// </summary>
+    public bool CircleCache { get; init; }
+    /// <summary>
     /// 
     /// </summary>
     public string? SelectFields { get; init; }
@@ -52,4 +62,31 @@ public record QueryBuilderRequest
     /// 
     /// </summary>
     public int PageSize { get; init; } = 20;
+    /// <summary>
+    /// Keyset pagination: NextCursor of the previous page. When set, Page is ignored
+    /// and the page starts right after the cursor's (sort key, id)
+    /// </summary>
+    public string? Cursor { get; init; }
+    /// <summary>
+    /// Exact, skipped or capped total count
+    /// </summary>
+    public CountMode CountMode { get; init; } = CountMode.Exact;
+
+    /// <summary>
+    /// Rows counted at most by CountMode.Estimate
+    /// </summary>
+    public const int EstimateCountCap = 10_000;
+
+    /// <summary>
+    /// OrderByField as the entity's OrderBy enum (JSON number or name), null when absent or unknown
+    /// </summary>
+    public TEnum? OrderByAs<TEnum>() where TEnum : struct, Enum => OrderByField switch
+    {
+        TEnum value => value,
+        JsonElement { ValueKind: JsonValueKind.Number } number when number.TryGetInt32(out var index)
+            && Enum.IsDefined(typeof(TEnum), index) => (TEnum)Enum.ToObject(typeof(TEnum), index),
+        JsonElement { ValueKind: JsonValueKind.String } name when Enum.TryParse<TEnum>(name.GetString(), true, out var parsed) => parsed,
+        string name when Enum.TryParse<TEnum>(name, true, out var parsed) => parsed,
+        _ => null
+    };
 }
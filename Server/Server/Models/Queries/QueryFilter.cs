@@ -1,5 +1,6 @@
 ﻿using Microsoft.EntityFrameworkCore.Metadata.Internal;
 using Server.Models.Requests.Enums;
+using System.Text.Json;
 
 namespace Server.Models.Requests;
 
@@ -22,4 +23,14 @@ public record QueryFilter
     /// 
     /// </summary>
     public object? Value { get; init; }
+
+    /// <summary>
+    /// Value as an integer (JSON number or numeric string), for the count fields
+    /// </summary>
+    public int IntValue() => Value switch
+    {
+        JsonElement { ValueKind: JsonValueKind.Number } number => number.GetInt32(),
+        JsonElement element => int.Parse(element.ToString()),
+        _ => Convert.ToInt32(Value)
+    };
 }
\ No newline at end of file
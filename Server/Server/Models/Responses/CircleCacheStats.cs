@@ -0,0 +1,48 @@
+﻿namespace Server.Models.Responses
+{
+    /// <summary>
+    /// Follower circle cache counters for one backend
+    /// </summary>
+    public class CircleCacheStats
+    {
+        /// <summary>
+        /// Circles served from the cache
+        /// </summary>
+        public long Hits { get; set; }
+
+        /// <summary>
+        /// Circles not cached at the requested level
+        /// </summary>
+        public long Misses { get; set; }
+
+        /// <summary>
+        /// Misses resolved from a cached lower level (only the missing hops were queried)
+        /// </summary>
+        public long Extended { get; set; }
+
+        /// <summary>
+        /// Entries dropped to stay under the size budget (least recently used first)
+        /// </summary>
+        public long Evictions { get; set; }
+
+        /// <summary>
+        /// Entries dropped because new FOLLOWS edges changed them
+        /// </summary>
+        public long Invalidations { get; set; }
+
+        /// <summary>
+        /// Hits / (Hits + Misses)
+        /// </summary>
+        public double HitRate => Hits + Misses == 0 ? 0 : (double)Hits / (Hits + Misses);
+
+        /// <summary>
+        /// Cached (user, level) circles
+        /// </summary>
+        public int Entries { get; set; }
+
+        /// <summary>
+        /// User ids held by the entries (16 bytes each)
+        /// </summary>
+        public long StoredIds { get; set; }
+    }
+}
@@ -0,0 +1,48 @@
+﻿namespace Server.Models.Responses
+{
+    /// <summary>
+    /// One write transaction of a Neo4j bulk import
+    /// </summary>
+    public class ImportBatchTiming
+    {
+        /// <summary>
+        /// Batch number, in start order
+        /// </summary>
+        public int Batch { get; set; }
+
+        /// <summary>
+        /// Round of the schedule: the partitions of a round share no node and run in parallel
+        /// </summary>
+        public int Round { get; set; }
+
+        /// <summary>
+        /// Partition written by the batch ("3" for a node group, "2-5" for a pair of groups)
+        /// </summary>
+        public string Partition { get; set; } = "";
+
+        /// <summary>
+        /// Rows sent in the batch
+        /// </summary>
+        public int Rows { get; set; }
+
+        /// <summary>
+        /// Nodes + relationships created by the batch
+        /// </summary>
+        public int Created { get; set; }
+
+        /// <summary>
+        /// Times the transaction ran: 1, plus one per transient error retried by the driver
+        /// </summary>
+        public int Attempts { get; set; }
+
+        /// <summary>
+        /// Attempts rolled back by a Neo4j deadlock
+        /// </summary>
+        public int Deadlocks { get; set; }
+
+        /// <summary>
+        /// Write transaction duration, retries included
+        /// </summary>
+        public double Ms { get; set; }
+    }
+}
@@ -1,4 +1,6 @@
-﻿namespace Server.Models.Responses
+﻿using Server.Models.Queries.Enums;
+
+namespace Server.Models.Responses
 {
     /// <summary>
     /// Paginated result container
@@ -11,9 +13,19 @@
         public List<T> Items { get; set; } = new();
 
         /// <summary>
-        /// Total number of items
+        /// Total number of items (null when the request used CountMode.Skip)
+        /// </summary>
+        public int? TotalCount { get; set; }
+
+        /// <summary>
+        /// TotalCount stopped at the CountMode.Estimate cap: the real total is at least TotalCount
         /// </summary>
-        public int TotalCount { get; set; }
+        public bool TotalCountIsEstimate { get; set; }
+
+        /// <summary>
+        /// Cursor to send as QueryBuilderRequest.Cursor for the next page, null on the last page
+        /// </summary>
+        public string? NextCursor { get; set; }
 
         /// <summary>
         /// Current page number (1-based)
@@ -31,14 +43,29 @@
         public long RequestTimeInMilliseconds { get; set; }
 
         /// <summary>
-        /// Total number of pages
+        /// Server-side timing breakdown
+        /// </summary>
+        public QueryTimings? Timings { get; set; }
+
+        /// <summary>
+        /// Backend that produced this result
+        /// </summary>
+        public Database? Database { get; set; }
+
+        /// <summary>
+        /// Error message when this backend failed (the other backend's result is unaffected)
+        /// </summary>
+        public string? Error { get; set; }
+
+        /// <summary>
+        /// Total number of pages (null without count)
         /// </summary>
-        public int TotalPages => (TotalCount + PageSize - 1) / PageSize;
+        public int? TotalPages => (TotalCount + PageSize - 1) / PageSize;
 
         /// <summary>
         /// Whether there is a next page
         /// </summary>
-        public bool HasNextPage => Page < TotalPages;
+        public bool HasNextPage => NextCursor is not null;
 
         /// <summary>
         /// Whether there is a previous page
@@ -0,0 +1,18 @@
+﻿namespace Server.Models.Responses
+{
+    /// <summary>
+    /// One line of the batch response: the results of one request, sent as soon as they are ready
+    /// </summary>
+    public class QueryBatchItem
+    {
+        /// <summary>
+        /// Position of the request in the batch
+        /// </summary>
+        public int Index { get; set; }
+
+        /// <summary>
+        /// One result per backend, Postgres first (same as /execute)
+        /// </summary>
+        public List<PaginatedResult<dynamic>> Results { get; set; } = new();
+    }
+}
@@ -0,0 +1,29 @@
+﻿namespace Server.Models.Responses
+{
+    /// <summary>
+    /// Query shape reuse for one backend, as seen by this server process. A reused shape is a query text / shape
+    /// already executed since startup; it is not a planner cache hit (the backend may have evicted the plan)
+    /// </summary>
+    public class QueryShapeStats
+    {
+        /// <summary>
+        /// Queries executed
+        /// </summary>
+        public long Executions { get; set; }
+
+        /// <summary>
+        /// Queries whose shape had already been executed
+        /// </summary>
+        public long Reused { get; set; }
+
+        /// <summary>
+        /// Reused / Executions
+        /// </summary>
+        public double ReuseRate => Executions == 0 ? 0 : (double)Reused / Executions;
+
+        /// <summary>
+        /// Distinct shapes seen
+        /// </summary>
+        public int DistinctShapes { get; set; }
+    }
+}
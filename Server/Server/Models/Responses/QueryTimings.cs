@@ -0,0 +1,90 @@
+﻿using System.Diagnostics;
+using System.Globalization;
+
+namespace Server.Models.Responses
+{
+    /// <summary>
+    /// Server-side breakdown of a QueryBuilder execution, in milliseconds
+    /// </summary>
+    public class QueryTimings
+    {
+        /// <summary>
+        /// Query construction (LINQ / Cypher), excluding database round-trips
+        /// </summary>
+        public double BuildMs { get; set; }
+
+        /// <summary>
+        /// Follower circle traversal, when it runs as a separate step
+        /// </summary>
+        public double TraversalMs { get; set; }
+
+        /// <summary>
+        /// Paginated data query
+        /// </summary>
+        public double DataQueryMs { get; set; }
+
+        /// <summary>
+        /// Separate count query
+        /// </summary>
+        public double CountQueryMs { get; set; }
+
+        /// <summary>
+        /// Conversion of database rows/records into response items
+        /// </summary>
+        public double MaterializationMs { get; set; }
+
+        /// <summary>
+        /// Wall time of this backend, as measured by the controller
+        /// </summary>
+        public double TotalMs { get; set; }
+
+        /// <summary>
+        /// Number of items returned in the page
+        /// </summary>
+        public int RowsReturned { get; set; }
+
+        /// <summary>
+        /// Users reached by the traversal step, when known
+        /// </summary>
+        public int? TraversedUsers { get; set; }
+
+        /// <summary>
+        /// Whether this process had already executed the data and count query shapes
+        /// (not a backend plan cache hit)
+        /// </summary>
+        public bool? QueryShapeReuse { get; set; }
+
+        /// <summary>
+        /// Whether the follower circle came from the circle cache without any query (null when not used)
+        /// </summary>
+        public bool? CircleCacheHit { get; set; }
+
+        /// <summary>
+        /// Server-Timing metrics (RFC: name;dur=ms), prefixed by backend
+        /// </summary>
+        public IEnumerable<string> ToServerTiming(string prefix)
+        {
+            yield return Metric(prefix, "build", BuildMs);
+            if (TraversedUsers.HasValue)
+                yield return Metric(prefix, "traversal", TraversalMs);
+            yield return Metric(prefix, "data", DataQueryMs);
+            yield return Metric(prefix, "count", CountQueryMs);
+            yield return Metric(prefix, "materialize", MaterializationMs);
+            yield return Metric(prefix, "total", TotalMs);
+            yield return $"{prefix}-rows;desc=\"{RowsReturned}\"";
+        }
+
+        /// <summary>
+        /// Elapsed ms since the last lap, then restarts the stopwatch
+        /// </summary>
+        public static double Lap(Stopwatch stopwatch)
+        {
+            var elapsed = stopwatch.Elapsed.TotalMilliseconds;
+            stopwatch.Restart();
+            return elapsed;
+        }
+
+        private static string Metric(string prefix, string name, double ms) =>
+            $"{prefix}-{name};dur={ms.ToString("0.###", CultureInfo.InvariantCulture)}";
+    }
+}
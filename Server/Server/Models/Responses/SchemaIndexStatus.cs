@@ -0,0 +1,38 @@
+﻿namespace Server.Models.Responses
+{
+    /// <summary>
+    /// Neo4j index or constraint-backing index, as reported by SHOW INDEXES
+    /// </summary>
+    public class SchemaIndexStatus
+    {
+        /// <summary>
+        /// Index name
+        /// </summary>
+        public string Name { get; set; } = "";
+
+        /// <summary>
+        /// RANGE, LOOKUP, TEXT...
+        /// </summary>
+        public string Type { get; set; } = "";
+
+        /// <summary>
+        /// Label or relationship type and properties, e.g. User(id)
+        /// </summary>
+        public string Target { get; set; } = "";
+
+        /// <summary>
+        /// ONLINE, POPULATING or FAILED
+        /// </summary>
+        public string State { get; set; } = "";
+
+        /// <summary>
+        /// Population progress (0-100)
+        /// </summary>
+        public double PopulationPercent { get; set; }
+
+        /// <summary>
+        /// Uniqueness constraint backed by this index, if any
+        /// </summary>
+        public string? Constraint { get; set; }
+    }
+}
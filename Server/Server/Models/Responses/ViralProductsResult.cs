@@ -0,0 +1,82 @@
+﻿using Server.Models.Queries.Enums;
+
+namespace Server.Models.Responses
+{
+    /// <summary>
+    /// Top products by distinct buyers inside a user's follower circle
+    /// </summary>
+    public class ViralProductsResult
+    {
+        /// <summary>
+        /// Backend that produced this result
+        /// </summary>
+        public Database? Database { get; set; }
+
+        /// <summary>
+        /// 
+        /// </summary>
+        public Guid UserId { get; set; }
+
+        /// <summary>
+        /// Circle depth (FOLLOWS hops)
+        /// </summary>
+        public int Level { get; set; }
+
+        /// <summary>
+        /// Distinct users in the circle
+        /// </summary>
+        public int CircleSize { get; set; }
+
+        /// <summary>
+        /// Products, most distinct buyers in the circle first
+        /// </summary>
+        public List<ViralProduct> Items { get; set; } = new();
+
+        /// <summary>
+        /// Request time
+        /// </summary>
+        public long RequestTimeInMilliseconds { get; set; }
+
+        /// <summary>
+        /// Error message when this backend failed (the other backend's result is unaffected)
+        /// </summary>
+        public string? Error { get; set; }
+    }
+
+    /// <summary>
+    /// One product of ViralProductsResult
+    /// </summary>
+    public class ViralProduct
+    {
+        /// <summary>
+        /// 
+        /// </summary>
+        public Guid ArticleId { get; set; }
+
+        /// <summary>
+        /// 
+        /// </summary>
+        public string Name { get; set; } = "";
+
+        /// <summary>
+        /// Distinct buyers inside the circle
+        /// </summary>
+        public int Buyers { get; set; }
+
+        /// <summary>
+        /// Distinct buyers inside the circle at each level (index 0 = level 1).
+        /// A user reachable at several levels counts at the closest one.
+        /// </summary>
+        public List<int> BuyersByLevel { get; set; } = new();
+
+        /// <summary>
+        /// Distinct buyers overall (precomputed aggregate)
+        /// </summary>
+        public int TotalBuyers { get; set; }
+
+        /// <summary>
+        /// Share of all the product's buyers that are in the circle
+        /// </summary>
+        public double CircleShare => TotalBuyers == 0 ? 0 : (double)Buyers / TotalBuyers;
+    }
+}
@@ -1,8 +1,10 @@
 ﻿using Microsoft.EntityFrameworkCore;
 using Microsoft.OpenApi;
 using Neo4j.Driver;
+using Npgsql;
 using Serilog;
 using Server.Data;
+using Server.Formatters;
 using Server.Services;
 using System.Reflection;
 using System.Text.Json;
@@ -32,8 +34,15 @@ builder.Services.AddSwaggerGen(c =>
 });
 
 // --- Database 
+// Préparation automatique des requêtes fréquentes : Postgres réutilise leur plan
+var pgConnection = new NpgsqlConnectionStringBuilder(builder.Configuration.GetConnectionString("DefaultConnection"));
+if (pgConnection.MaxAutoPrepare == 0)
+{
+    pgConnection.MaxAutoPrepare = 64;
+    pgConnection.AutoPrepareMinUsages = 2;
+}
 builder.Services.AddDbContext<PostgresDbContext>(options =>
-    options.UseNpgsql(builder.Configuration.GetConnectionString("DefaultConnection")));
+    options.UseNpgsql(pgConnection.ConnectionString));
 
 
 // Services
@@ -61,11 +70,25 @@ builder.Services.AddSingleton<IDriver>(sp =>
     return driver;
 });
 
+builder.Services.AddSingleton<QueryShapeTracker>();
+// Cercles de followers en cache (désactivé par défaut, "circleCache": true par requête) : budget en nombre d'ids (16 octets chacun)
+builder.Services.AddSingleton(new FollowerCircleCache(
+    builder.Configuration.GetValue("FOLLOWER_CIRCLE_CACHE_IDS", 5_000_000L),
+    builder.Configuration.GetValue("FOLLOWER_CIRCLE_CACHE", false)));
+// Import Neo4j : lignes par transaction et sessions d'écriture en parallèle
+builder.Services.AddSingleton(new Neo4jImportOptions(
+    Math.Max(1, builder.Configuration.GetValue("NEO4J_IMPORT_BATCH_SIZE", 5000)),
+    Math.Max(1, builder.Configuration.GetValue("NEO4J_IMPORT_PARALLELISM", 4))));
 builder.Services.AddScoped<PostgresDbService>();
 builder.Services.AddScoped<Neo4jDbService>();
 
 // Controllers
-builder.Services.AddControllers()
+// JSON reste le format par défaut ; NDJSON / colonnaire binaire sont choisis par Content-Type
+builder.Services.AddControllers(options =>
+    {
+        options.InputFormatters.Insert(0, new NdjsonInputFormatter());
+        options.InputFormatters.Insert(0, new ColumnarInputFormatter());
+    })
     .AddJsonOptions(options =>
     {
         options.JsonSerializerOptions.Encoder = System.Text.Encodings.Web.JavaScriptEncoder.UnsafeRelaxedJsonEscaping;
@@ -125,4 +148,24 @@ using (var scope = app.Services.CreateScope())
     }
 }
 
+// --- Neo4j schema: uniqueness constraints + indexes (idempotent) ---
+if (app.Configuration.GetValue("NEO4J_SCHEMA_BOOTSTRAP", true))
+{
+    using var scope = app.Services.CreateScope();
+    try
+    {
+        var neo4j = scope.ServiceProvider.GetRequiredService<Neo4jDbService>();
+        Log.Information("Applying Neo4j schema...");
+        foreach (var index in await neo4j.EnsureSchemaAsync())
+        {
+            Log.Information("Neo4j index {Name} ({Type} {Target}): {State} {Population}%",
+                index.Name, index.Type, index.Target, index.State, index.PopulationPercent);
+        }
+    }
+    catch (Exception ex)
+    {
+        Log.Error(ex, "An error occurred while applying the Neo4j schema.");
+    }
+}
+
 app.Run();
\ No newline at end of file
@@ -0,0 +1,67 @@
+﻿using Serilog;
+using Server.Models.Queries.Enums;
+using System.Diagnostics;
+
+namespace Server.Services;
+
+/// <summary>
+/// Outcome of one backend for a Postgres/Neo4j/Both request
+/// </summary>
+public record BackendOutcome<T>(Database Database, T? Result, double ElapsedMs, Exception? Error);
+
+/// <summary>
+/// Dispatches work to the backends selected by targets, sequentially or in parallel
+/// </summary>
+public static class DatabaseTargets
+{
+    /// <summary>
+    /// Whether targets selects the given backend
+    /// </summary>
+    public static bool Includes(this Database targets, Database database) =>
+        targets == database || targets == Database.Both;
+
+    /// <summary>
+    /// Runs the selected backends and returns one outcome per backend, Postgres first.
+    /// A failing backend does not cancel the other: its exception is captured in its outcome.
+    /// </summary>
+    public static async Task<List<BackendOutcome<T>>> RunAsync<T>(Database targets, bool parallel,
+        Func<Task<T>> postgres, Func<Task<T>> neo4j)
+    {
+        var work = new List<(Database Database, Func<Task<T>> Action)>();
+        if (targets.Includes(Database.Postgres)) work.Add((Database.Postgres, postgres));
+        if (targets.Includes(Database.Neo4j)) work.Add((Database.Neo4j, neo4j));
+
+        if (parallel)
+            return (await Task.WhenAll(work.Select(w => Run(w.Database, w.Action)))).ToList();
+
+        var outcomes = new List<BackendOutcome<T>>();
+        foreach (var (database, action) in work)
+            outcomes.Add(await Run(database, action));
+        return outcomes;
+    }
+
+    /// <summary>
+    /// Same as RunAsync, for operations without result (bulk imports)
+    /// </summary>
+    public static Task<List<BackendOutcome<bool>>> RunImportAsync(Database targets, bool parallel,
+        Func<Task> postgres, Func<Task> neo4j) =>
+        RunAsync(targets, parallel,
+            async () => { await postgres(); return true; },
+            async () => { await neo4j(); return true; });
+
+    private static async Task<BackendOutcome<T>> Run<T>(Database database, Func<Task<T>> action)
+    {
+        var stopwatch = Stopwatch.StartNew();
+        try
+        {
+            // Task.Run : la partie synchrone d'un backend ne retarde pas le démarrage de l'autre
+            var result = await Task.Run(action);
+            return new BackendOutcome<T>(database, result, stopwatch.Elapsed.TotalMilliseconds, null);
+        }
+        catch (Exception ex)
+        {
+            Log.Error(ex, "{Database} failed after {Elapsed}ms", database, stopwatch.ElapsedMilliseconds);
+            return new BackendOutcome<T>(database, default, stopwatch.Elapsed.TotalMilliseconds, ex);
+        }
+    }
+}
@@ -0,0 +1,77 @@
+﻿namespace Server.Services;
+
+/// <summary>
+/// Follower circles of several (user, level) pairs resolved together by one multi-source BFS.
+/// Each user's FOLLOWS edges are fetched at most once for the whole batch, so circles that overlap share
+/// the queries of their common users. Same circles as FollowerCircleCache: users reachable in 1..level hops,
+/// the root included when a cycle leads back to it.
+/// </summary>
+public static class FollowerCircleBatch
+{
+    /// <summary>
+    /// Users whose edges are fetched by one call of edgesFrom
+    /// </summary>
+    public const int FetchChunk = 10_000;
+
+    private sealed class Source(Guid userId, HashSet<int> levels)
+    {
+        public Guid UserId { get; } = userId;
+        public HashSet<int> Levels { get; } = levels;
+        public int MaxLevel { get; } = levels.Max();
+        public HashSet<Guid> Reached { get; } = new();
+        public List<Guid> Frontier { get; set; } = [userId];
+    }
+
+    /// <summary>
+    /// Sorted circle per requested (user, level). edgesFrom(users) returns the (follower, followed) edges leaving users;
+    /// it is called once per level and chunk with the users of all frontiers not expanded yet.
+    /// </summary>
+    public static async Task<Dictionary<(Guid UserId, int Level), Guid[]>> ResolveAsync(
+        IEnumerable<(Guid UserId, int Level)> circles,
+        Func<Guid[], Task<IReadOnlyCollection<(Guid Follower, Guid Followed)>>> edgesFrom)
+    {
+        var sources = circles
+            .Where(c => c.Level > 0)
+            .GroupBy(c => c.UserId)
+            .Select(g => new Source(g.Key, g.Select(c => c.Level).ToHashSet()))
+            .ToList();
+        var adjacency = new Dictionary<Guid, List<Guid>>();
+        var resolved = new Dictionary<(Guid UserId, int Level), Guid[]>();
+
+        for (var level = 1; sources.Count > 0; level++)
+        {
+            // Union des frontières, moins les users déjà développés (niveau précédent ou autre cercle)
+            var missing = sources.SelectMany(s => s.Frontier).Where(id => !adjacency.ContainsKey(id)).Distinct().ToArray();
+            foreach (var chunk in missing.Chunk(FetchChunk))
+            {
+                foreach (var id in chunk)
+                    adjacency[id] = [];
+                foreach (var (follower, followed) in await edgesFrom(chunk))
+                    adjacency[follower].Add(followed);
+            }
+
+            foreach (var source in sources)
+            {
+                var next = new List<Guid>();
+                foreach (var id in source.Frontier)
+                {
+                    foreach (var followed in adjacency[id])
+                    {
+                        if (source.Reached.Add(followed))
+                            next.Add(followed);
+                    }
+                }
+                source.Frontier = next;
+
+                if (source.Levels.Contains(level))
+                {
+                    var circle = source.Reached.ToArray();
+                    Array.Sort(circle);
+                    resolved[(source.UserId, level)] = circle;
+                }
+            }
+            sources.RemoveAll(s => s.MaxLevel == level);
+        }
+        return resolved;
+    }
+}
@@ -0,0 +1,225 @@
+﻿using Server.Models.Queries.Enums;
+using Server.Models.Responses;
+
+namespace Server.Services;
+
+/// <summary>
+/// LRU cache of follower circles (users reachable in 1..level FOLLOWS hops) per backend (singleton).
+/// Each entry keeps the reached ids and the ids first reached at that level (its frontier) as sorted
+/// Guid arrays, so level n+1 is one hop from the cached level n. Size is bounded by the total number of ids.
+/// </summary>
+public class FollowerCircleCache
+{
+    private readonly record struct Key(Database Database, Guid UserId, int Level);
+
+    private sealed record Entry(Key Key, Guid[] Reached, Guid[] Frontier)
+    {
+        public long Size => Reached.Length + Frontier.Length;
+
+        public bool Contains(Guid id) => Array.BinarySearch(Reached, id) >= 0;
+
+        /// <summary>
+        /// A new edge from id changes this circle when id is at most Level - 1 hops away:
+        /// the root itself, or a reached user that is not on the last level
+        /// </summary>
+        public bool AffectedBy(Guid id) =>
+            id == Key.UserId || (Contains(id) && Array.BinarySearch(Frontier, id) < 0);
+    }
+
+    private sealed class Counter
+    {
+        public long Hits;
+        public long Misses;
+        public long Extended;
+        public long Evictions;
+        public long Invalidations;
+        public long Version;
+    }
+
+    private readonly object _lock = new();
+    private readonly Dictionary<Key, LinkedListNode<Entry>> _entries = new();
+    private readonly LinkedList<Entry> _lru = new();
+    private readonly Dictionary<Database, Counter> _counters = new();
+    private long _storedIds;
+
+    /// <summary>
+    /// 
+    /// </summary>
+    /// <param name="maxIds">Total ids kept before evicting (16 bytes each)</param>
+    /// <param name="enabled">false: every circle is recomputed, nothing is stored</param>
+    public FollowerCircleCache(long maxIds, bool enabled = true)
+    {
+        MaxIds = maxIds;
+        Enabled = enabled;
+    }
+
+    /// <summary>
+    /// 
+    /// </summary>
+    public long MaxIds { get; }
+
+    /// <summary>
+    /// 
+    /// </summary>
+    public bool Enabled { get; }
+
+    /// <summary>
+    /// Users reachable from userId in 1..level hops. Starts from the deepest cached level of userId
+    /// and calls expand(frontier) once per missing level; expand returns the users followed by frontier.
+    /// Each level built is cached. Hit is true when nothing had to be queried.
+    /// </summary>
+    public async Task<(Guid[] Circle, bool Hit)> GetOrBuildAsync(Database database, Guid userId, int level,
+        Func<Guid[], Task<IReadOnlyCollection<Guid>>> expand)
+    {
+        Entry? start = null;
+        long version;
+        lock (_lock)
+        {
+            var counter = CounterFor(database);
+            version = counter.Version;
+            for (var cached = level; cached >= 1 && start is null; cached--)
+            {
+                if (_entries.TryGetValue(new Key(database, userId, cached), out var node))
+                {
+                    _lru.Remove(node);
+                    _lru.AddFirst(node);
+                    start = node.Value;
+                }
+            }
+
+            if (start?.Key.Level == level)
+            {
+                counter.Hits++;
+                return (start.Reached, true);
+            }
+            counter.Misses++;
+            if (start is not null)
+                counter.Extended++;
+        }
+
+        var reached = new HashSet<Guid>(start?.Reached ?? []);
+        var frontier = start?.Frontier ?? [userId];
+        var entries = new List<Entry>();
+        for (var current = (start?.Key.Level ?? 0) + 1; current <= level; current++)
+        {
+            var next = new List<Guid>();
+            if (frontier.Length > 0)
+            {
+                foreach (var id in await expand(frontier))
+                {
+                    if (reached.Add(id))
+                        next.Add(id);
+                }
+            }
+
+            frontier = next.ToArray();
+            Array.Sort(frontier);
+            var sorted = reached.ToArray();
+            Array.Sort(sorted);
+            entries.Add(new Entry(new Key(database, userId, current), sorted, frontier));
+        }
+
+        if (Enabled)
+            Store(database, version, entries);
+        return (entries[^1].Reached, false);
+    }
+
+    /// <summary>
+    /// Drops the circles of database changed by new FOLLOWS edges whose followers are followerIds
+    /// </summary>
+    public void Invalidate(Database database, IEnumerable<Guid> followerIds)
+    {
+        var followers = followerIds.Distinct().ToArray();
+        lock (_lock)
+        {
+            var counter = CounterFor(database);
+            // Un cercle construit pendant l'import ne sera pas mis en cache (version périmée)
+            counter.Version++;
+
+            var stale = _entries.Values
+                .Where(node => node.Value.Key.Database == database && followers.Any(node.Value.AffectedBy))
+                .ToList();
+            foreach (var node in stale)
+                Remove(node);
+            counter.Invalidations += stale.Count;
+        }
+    }
+
+    /// <summary>
+    /// Empties the cache (e.g. after the databases were wiped); counters are kept
+    /// </summary>
+    public void Clear()
+    {
+        lock (_lock)
+        {
+            foreach (var counter in _counters.Values)
+                counter.Version++;
+            _entries.Clear();
+            _lru.Clear();
+            _storedIds = 0;
+        }
+    }
+
+    /// <summary>
+    /// Current counters per backend
+    /// </summary>
+    public Dictionary<string, CircleCacheStats> Snapshot()
+    {
+        lock (_lock)
+        {
+            return _counters.ToDictionary(kv => kv.Key.ToString(), kv =>
+            {
+                var entries = _entries.Values.Where(node => node.Value.Key.Database == kv.Key).ToList();
+                return new CircleCacheStats
+                {
+                    Hits = kv.Value.Hits,
+                    Misses = kv.Value.Misses,
+                    Extended = kv.Value.Extended,
+                    Evictions = kv.Value.Evictions,
+                    Invalidations = kv.Value.Invalidations,
+                    Entries = entries.Count,
+                    StoredIds = entries.Sum(node => node.Value.Size)
+                };
+            });
+        }
+    }
+
+    private void Store(Database database, long version, List<Entry> entries)
+    {
+        lock (_lock)
+        {
+            var counter = CounterFor(database);
+            if (counter.Version != version)
+                return;
+
+            foreach (var entry in entries.Where(e => e.Size <= MaxIds))
+            {
+                if (_entries.TryGetValue(entry.Key, out var existing))
+                    Remove(existing);
+
+                _entries[entry.Key] = _lru.AddFirst(entry);
+                _storedIds += entry.Size;
+
+                while (_storedIds > MaxIds && _lru.Last is { } oldest)
+                {
+                    Remove(oldest);
+                    CounterFor(oldest.Value.Key.Database).Evictions++;
+                }
+            }
+        }
+    }
+
+    private void Remove(LinkedListNode<Entry> node)
+    {
+        _entries.Remove(node.Value.Key);
+        _lru.Remove(node);
+        _storedIds -= node.Value.Size;
+    }
+
+    private Counter CounterFor(Database database)
+    {
+        if (!_counters.TryGetValue(database, out var counter))
+            _counters[database] = counter = new Counter();
+        return counter;
+    }
+}
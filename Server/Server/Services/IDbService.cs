@@ -14,21 +14,32 @@ namespace Server.Services
         /// <summary>
         /// Execute complex query via QueryBuilder
         /// </summary>
-        Task<PaginatedResult<dynamic>> ExecuteQueryAsync(QueryBuilderRequest request);
+        /// <param name="request"></param>
+        /// <param name="resolvedCircle">Follower circle already resolved by the caller (batch), used instead of the cache or a traversal</param>
+        Task<PaginatedResult<dynamic>> ExecuteQueryAsync(QueryBuilderRequest request, Guid[]? resolvedCircle = null);
+
+        /// <summary>
+        /// Follower circles of several (user, level) pairs, resolved together by one multi-source BFS
+        /// </summary>
+        /// <param name="circles"></param>
+        /// <returns></returns>
+        Task<Dictionary<(Guid UserId, int Level), Guid[]>> ResolveCirclesAsync(IEnumerable<(Guid UserId, int Level)> circles);
 
         /// <summary>
         /// 
         /// </summary>
         /// <param name="articles"></param>
+        /// <param name="fresh">The caller guarantees the rows are not in the database yet (plain inserts)</param>
         /// <returns></returns>
-        Task BulkImportArticles([FromBody] List<ArticleDto> articles);
+        Task BulkImportArticles([FromBody] List<ArticleDto> articles, bool fresh = false);
 
         /// <summary>
         /// 
         /// </summary>
         /// <param name="users"></param>
+        /// <param name="fresh">The caller guarantees the rows are not in the database yet (plain inserts)</param>
         /// <returns></returns>
-        Task BulkImportUsers([FromBody] List<UserDto> users);
+        Task BulkImportUsers([FromBody] List<UserDto> users, bool fresh = false);
 
         /// <summary>
         /// 
@@ -41,8 +52,9 @@ namespace Server.Services
         /// 
         /// </summary>
         /// <param name="follows"></param>
+        /// <param name="fresh">The caller guarantees the rows are not in the database yet (plain inserts)</param>
         /// <returns></returns>
-        Task BulkImportSocialGraph([FromBody] List<FollowDto> follows);
+        Task BulkImportSocialGraph([FromBody] List<FollowDto> follows, bool fresh = false);
 
     }
 }
@@ -3,8 +3,13 @@ using Server.Models.Dtos;
 using Server.Models.Requests;
 using Server.Models.Responses;
 using Server.Models.Requests.Enums;
+using Server.Models.Requests.Enums.Fields;
+using Server.Models.Queries.Enums;
+using System.Collections.Concurrent;
 using System.Diagnostics;
 using System.Linq;
+using System.Text;
+using System.Text.Json;
 
 namespace Server.Services;
 
@@ -15,220 +20,644 @@ public class Neo4jDbService : IDbService
 {
     private readonly IDriver _driver;
     private readonly ILogger<Neo4jDbService> _logger;
+    private readonly QueryShapeTracker _shapes;
+    private readonly FollowerCircleCache _circles;
+    private readonly Neo4jImportOptions _import;
+
+    /// <summary>
+    /// Error code of a transaction rolled back to break a lock cycle (retried by ExecuteWriteAsync)
+    /// </summary>
+    private const string DeadlockDetected = "Neo.TransientError.Transaction.DeadlockDetected";
+
+    /// <summary>
+    /// Per-batch timings of the last bulk import run by this (scoped) service
+    /// </summary>
+    public List<ImportBatchTiming> ImportBatches { get; private set; } = [];
+
+    /// <summary>
+    /// Constraints and indexes used by the bulk imports (MERGE / MATCH on id) and the query filters
+    /// </summary>
+    private static readonly string[] SchemaStatements =
+    [
+        "CREATE CONSTRAINT user_id_unique IF NOT EXISTS FOR (u:User) REQUIRE u.id IS UNIQUE",
+        "CREATE CONSTRAINT article_id_unique IF NOT EXISTS FOR (a:Article) REQUIRE a.id IS UNIQUE",
+        "CREATE INDEX article_price IF NOT EXISTS FOR (a:Article) ON (a.price)",
+        "CREATE INDEX article_name IF NOT EXISTS FOR (a:Article) ON (a.name)",
+        "CREATE INDEX bought_total_price IF NOT EXISTS FOR ()-[r:BOUGHT]-() ON (r.totalPrice)",
+        "CREATE INDEX user_followers_count IF NOT EXISTS FOR (u:User) ON (u.followersCount)",
+        "CREATE INDEX user_following_count IF NOT EXISTS FOR (u:User) ON (u.followingCount)",
+    ];
 
     /// <summary>
     /// 
     /// </summary>
     /// <param name="driver"></param>
     /// <param name="logger"></param>
-    public Neo4jDbService(IDriver driver, ILogger<Neo4jDbService> logger)
+    /// <param name="shapes"></param>
+    /// <param name="circles"></param>
+    /// <param name="import"></param>
+    public Neo4jDbService(IDriver driver, ILogger<Neo4jDbService> logger, QueryShapeTracker shapes, FollowerCircleCache circles, Neo4jImportOptions import)
     {
         _driver = driver;
         _logger = logger;
+        _shapes = shapes;
+        _circles = circles;
+        _import = import;
     }
 
     /// <summary>
     /// 
     /// </summary>
     /// <param name="request"></param>
+    /// <param name="resolvedCircle">Follower circle already resolved by the caller (batch), used instead of the cache or a traversal</param>
     /// <returns></returns>
-    public async Task<PaginatedResult<dynamic>> ExecuteQueryAsync(QueryBuilderRequest request)
+    public async Task<PaginatedResult<dynamic>> ExecuteQueryAsync(QueryBuilderRequest request, Guid[]? resolvedCircle = null)
     {
         var stopwatch = Stopwatch.StartNew();
         await using var session = _driver.AsyncSession();
+        string? paginatedShape = null, countShape = null;
 
-        return await session.ExecuteReadAsync(async tx =>
+        var result = await session.ExecuteReadAsync(async tx =>
         {
-            var cypher = BuildCypherForEntity(request);
+            var timings = new QueryTimings();
+            var phase = Stopwatch.StartNew();
+
+            List<string>? circle = null;
+            if (resolvedCircle is not null)
+            {
+                circle = resolvedCircle.Select(id => id.ToString()).ToList();
+                timings.TraversedUsers = resolvedCircle.Length;
+            }
+            else if (request.CircleCache && _circles.Enabled && request.Traversal != TraversalMode.Legacy
+                     && request.UserId.HasValue && request.FollowingLevel > 0)
+            {
+                var (ids, hit) = await _circles.GetOrBuildAsync(Database.Neo4j, request.UserId.Value, request.FollowingLevel.Value,
+                    frontier => FollowedByAsync(tx, frontier));
+                circle = ids.Select(id => id.ToString()).ToList();
+                timings.TraversalMs = QueryTimings.Lap(phase);
+                timings.TraversedUsers = ids.Length;
+                timings.CircleCacheHit = hit;
+            }
+
+            // Texte stable par forme de requête, valeurs en paramètres : le plan est réutilisé
+            var (body, returnClause, parameters) = BuildCypherForEntity(request, seek: request.Cursor is not null, circle);
 
-            var skip = (request.Page - 1) * request.PageSize;
-            var limit = request.PageSize;
-            var paginatedCypher = $"{cypher} SKIP {skip} LIMIT {limit}";
+            // Une ligne de plus que la page : indique s'il existe une page suivante
+            var paginatedCypher = request.Cursor is null
+                ? $"{body} {returnClause} SKIP $skip LIMIT $limit"
+                : $"{body} {returnClause} LIMIT $limit";
+            var pageParameters = new Dictionary<string, object?>(parameters)
+            {
+                ["skip"] = (long)(request.Page - 1) * request.PageSize,
+                ["limit"] = (long)request.PageSize + 1
+            };
+
+            // Le total ignore le curseur : même MATCH ... WHERE sans la condition de seek
+            string aliasToCount = request.Entity == Entity.Orders ? "r" : "target";
+            var (countBody, _, countParameters) = request.Cursor is null
+                ? (body, returnClause, parameters)
+                : BuildCypherForEntity(request, seek: false, circle);
+            string? countCypher = request.CountMode switch
+            {
+                CountMode.Skip => null,
+                CountMode.Estimate => $"{countBody} WITH DISTINCT {aliasToCount} LIMIT $cap RETURN count(*) as total",
+                _ => $"{countBody} RETURN count(DISTINCT {aliasToCount}) as total"
+            };
+            countParameters = new Dictionary<string, object?>(countParameters)
+            {
+                ["cap"] = (long)QueryBuilderRequest.EstimateCountCap + 1
+            };
+            // Enregistrée après la transaction : la lambda est rejouée en cas d'erreur transitoire
+            (paginatedShape, countShape) = (paginatedCypher, countCypher);
+            timings.BuildMs = QueryTimings.Lap(phase);
 
             _logger.LogInformation("Neo4j Paginated Query: {Cypher}", paginatedCypher);
 
-            var dataResult = await tx.RunAsync(paginatedCypher);
-            var items = new List<object>();
+            var dataResult = await tx.RunAsync(paginatedCypher, pageParameters);
+            var records = await dataResult.ToListAsync();
+            timings.DataQueryMs = QueryTimings.Lap(phase);
+
+            var hasMore = records.Count > request.PageSize;
+            if (hasMore)
+                records.RemoveAt(records.Count - 1);
 
-            await foreach (var record in dataResult)
+            var items = new List<object>();
+            foreach (var record in records)
             {
-                if (record.Values.Count == 1 && record.Values.First().Value is INode node)
+                var values = record.Values.Where(kv => kv.Key is not ("sortKey" or "sortId")).ToList();
+                if (values.Count == 1 && values[0].Value is INode node)
                     items.Add(node.Properties);
                 else
-                    items.Add(record.Values.ToDictionary(kv => kv.Key, kv => kv.Value));
+                    items.Add(values.ToDictionary(kv => kv.Key, kv => kv.Value));
             }
+            var nextCursor = hasMore ? PageCursor.Encode(records[^1]["sortKey"], records[^1]["sortId"].As<string>()) : null;
+            timings.MaterializationMs = QueryTimings.Lap(phase);
+            timings.RowsReturned = items.Count;
 
-            var queryPart = cypher.Split(new[] { "RETURN" }, StringSplitOptions.None)[0];
-            string aliasToCount = request.Entity == Entity.Orders ? "r" : "target";
-
-            var countCypher = $"{queryPart} RETURN count(DISTINCT {aliasToCount}) as total";
-            var countResult = await tx.RunAsync(countCypher);
-            var countRecords = await countResult.ToListAsync();
-
-            int totalCount = countRecords.Any() ? (int)countRecords[0]["total"].As<long>() : 0;
+            int? totalCount = null;
+            var estimated = false;
+            if (countCypher is not null)
+            {
+                var countResult = await tx.RunAsync(countCypher, countParameters);
+                var countRecords = await countResult.ToListAsync();
+                totalCount = countRecords.Any() ? (int)countRecords[0]["total"].As<long>() : 0;
+                if (request.CountMode == CountMode.Estimate && totalCount > QueryBuilderRequest.EstimateCountCap)
+                {
+                    totalCount = QueryBuilderRequest.EstimateCountCap;
+                    estimated = true;
+                }
+            }
+            timings.CountQueryMs = QueryTimings.Lap(phase);
 
             stopwatch.Stop();
             return new PaginatedResult<dynamic>
             {
                 Items = items,
                 TotalCount = totalCount,
+                TotalCountIsEstimate = estimated,
+                NextCursor = nextCursor,
                 Page = request.Page,
                 PageSize = request.PageSize,
-                RequestTimeInMilliseconds = stopwatch.ElapsedMilliseconds
+                RequestTimeInMilliseconds = stopwatch.ElapsedMilliseconds,
+                Timings = timings
             };
         });
+        result.Timings!.QueryShapeReuse = _shapes.Record(Database.Neo4j, paginatedShape!)
+            & (countShape is null || _shapes.Record(Database.Neo4j, countShape));
+        return result;
     }
 
     /// <summary>
-    /// 
+    /// Creates the constraints and indexes (idempotent) and waits until they are online,
+    /// then backfills the follow counters of users that don't have them yet
     /// </summary>
-    /// <param name="articles"></param>
     /// <returns></returns>
-    public async Task BulkImportArticles(List<ArticleDto> articles)
+    public async Task<List<SchemaIndexStatus>> EnsureSchemaAsync()
     {
-        const int BATCH_SIZE = 1000;
-
         await using var session = _driver.AsyncSession(o => o.WithDefaultAccessMode(AccessMode.Write));
 
-        for (int i = 0; i < articles.Count; i += BATCH_SIZE)
+        foreach (var statement in SchemaStatements)
         {
-            var batch = articles.Skip(i).Take(BATCH_SIZE).Select(a => new
-            {
-                id = a.Id.ToString(),
-                name = a.Name ?? "",
-                price = (double)a.Price
-            }).ToList();
+            var result = await session.RunAsync(statement);
+            var summary = await result.ConsumeAsync();
+            _logger.LogInformation("Neo4j schema: {Statement} (constraints added: {Constraints}, indexes added: {Indexes})",
+                statement, summary.Counters.ConstraintsAdded, summary.Counters.IndexesAdded);
+        }
 
-            await session.ExecuteWriteAsync(async tx =>
-            {
-                await tx.RunAsync(@"
-                    UNWIND $articles as article
-                    MERGE (a:Article {id: article.id})
-                    SET a.name = article.name, 
-                        a.price = article.price",
-                    new { articles = batch });
-            });
+        await (await session.RunAsync("CALL db.awaitIndexes(300)")).ConsumeAsync();
+
+        // Users importés avant les compteurs : même rattrapage que la migration AddFollowCounters côté Postgres
+        var missing = await session.RunAsync(
+            "RETURN EXISTS { MATCH (u:User) WHERE u.followersCount IS NULL OR u.followingCount IS NULL } AS missing");
+        if ((await missing.SingleAsync())["missing"].As<bool>())
+        {
+            _logger.LogInformation("Neo4j schema: users without follow counters, rebuilding followersCount / followingCount");
+            await RebuildFollowCountersAsync();
         }
+
+        return await GetSchemaStatusAsync();
     }
 
     /// <summary>
-    /// 
+    /// Current indexes and their state
     /// </summary>
-    /// <param name="users"></param>
     /// <returns></returns>
-    public async Task BulkImportUsers(List<UserDto> users)
+    public async Task<List<SchemaIndexStatus>> GetSchemaStatusAsync()
     {
-        const int BATCH_SIZE = 1000;
+        await using var session = _driver.AsyncSession();
 
-        await using var session = _driver.AsyncSession(o => o.WithDefaultAccessMode(AccessMode.Write));
+        var result = await session.RunAsync(@"
+            SHOW INDEXES
+            YIELD name, type, labelsOrTypes, properties, state, populationPercent, owningConstraint");
 
-        for (int i = 0; i < users.Count; i += BATCH_SIZE)
+        return (await result.ToListAsync()).Select(record => new SchemaIndexStatus
         {
-            var batch = users.Skip(i).Take(BATCH_SIZE).Select(u => new
-            {
-                id = u.Id.ToString(),
-                name = u.UserName ?? "",
-                email = u.Email ?? ""
-            }).ToList();
+            Name = record["name"].As<string>(),
+            Type = record["type"].As<string>(),
+            Target = record["labelsOrTypes"] is List<object> labels
+                ? $"{string.Join(",", labels)}({(record["properties"] is List<object> properties ? string.Join(",", properties) : "")})"
+                : "",
+            State = record["state"].As<string>(),
+            PopulationPercent = record["populationPercent"].As<double>(),
+            Constraint = record["owningConstraint"]?.As<string>()
+        }).ToList();
+    }
 
-            await session.ExecuteWriteAsync(async tx =>
-            {
-                await tx.RunAsync(@"
-                    UNWIND $users as user
-                    MERGE (u:User {id: user.id})
-                    SET u.name = user.name, 
-                        u.email = user.email",
-                    new { users = batch });
-            });
-        }
+    /// <summary>
+    /// Articles by batches of BatchSize over Parallelism write sessions.
+    /// fresh: the ids are new (empty graph, generated ids), CREATE instead of MERGE.
+    /// </summary>
+    /// <param name="articles"></param>
+    /// <param name="fresh"></param>
+    /// <returns></returns>
+    public async Task BulkImportArticles(List<ArticleDto> articles, bool fresh = false)
+    {
+        var cypher = fresh
+            ? "UNWIND $rows AS row CREATE (:Article {id: row.id, name: row.name, price: row.price})"
+            : "UNWIND $rows AS row MERGE (a:Article {id: row.id}) SET a.name = row.name, a.price = row.price";
+
+        await ImportAsync("Articles", cypher, NodeRounds(articles), a => new
+        {
+            id = a.Id.ToString(),
+            name = a.Name ?? "",
+            price = (double)a.Price
+        });
     }
 
     /// <summary>
-    /// 
+    /// Users by batches of BatchSize over Parallelism write sessions.
+    /// fresh: the ids are new (empty graph, generated ids), CREATE instead of MERGE.
+    /// </summary>
+    /// <param name="users"></param>
+    /// <param name="fresh"></param>
+    /// <returns></returns>
+    public async Task BulkImportUsers(List<UserDto> users, bool fresh = false)
+    {
+        var cypher = fresh
+            ? "UNWIND $rows AS row CREATE (:User {id: row.id, name: row.name, email: row.email, followersCount: 0, followingCount: 0})"
+            : "UNWIND $rows AS row MERGE (u:User {id: row.id}) ON CREATE SET u.followersCount = 0, u.followingCount = 0 SET u.name = row.name, u.email = row.email";
+
+        await ImportAsync("Users", cypher, NodeRounds(users), u => new
+        {
+            id = u.Id.ToString(),
+            name = u.UserName ?? "",
+            email = u.Email ?? ""
+        });
+    }
+
+    /// <summary>
+    /// BOUGHT relationships, partitioned by (user group, article group): the batches running at the same
+    /// time never lock the same nodes. Always MERGE (one BOUGHT per pair, Article.buyers counts them).
     /// </summary>
     /// <param name="orders"></param>
     /// <returns></returns>
     public async Task BulkImportOrders(List<OrderDto> orders)
     {
-        const int BATCH_SIZE = 500;
+        const string cypher = @"
+            UNWIND $rows AS row
+            MATCH (u:User {id: row.userId})
+            MATCH (a:Article {id: row.articleId})
+            MERGE (u)-[r:BOUGHT]->(a)
+            ON CREATE SET a.buyers = coalesce(a.buyers, 0) + 1
+            SET r.quantity = row.quantity,
+                r.totalPrice = row.totalPrice";
+
+        await ImportAsync("Orders", cypher, GridRounds(orders, o => o.UserId, o => o.ArticleId), o => new
+        {
+            userId = o.UserId.ToString(),
+            articleId = o.ArticleId.ToString(),
+            quantity = o.Quantity,
+            totalPrice = o.TotalPrice
+        });
+    }
+
+    /// <summary>
+    /// Recomputes Article.buyers from the BOUGHT relationships (graph imported before the counter existed)
+    /// </summary>
+    /// <returns></returns>
+    public async Task RebuildViralAggregatesAsync()
+    {
+        await using var session = _driver.AsyncSession(o => o.WithDefaultAccessMode(AccessMode.Write));
+        await session.ExecuteWriteAsync(async tx =>
+        {
+            var result = await tx.RunAsync("MATCH (a:Article) SET a.buyers = COUNT { (a)<-[:BOUGHT]-(:User) }");
+            await result.ConsumeAsync();
+        });
+    }
 
+    /// <summary>
+    /// Recomputes User.followersCount / followingCount from the FOLLOWS relationships
+    /// (graph imported before the counters existed)
+    /// </summary>
+    /// <returns></returns>
+    public async Task RebuildFollowCountersAsync()
+    {
         await using var session = _driver.AsyncSession(o => o.WithDefaultAccessMode(AccessMode.Write));
+        var result = await session.RunAsync("""
+            MATCH (u:User)
+            CALL (u) {
+                SET u.followersCount = COUNT { (u)<-[:FOLLOWS]-(:User) },
+                    u.followingCount = COUNT { (u)-[:FOLLOWS]->(:User) }
+            } IN TRANSACTIONS OF 10000 ROWS
+            """);
+        await result.ConsumeAsync();
+    }
 
-        for (int i = 0; i < orders.Count; i += BATCH_SIZE)
+    /// <summary>
+    /// Top products by distinct buyers in the level-n circle of userId, with the buyers per level.
+    /// The circle is resolved like CircleCypher, each user kept at its closest level (shortest path length);
+    /// BOUGHT is unique per (user, article) and Article.buyers is maintained by BulkImportOrders.
+    /// </summary>
+    /// <param name="userId"></param>
+    /// <param name="level"></param>
+    /// <param name="top"></param>
+    /// <returns></returns>
+    public async Task<ViralProductsResult> GetViralProductsAsync(Guid userId, int level, int top)
+    {
+        var stopwatch = Stopwatch.StartNew();
+
+        // Plus court chemin vers chaque user du cercle : sa longueur est le niveau le plus proche
+        var cypher = new StringBuilder($"MATCH p = ANY SHORTEST (me:User {{id: $userId}})-[:FOLLOWS]->{{1,{level}}}(member:User) ");
+        cypher.Append("""
+            WITH collect({member: member, level: length(p)}) AS circle
+            CALL (circle) {
+                UNWIND circle AS c
+                WITH c.member AS member, c.level AS level
+                MATCH (member)-[:BOUGHT]->(a:Article)
+                WITH a, level, count(*) AS buyers
+                WITH a, sum(buyers) AS total, collect([level, buyers]) AS perLevel
+                ORDER BY total DESC, a.id
+                LIMIT $top
+                RETURN collect({articleId: a.id, name: a.name, totalBuyers: coalesce(a.buyers, 0), perLevel: perLevel}) AS products
+            }
+            RETURN size(circle) AS circleSize, products
+            """);
+
+        await using var session = _driver.AsyncSession();
+        var records = await session.ExecuteReadAsync(async tx =>
         {
-            var batch = orders.Skip(i).Take(BATCH_SIZE).Select(o => new
-            {
-                userId = o.UserId.ToString(),
-                articleId = o.ArticleId.ToString(),
-                quantity = o.Quantity,
-                totalPrice = o.TotalPrice
-            }).ToList();
+            var result = await tx.RunAsync(cypher.ToString(), new { userId = userId.ToString(), top = (long)top });
+            return await result.ToListAsync();
+        });
+
+        var items = new List<ViralProduct>();
+        var record = records.FirstOrDefault();
+        foreach (var product in record?["products"] as List<object> ?? [])
+        {
+            var fields = (IReadOnlyDictionary<string, object>)product;
+            var byLevel = new int[level];
+            foreach (List<object> entry in (List<object>)fields["perLevel"])
+                byLevel[Convert.ToInt32(entry[0]) - 1] = Convert.ToInt32(entry[1]);
 
-            await session.ExecuteWriteAsync(async tx =>
+            items.Add(new ViralProduct
             {
-                await tx.RunAsync(@"
-                    UNWIND $orders as order
-                    MATCH (u:User {id: order.userId})
-                    MATCH (a:Article {id: order.articleId})
-                    MERGE (u)-[r:BOUGHT]->(a)
-                    SET r.quantity = order.quantity,
-                        r.totalPrice = order.totalPrice",
-                    new { orders = batch });
+                ArticleId = Guid.Parse((string)fields["articleId"]),
+                Name = fields["name"] as string ?? "",
+                Buyers = byLevel.Sum(),
+                BuyersByLevel = byLevel.ToList(),
+                TotalBuyers = Convert.ToInt32(fields["totalBuyers"])
             });
         }
+
+        stopwatch.Stop();
+        return new ViralProductsResult
+        {
+            UserId = userId,
+            Level = level,
+            CircleSize = record is null ? 0 : (int)record["circleSize"].As<long>(),
+            Items = items.OrderByDescending(p => p.Buyers).ThenBy(p => p.ArticleId.ToString()).ToList(),
+            RequestTimeInMilliseconds = stopwatch.ElapsedMilliseconds
+        };
     }
 
     /// <summary>
-    /// 
+    /// FOLLOWS relationships, partitioned by (follower group, following group) pairs so that the batches
+    /// running at the same time never lock the same users.
+    /// fresh: the edges are new (no duplicate in the request, none in the graph), CREATE instead of MERGE.
+    /// User.followersCount / followingCount are incremented for each created edge only.
     /// </summary>
     /// <param name="follows"></param>
+    /// <param name="fresh"></param>
     /// <returns></returns>
-    public async Task BulkImportSocialGraph(List<FollowDto> follows)
+    public async Task BulkImportSocialGraph(List<FollowDto> follows, bool fresh = false)
     {
-        const int BATCH_SIZE = 1000;
+        var cypher = $@"
+            UNWIND $rows AS row
+            MATCH (follower:User {{id: row.followerId}})
+            MATCH (following:User {{id: row.followingId}})
+            {(fresh ? "CREATE" : "MERGE")} (follower)-[:FOLLOWS]->(following)
+            {(fresh ? "SET" : "ON CREATE SET")} follower.followingCount = coalesce(follower.followingCount, 0) + 1,
+                following.followersCount = coalesce(following.followersCount, 0) + 1";
+
+        await ImportAsync("Social graph", cypher, PairRounds(follows, f => f.FollowerId, f => f.FollowingId), f => new
+        {
+            followerId = f.FollowerId.ToString(),
+            followingId = f.FollowingId.ToString()
+        },
+        // Après chaque commit : les cercles touchés par ces arêtes ne sont plus à jour
+        batch => _circles.Invalidate(Database.Neo4j, batch.Select(f => f.FollowerId)));
+    }
 
-        await using var session = _driver.AsyncSession(o => o.WithDefaultAccessMode(AccessMode.Write));
+    /// <summary>
+    /// Runs the rounds one after another; the partitions of a round run in parallel (at most Parallelism
+    /// write sessions), each one by batches of BatchSize rows. committed is called after each batch commit.
+    /// The per-batch timings are kept in ImportBatches.
+    /// </summary>
+    private async Task ImportAsync<T>(string entity, string cypher, List<List<ImportPartition<T>>> rounds,
+        Func<T, object> toRow, Action<T[]>? committed = null)
+    {
+        var stopwatch = Stopwatch.StartNew();
+        var timings = new ConcurrentBag<ImportBatchTiming>();
+        var batchCount = 0;
+        var options = new ParallelOptions { MaxDegreeOfParallelism = _import.Parallelism };
 
-        for (int i = 0; i < follows.Count; i += BATCH_SIZE)
+        try
         {
-            var batch = follows.Skip(i).Take(BATCH_SIZE).Select(f => new
+            for (var round = 0; round < rounds.Count; round++)
             {
-                followerId = f.FollowerId.ToString(),
-                followingId = f.FollowingId.ToString()
-            }).ToList();
+                var roundIndex = round;
+                await Parallel.ForEachAsync(rounds[round], options, async (partition, _) =>
+                {
+                    await using var session = _driver.AsyncSession(o => o.WithDefaultAccessMode(AccessMode.Write));
+                    foreach (var batch in partition.Rows.Chunk(_import.BatchSize))
+                    {
+                        var index = Interlocked.Increment(ref batchCount);
+                        var rows = batch.Select(toRow).ToList();
+                        var batchWatch = Stopwatch.StartNew();
+                        var (attempts, deadlocks) = (0, 0);
+                        var created = await session.ExecuteWriteAsync(async tx =>
+                        {
+                            attempts++;
+                            try
+                            {
+                                var result = await tx.RunAsync(cypher, new { rows });
+                                var counters = (await result.ConsumeAsync()).Counters;
+                                return counters.NodesCreated + counters.RelationshipsCreated;
+                            }
+                            catch (TransientException e) when (e.Code == DeadlockDetected)
+                            {
+                                // Compté puis relancé : le driver rejoue la transaction
+                                deadlocks++;
+                                throw;
+                            }
+                        });
+                        timings.Add(new ImportBatchTiming
+                        {
+                            Batch = index,
+                            Round = roundIndex,
+                            Partition = partition.Name,
+                            Rows = batch.Length,
+                            Created = created,
+                            Attempts = attempts,
+                            Deadlocks = deadlocks,
+                            Ms = batchWatch.Elapsed.TotalMilliseconds
+                        });
+                        committed?.Invoke(batch);
+                    }
+                });
+            }
+        }
+        finally
+        {
+            // Aussi en cas d'échec : les batches déjà commités restent dans le graphe
+            ImportBatches = timings.OrderBy(t => t.Batch).ToList();
+        }
+
+        _logger.LogInformation("Neo4j {Entity} import: {Rows} rows, {Batches} batches, {Rounds} rounds, {Created} created, {Retries} retries ({Deadlocks} deadlocks) in {Ms} ms",
+            entity, ImportBatches.Sum(t => t.Rows), ImportBatches.Count, rounds.Count, ImportBatches.Sum(t => t.Created),
+            ImportBatches.Sum(t => t.Attempts - 1), ImportBatches.Sum(t => t.Deadlocks), stopwatch.ElapsedMilliseconds);
+    }
+
+    private sealed record ImportPartition<T>(string Name, List<T> Rows);
+
+    /// <summary>
+    /// Rows processed by a single write session, in their original order
+    /// </summary>
+    private static List<List<ImportPartition<T>>> Sequential<T>(List<T> rows) =>
+        [[new ImportPartition<T>("0", rows)]];
+
+    /// <summary>
+    /// Nodes: independent rows, one round of Parallelism contiguous slices
+    /// </summary>
+    private List<List<ImportPartition<T>>> NodeRounds<T>(List<T> rows)
+    {
+        if (_import.Parallelism == 1 || rows.Count <= _import.BatchSize)
+            return Sequential(rows);
+
+        var sliceSize = (rows.Count + _import.Parallelism - 1) / _import.Parallelism;
+        return [rows.Chunk(sliceSize).Select((slice, i) => new ImportPartition<T>(i.ToString(), slice.ToList())).ToList()];
+    }
 
-            await session.ExecuteWriteAsync(async tx =>
+    /// <summary>
+    /// Relationships between users: both ends are hashed into 2 × Parallelism groups, a partition holds the
+    /// edges between two groups (both directions). Round-robin rounds pair every group with another one
+    /// exactly once, a last round takes the edges inside each group: within a round, no two partitions
+    /// touch the same user, so the concurrent transactions cannot deadlock on each other's node locks.
+    /// </summary>
+    private List<List<ImportPartition<T>>> PairRounds<T>(List<T> rows, Func<T, Guid> from, Func<T, Guid> to)
+    {
+        if (_import.Parallelism == 1 || rows.Count <= _import.BatchSize)
+            return Sequential(rows);
+
+        var groups = 2 * _import.Parallelism;
+        var buckets = new Dictionary<(int, int), List<T>>();
+        foreach (var row in rows)
+        {
+            var (a, b) = (GroupOf(from(row), groups), GroupOf(to(row), groups));
+            var key = a <= b ? (a, b) : (b, a);
+            if (!buckets.TryGetValue(key, out var bucket))
+                buckets[key] = bucket = [];
+            bucket.Add(row);
+        }
+
+        // Méthode du cercle : le groupe groups-1 reste fixe, les autres tournent
+        var rounds = new List<List<(int, int)>>();
+        for (var r = 0; r < groups - 1; r++)
+        {
+            var pairs = new List<(int, int)> { (r, groups - 1) };
+            for (var k = 1; k < groups / 2; k++)
             {
-                var result = await tx.RunAsync(@"
-                    UNWIND $follows as follow
-                    MATCH (follower:User {id: follow.followerId})
-                    MATCH (following:User {id: follow.followingId})
-                    MERGE (follower)-[:FOLLOWS]->(following)",
-                    new { follows = batch });
-
-                var summary = await result.ConsumeAsync();
-                _logger.LogInformation($"FOLLOWS batch processed. Relationships created: {summary.Counters.RelationshipsCreated}");
-            });
+                var (a, b) = ((r + k) % (groups - 1), (r - k + groups - 1) % (groups - 1));
+                pairs.Add(a <= b ? (a, b) : (b, a));
+            }
+            rounds.Add(pairs);
         }
+        rounds.Add(Enumerable.Range(0, groups).Select(g => (g, g)).ToList());
+
+        return ToPartitions(rounds, buckets);
     }
 
     /// <summary>
-    /// 
+    /// Relationships between two labels: each end is hashed into Parallelism groups, round r holds the
+    /// partitions (i, i + r mod Parallelism), so a round uses every group of each side once.
+    /// </summary>
+    private List<List<ImportPartition<T>>> GridRounds<T>(List<T> rows, Func<T, Guid> from, Func<T, Guid> to)
+    {
+        if (_import.Parallelism == 1 || rows.Count <= _import.BatchSize)
+            return Sequential(rows);
+
+        var groups = _import.Parallelism;
+        var buckets = new Dictionary<(int, int), List<T>>();
+        foreach (var row in rows)
+        {
+            var key = (GroupOf(from(row), groups), GroupOf(to(row), groups));
+            if (!buckets.TryGetValue(key, out var bucket))
+                buckets[key] = bucket = [];
+            bucket.Add(row);
+        }
+
+        var rounds = Enumerable.Range(0, groups)
+            .Select(r => Enumerable.Range(0, groups).Select(i => (i, (i + r) % groups)).ToList())
+            .ToList();
+
+        return ToPartitions(rounds, buckets);
+    }
+
+    private static List<List<ImportPartition<T>>> ToPartitions<T>(List<List<(int, int)>> rounds, Dictionary<(int, int), List<T>> buckets) =>
+        rounds
+            .Select(pairs => pairs
+                .Where(buckets.ContainsKey)
+                .Select(pair => new ImportPartition<T>(pair.Item1 == pair.Item2 ? $"{pair.Item1}" : $"{pair.Item1}-{pair.Item2}", buckets[pair]))
+                .ToList())
+            .Where(partitions => partitions.Count > 0)
+            .ToList();
+
+    private static int GroupOf(Guid id, int groups) => (int)((uint)id.GetHashCode() % (uint)groups);
+
+    /// <summary>
+    /// MATCH ... WHERE part (shared by the data and count queries), RETURN ... ORDER BY clause and parameters.
+    /// The text only depends on the query shape (entity, level, filter fields, sort, seek): values are parameters.
+    /// Rows are ordered by (sortKey, sortId); with seek, only rows after the cursor's (sortKey, sortId) match.
     /// </summary>
     /// <param name="request"></param>
+    /// <param name="seek"></param>
+    /// <param name="circle">Follower circle ids taken from the circle cache, passed as $circle</param>
     /// <returns></returns>
-    private string BuildCypherForEntity(QueryBuilderRequest request)
+    private (string Body, string Return, Dictionary<string, object?> Parameters) BuildCypherForEntity(QueryBuilderRequest request, bool seek, List<string>? circle = null)
     {
+        var parameters = new Dictionary<string, object?>();
+        if (request.UserId.HasValue)
+            parameters["userId"] = request.UserId.Value.ToString();
+
+        string circleClause = "";
         string matchClause;
         string returnClause;
 
-        if (request.UserId.HasValue && request.FollowingLevel.HasValue && request.FollowingLevel > 0)
+        if (request.UserId.HasValue && request.FollowingLevel.HasValue && request.FollowingLevel > 0
+            && (circle is not null || request.Traversal == TraversalMode.SetBased))
         {
+            var circleAlias = request.Entity switch
+            {
+                Entity.Users => "target",
+                Entity.Articles => "friend",
+                _ => "u",
+            };
+            if (circle is not null)
+            {
+                // Cercle déjà connu (cache) : accès direct aux users par l'index unique sur id
+                parameters["circle"] = circle;
+                circleClause = $"UNWIND $circle AS circleId MATCH ({circleAlias}:User {{id: circleId}}) ";
+            }
+            else
+            {
+                // Cercle résolu en largeur par la base : chaque user atteint n'est lié qu'une fois
+                circleClause = CircleCypher(request.FollowingLevel.Value, circleAlias);
+            }
             matchClause = request.Entity switch
             {
-                Entity.Users => $"(me:User {{id: '{request.UserId}'}})-[:FOLLOWS*1..{request.FollowingLevel}]->(target:User)",
-                Entity.Articles => $"(me:User {{id: '{request.UserId}'}})-[:FOLLOWS*1..{request.FollowingLevel}]->(friend:User)-[:BOUGHT]->(target:Article)",
-                Entity.Orders => $"(me:User {{id: '{request.UserId}'}})-[:FOLLOWS*1..{request.FollowingLevel}]->(u:User)-[r:BOUGHT]->(a:Article)",
+                Entity.Users => "(target)",
+                Entity.Articles => "(friend)-[:BOUGHT]->(target:Article)",
+                Entity.Orders => "(u)-[r:BOUGHT]->(a:Article)",
+                _ => "(target)"
+            };
+        }
+        else if (request.UserId.HasValue && request.FollowingLevel.HasValue && request.FollowingLevel > 0)
+        {
+            matchClause = request.Entity switch
+            {
+                Entity.Users => $"(me:User {{id: $userId}})-[:FOLLOWS*1..{request.FollowingLevel}]->(target:User)",
+                Entity.Articles => $"(me:User {{id: $userId}})-[:FOLLOWS*1..{request.FollowingLevel}]->(friend:User)-[:BOUGHT]->(target:Article)",
+                Entity.Orders => $"(me:User {{id: $userId}})-[:FOLLOWS*1..{request.FollowingLevel}]->(u:User)-[r:BOUGHT]->(a:Article)",
                 _ => "(target)"
             };
         }
@@ -245,14 +674,50 @@ public class Neo4jDbService : IDbService
 
         returnClause = request.Entity switch
         {
-            Entity.Users => "RETURN target { .*, followingCount: COUNT { (target)-[:FOLLOWS]->() }, followersCount: COUNT { (target)<-[:FOLLOWS]-() } } as user",
+            Entity.Users => "RETURN target { .*, followingCount: coalesce(target.followingCount, 0), followersCount: coalesce(target.followersCount, 0) } as user",
             Entity.Articles => "RETURN DISTINCT target",
             Entity.Orders => "RETURN id(r) as id, u.id as userId, a.id as articleId, r.quantity as quantity, r.totalPrice as totalPrice",
             _ => "RETURN target"
         };
 
+        // Clé de tri + identifiant unique pour départager (les BOUGHT n'ont pas d'id : elementId)
+        var (sortKey, sortId) = request.Entity switch
+        {
+            Entity.Articles => (request.OrderByAs<ArticlesOrderBy>() switch
+            {
+                ArticlesOrderBy.Name => "target.name",
+                ArticlesOrderBy.Price => "target.price",
+                _ => "target.id"
+            }, "target.id"),
+            Entity.Users => (request.OrderByAs<UsersOrderBy>() switch
+            {
+                UsersOrderBy.UserName => "target.name",
+                UsersOrderBy.Email => "target.email",
+                UsersOrderBy.FollowersCount => "target.followersCount",
+                UsersOrderBy.FollowingCount => "target.followingCount",
+                _ => "target.id"
+            }, "target.id"),
+            Entity.Orders => (request.OrderByAs<OrdersOrderBy>() switch
+            {
+                OrdersOrderBy.UserId => "u.id",
+                OrdersOrderBy.ArticleId => "a.id",
+                OrdersOrderBy.Quantity => "r.quantity",
+                OrdersOrderBy.TotalPrice => "r.totalPrice",
+                _ => "elementId(r)"
+            }, "elementId(r)"),
+            _ => ("target.id", "target.id")
+        };
+        var direction = request.OrderDirection == OrderDirection.Descending ? "DESC" : "ASC";
+        returnClause += $", {sortKey} AS sortKey, {sortId} AS sortId ORDER BY sortKey {direction}, sortId {direction}";
+
         var whereParts = new List<string>();
-        foreach (var filter in request.Filters)
+        if (sortKey is "target.followersCount" or "target.followingCount")
+        {
+            // Prédicat sur la propriété : le planner peut lire l'index dans l'ordre du tri. N'écarte personne :
+            // les users sont créés à 0 et EnsureSchemaAsync rattrape ceux importés avant les compteurs
+            whereParts.Add($"{sortKey} IS NOT NULL");
+        }
+        foreach (var (filter, index) in request.Filters.Select((filter, index) => (filter, index)))
         {
             string fieldName = request.Entity switch
             {
@@ -274,15 +739,99 @@ public class Neo4jDbService : IDbService
                 _ => char.ToLower(fieldName[0]) + fieldName.Substring(1)
             };
 
-            if (filter.Operator == FilterOperator.Equals)
+            if (fieldName is "FollowersCount" or "FollowingCount")
+            {
+                // Compteurs maintenus à l'import : comparaison sur la propriété indexée
+                parameters[$"f{index}"] = (long)filter.IntValue();
+                whereParts.Add($"{alias}.{propertyName} {CountOperator(filter.Operator)} $f{index}");
+            }
+            else if (filter.Operator == FilterOperator.Equals)
             {
-                var val = filter.Value?.ToString();
-                whereParts.Add($"{alias}.{propertyName} = '{val}'");
+                parameters[$"f{index}"] = ParameterValue(filter.Value);
+                whereParts.Add($"{alias}.{propertyName} = $f{index}");
             }
         }
 
+        if (seek && request.Cursor is not null)
+        {
+            var (cursorKey, cursorId) = PageCursor.Decode(request.Cursor);
+            parameters["afterKey"] = ParameterValue(cursorKey);
+            parameters["afterId"] = cursorId;
+            var op = request.OrderDirection == OrderDirection.Descending ? "<" : ">";
+            whereParts.Add($"({sortKey} {op} $afterKey OR ({sortKey} = $afterKey AND {sortId} {op} $afterId))");
+        }
+
         var whereClause = whereParts.Any() ? "WHERE " + string.Join(" AND ", whereParts) : "";
 
-        return $"MATCH {matchClause} {whereClause} {returnClause}";
+        return ($"{circleClause}MATCH {matchClause} {whereClause}", returnClause, parameters);
     }
+
+    /// <summary>
+    /// Users followed by the frontier users (one hop, for the circle cache)
+    /// </summary>
+    private static async Task<IReadOnlyCollection<Guid>> FollowedByAsync(IAsyncQueryRunner tx, Guid[] frontier)
+    {
+        var result = await tx.RunAsync(
+            "UNWIND $frontier AS id MATCH (:User {id: id})-[:FOLLOWS]->(n:User) RETURN DISTINCT n.id AS id",
+            new { frontier = frontier.Select(id => id.ToString()).ToList() });
+        return (await result.ToListAsync()).Select(record => Guid.Parse(record["id"].As<string>())).ToList();
+    }
+
+    /// <summary>
+    /// Follower circles of several (user, level) pairs with one multi-source BFS over FOLLOWS
+    /// (each user's edges read once for all the circles, see FollowerCircleBatch)
+    /// </summary>
+    /// <param name="circles"></param>
+    /// <returns></returns>
+    public async Task<Dictionary<(Guid UserId, int Level), Guid[]>> ResolveCirclesAsync(IEnumerable<(Guid UserId, int Level)> circles)
+    {
+        var wanted = circles.ToList();
+        await using var session = _driver.AsyncSession();
+        return await session.ExecuteReadAsync(tx => FollowerCircleBatch.ResolveAsync(wanted, users => FollowsFromAsync(tx, users)));
+    }
+
+    /// <summary>
+    /// FOLLOWS edges leaving users (one BFS step of ResolveCirclesAsync)
+    /// </summary>
+    private static async Task<IReadOnlyCollection<(Guid Follower, Guid Followed)>> FollowsFromAsync(IAsyncQueryRunner tx, Guid[] users)
+    {
+        var result = await tx.RunAsync(
+            "UNWIND $users AS id MATCH (f:User {id: id})-[:FOLLOWS]->(n:User) RETURN f.id AS follower, n.id AS followed",
+            new { users = users.Select(id => id.ToString()).ToList() });
+        return (await result.ToListAsync())
+            .Select(record => (Guid.Parse(record["follower"].As<string>()), Guid.Parse(record["followed"].As<string>())))
+            .ToList();
+    }
+
+    /// <summary>
+    /// JSON filter value as a Cypher parameter (numbers stay numbers)
+    /// </summary>
+    private static string CountOperator(FilterOperator op) => op switch
+    {
+        FilterOperator.Equals => "=",
+        FilterOperator.GreaterThan => ">",
+        FilterOperator.GreaterThanOrEqual => ">=",
+        FilterOperator.LessThan => "<",
+        FilterOperator.LessThanOrEqual => "<=",
+        _ => throw new ArgumentException($"Operator {op} is not supported on a count field")
+    };
+
+    private static object? ParameterValue(object? value) => value switch
+    {
+        JsonElement { ValueKind: JsonValueKind.Number } number => number.GetDouble(),
+        JsonElement { ValueKind: JsonValueKind.True or JsonValueKind.False } flag => flag.GetBoolean(),
+        JsonElement { ValueKind: JsonValueKind.Null } => null,
+        JsonElement element => element.ValueKind == JsonValueKind.String ? element.GetString() : element.ToString(),
+        _ => value?.ToString()
+    };
+
+    /// <summary>
+    /// Users reached from me in 1..levels FOLLOWS hops, each bound once to alias.
+    /// ANY SHORTEST keeps one path per reached user: the planner runs a breadth-first search that marks
+    /// the nodes it has seen (me included when a cycle leads back to it), so each user's FOLLOWS are
+    /// expanded once and the work grows with the circle size, not with the number of paths.
+    /// </summary>
+    private static string CircleCypher(int levels, string alias) =>
+        // Un seul plus court chemin par user atteint : BFS avec ensemble de nœuds visités côté moteur
+        $"MATCH ANY SHORTEST (me:User {{id: $userId}})-[:FOLLOWS]->{{1,{levels}}}(reachedUser:User) WITH reachedUser AS {alias} ";
 }
\ No newline at end of file
@@ -0,0 +1,8 @@
+﻿namespace Server.Services;
+
+/// <summary>
+/// Neo4j bulk import settings (singleton): rows per write transaction and concurrent write sessions
+/// </summary>
+/// <param name="BatchSize"></param>
+/// <param name="Parallelism"></param>
+public record Neo4jImportOptions(int BatchSize, int Parallelism);
@@ -0,0 +1,41 @@
+﻿using System.Buffers.Text;
+using System.Text.Json;
+
+namespace Server.Services;
+
+/// <summary>
+/// Opaque keyset cursor: (sort key of the last row, id of the last row) as base64url JSON
+/// </summary>
+public static class PageCursor
+{
+    /// <summary>
+    /// 
+    /// </summary>
+    /// <param name="key"></param>
+    /// <param name="id"></param>
+    /// <returns></returns>
+    public static string Encode(object? key, string id)
+    {
+        return Base64Url.EncodeToString(JsonSerializer.SerializeToUtf8Bytes(new object?[] { key, id }));
+    }
+
+    /// <summary>
+    /// 
+    /// </summary>
+    /// <param name="cursor"></param>
+    /// <returns></returns>
+    /// <exception cref="ArgumentException">Cursor not produced by Encode</exception>
+    public static (JsonElement Key, string Id) Decode(string cursor)
+    {
+        try
+        {
+            var parts = JsonSerializer.Deserialize<JsonElement[]>(Base64Url.DecodeFromChars(cursor));
+            if (parts is [var key, { ValueKind: JsonValueKind.String } id])
+                return (key, id.GetString()!);
+        }
+        catch (Exception ex) when (ex is FormatException or JsonException)
+        {
+        }
+        throw new ArgumentException($"Invalid cursor '{cursor}'", nameof(cursor));
+    }
+}
@@ -7,8 +7,10 @@ using Server.Models.Dtos;
 using Server.Models.Requests;
 using Server.Models.Requests.Enums;
 using Server.Models.Requests.Enums.Fields;
+using Server.Models.Queries.Enums;
 using Server.Models.Responses;
 using System.Diagnostics;
+using System.Linq.Expressions;
 
 namespace Server.Services;
 
@@ -19,24 +21,35 @@ public class PostgresDbService : IDbService
 {
     private readonly PostgresDbContext _context;
     private readonly ILogger<PostgresDbService> _logger;
+    private readonly QueryShapeTracker _shapes;
+    private readonly FollowerCircleCache _circles;
 
     /// <summary>
     /// 
     /// </summary>
     /// <param name="dbContext"></param>
     /// <param name="logger"></param>
-    public PostgresDbService(PostgresDbContext dbContext, ILogger<PostgresDbService> logger)
+    /// <param name="shapes"></param>
+    /// <param name="circles"></param>
+    public PostgresDbService(PostgresDbContext dbContext, ILogger<PostgresDbService> logger, QueryShapeTracker shapes, FollowerCircleCache circles)
     {
         _context = dbContext;
         _logger = logger;
+        _shapes = shapes;
+        _circles = circles;
     }
 
     /// <summary>
     /// Execute QueryBuilder par Entity (switch complet)
     /// </summary>
-    public async Task<PaginatedResult<dynamic>> ExecuteQueryAsync(QueryBuilderRequest request)
+    /// <param name="request"></param>
+    /// <param name="resolvedCircle">Follower circle already resolved by the caller (batch), used instead of the cache or a traversal</param>
+    public async Task<PaginatedResult<dynamic>> ExecuteQueryAsync(QueryBuilderRequest request, Guid[]? resolvedCircle = null)
     {
         var stopwatch = Stopwatch.StartNew();
+        var timings = new QueryTimings();
+        timings.QueryShapeReuse = _shapes.Record(Database.Postgres, QueryShape(request, resolvedCircle is not null));
+        timings.TraversedUsers = resolvedCircle?.Length;
 
         _logger.LogInformation("Executing QueryBuilder: Entity={Entity}", request.Entity);
 
@@ -44,14 +57,15 @@ public class PostgresDbService : IDbService
         {
             var result = request.Entity switch
             {
-                Entity.Articles => await ExecuteArticlesQuery(request),
-                Entity.Users => await ExecuteUsersQuery(request),
-                Entity.Orders => await ExecuteOrdersQuery(request),
+                Entity.Articles => await ExecuteArticlesQuery(request, timings, resolvedCircle),
+                Entity.Users => await ExecuteUsersQuery(request, timings, resolvedCircle),
+                Entity.Orders => await ExecuteOrdersQuery(request, timings, resolvedCircle),
                 _ => throw new ArgumentException($"Entity {request.Entity} not supported")
             };
 
             stopwatch.Stop();
             result.RequestTimeInMilliseconds = stopwatch.ElapsedMilliseconds;
+            result.Timings = timings;
 
             _logger.LogInformation("QueryBuilder OK: Entity={Entity}, Time={Time}ms, Count={Count}",
                 request.Entity, result.RequestTimeInMilliseconds, result.TotalCount);
@@ -71,14 +85,31 @@ public class PostgresDbService : IDbService
     /// </summary>
     /// <param name="request"></param>
     /// <returns></returns>
-    private async Task<PaginatedResult<dynamic>> ExecuteArticlesQuery(QueryBuilderRequest request)
+    private async Task<PaginatedResult<dynamic>> ExecuteArticlesQuery(QueryBuilderRequest request, QueryTimings timings, Guid[]? resolvedCircle)
     {
+        var phase = Stopwatch.StartNew();
         var query = _context.Articles.AsQueryable();
 
         if (request.UserId.HasValue && request.FollowingLevel.HasValue && request.FollowingLevel > 0)
         {
-            var reachableUsers = await GetReachableUsersAsync(request.UserId.Value, request.FollowingLevel.Value);
-            query = query.Where(a => a.Orders.Any(o => reachableUsers.Contains(o.UserId)));
+            if (resolvedCircle is not null || UseCircleCache(request))
+            {
+                var circle = resolvedCircle ?? await CachedCircleAsync(request, timings, phase);
+                query = query.Where(a => a.Orders.Any(o => circle.Contains(o.UserId)));
+            }
+            else if (request.Traversal == TraversalMode.Legacy)
+            {
+                timings.BuildMs += QueryTimings.Lap(phase);
+                var reachableUsers = await GetReachableUsersAsync(request.UserId.Value, request.FollowingLevel.Value);
+                timings.TraversalMs = QueryTimings.Lap(phase);
+                timings.TraversedUsers = reachableUsers.Count;
+                query = query.Where(a => a.Orders.Any(o => reachableUsers.Contains(o.UserId)));
+            }
+            else
+            {
+                var circle = ReachableUsersQuery(request.UserId.Value, request.FollowingLevel.Value);
+                query = query.Where(a => a.Orders.Any(o => circle.Contains(o.UserId)));
+            }
         }
 
         // ArticlesFields
@@ -87,44 +118,45 @@ public class PostgresDbService : IDbService
             query = ApplyArticlesFilter(query, filter);
         }
 
-        if (request.OrderByField is ArticlesOrderBy orderBy)
-        {
-            query = ApplyArticlesOrderBy(query, orderBy, request.OrderDirection);
-        }
-
-        var totalCount = await query.CountAsync();
-        var items = await query
-            .Skip((request.Page - 1) * request.PageSize)
-            .Take(request.PageSize)
-            .Select(a => new { a.Id, a.Name, a.Price })
-            .Distinct()
-            .Cast<dynamic>()
-            .ToListAsync();
-
-        return new PaginatedResult<dynamic>
+        SortKey<Article> sort = request.OrderByAs<ArticlesOrderBy>() switch
         {
-            Items = items,
-            TotalCount = totalCount,
-            Page = request.Page,
-            PageSize = request.PageSize
+            ArticlesOrderBy.Name => new SortKey<Article, string>(a => a.Name, a => a.Id, "Name"),
+            ArticlesOrderBy.Price => new SortKey<Article, decimal>(a => a.Price, a => a.Id, "Price"),
+            _ => new SortKey<Article, Guid>(a => a.Id, a => a.Id, "Id")
         };
+
+        return await ReadPageAsync(query, sort, a => new { a.Id, a.Name, a.Price }, request, timings, phase);
     }
     /// <summary>
     /// 
     /// </summary>
     /// <param name="request"></param>
     /// <returns></returns>
-    private async Task<PaginatedResult<dynamic>> ExecuteUsersQuery(QueryBuilderRequest request)
+    private async Task<PaginatedResult<dynamic>> ExecuteUsersQuery(QueryBuilderRequest request, QueryTimings timings, Guid[]? resolvedCircle)
     {
-        var query = _context.Users
-            .Include(u => u.Followers)
-            .Include(u => u.Following)
-            .AsQueryable();
+        var phase = Stopwatch.StartNew();
+        var query = _context.Users.AsQueryable();
 
         if (request.UserId.HasValue && request.FollowingLevel.HasValue && request.FollowingLevel > 0)
         {
-            var reachableUsers = await GetReachableUsersAsync(request.UserId.Value, request.FollowingLevel.Value);
-            query = query.Where(u => reachableUsers.Contains(u.Id));
+            if (resolvedCircle is not null || UseCircleCache(request))
+            {
+                var circle = resolvedCircle ?? await CachedCircleAsync(request, timings, phase);
+                query = query.Where(u => circle.Contains(u.Id));
+            }
+            else if (request.Traversal == TraversalMode.Legacy)
+            {
+                timings.BuildMs += QueryTimings.Lap(phase);
+                var reachableUsers = await GetReachableUsersAsync(request.UserId.Value, request.FollowingLevel.Value);
+                timings.TraversalMs = QueryTimings.Lap(phase);
+                timings.TraversedUsers = reachableUsers.Count;
+                query = query.Where(u => reachableUsers.Contains(u.Id));
+            }
+            else
+            {
+                var circle = ReachableUsersQuery(request.UserId.Value, request.FollowingLevel.Value);
+                query = query.Where(u => circle.Contains(u.Id));
+            }
         }
 
         foreach (var filter in request.Filters)
@@ -132,34 +164,23 @@ public class PostgresDbService : IDbService
             query = ApplyUsersFilter(query, filter);
         }
 
-        if (request.OrderByField is UsersOrderBy orderBy)
+        SortKey<User> sort = request.OrderByAs<UsersOrderBy>() switch
         {
-            query = ApplyUsersOrderBy(query, orderBy, request.OrderDirection);
-
-        }
-
-        var totalCount = await query.CountAsync();
-        var items = await query
-            .Skip((request.Page - 1) * request.PageSize)
-            .Take(request.PageSize)
-            .Select(u => new
-            {
-                u.Id,
-                u.Name,
-                u.Email,
-                FollowersCount = u.Followers.Count,
-                FollowingCount = u.Following.Count
-            })
-            .Cast<dynamic>()
-            .ToListAsync();
+            UsersOrderBy.UserName => new SortKey<User, string>(u => u.Name, u => u.Id, "Name"),
+            UsersOrderBy.Email => new SortKey<User, string>(u => u.Email, u => u.Id, "Email"),
+            UsersOrderBy.FollowersCount => new SortKey<User, int>(u => u.FollowersCount, u => u.Id, "FollowersCount"),
+            UsersOrderBy.FollowingCount => new SortKey<User, int>(u => u.FollowingCount, u => u.Id, "FollowingCount"),
+            _ => new SortKey<User, Guid>(u => u.Id, u => u.Id, "Id")
+        };
 
-        return new PaginatedResult<dynamic>
+        return await ReadPageAsync(query, sort, u => new
         {
-            Items = items.Cast<dynamic>().ToList(),
-            TotalCount = totalCount,
-            Page = request.Page,
-            PageSize = request.PageSize
-        };
+            u.Id,
+            u.Name,
+            u.Email,
+            u.FollowersCount,
+            u.FollowingCount
+        }, request, timings, phase);
     }
 
     /// <summary>
@@ -167,8 +188,9 @@ public class PostgresDbService : IDbService
     /// </summary>
     /// <param name="request"></param>
     /// <returns></returns>
-    private async Task<PaginatedResult<dynamic>> ExecuteOrdersQuery(QueryBuilderRequest request)
+    private async Task<PaginatedResult<dynamic>> ExecuteOrdersQuery(QueryBuilderRequest request, QueryTimings timings, Guid[]? resolvedCircle)
     {
+        var phase = Stopwatch.StartNew();
         var query = _context.Orders
             .Include(o => o.Article)
             .Include(o => o.User)
@@ -176,8 +198,24 @@ public class PostgresDbService : IDbService
 
         if (request.UserId.HasValue && request.FollowingLevel.HasValue && request.FollowingLevel > 0)
         {
-            var reachableUsers = await GetReachableUsersAsync(request.UserId.Value, request.FollowingLevel.Value);
-            query = query.Where(o => reachableUsers.Contains(o.UserId));
+            if (resolvedCircle is not null || UseCircleCache(request))
+            {
+                var circle = resolvedCircle ?? await CachedCircleAsync(request, timings, phase);
+                query = query.Where(o => circle.Contains(o.UserId));
+            }
+            else if (request.Traversal == TraversalMode.Legacy)
+            {
+                timings.BuildMs += QueryTimings.Lap(phase);
+                var reachableUsers = await GetReachableUsersAsync(request.UserId.Value, request.FollowingLevel.Value);
+                timings.TraversalMs = QueryTimings.Lap(phase);
+                timings.TraversedUsers = reachableUsers.Count;
+                query = query.Where(o => reachableUsers.Contains(o.UserId));
+            }
+            else
+            {
+                var circle = ReachableUsersQuery(request.UserId.Value, request.FollowingLevel.Value);
+                query = query.Where(o => circle.Contains(o.UserId));
+            }
         }
 
         foreach (var filter in request.Filters)
@@ -185,35 +223,153 @@ public class PostgresDbService : IDbService
             query = ApplyOrdersFilter(query, filter);
         }
 
-        if (request.OrderByField is OrdersOrderBy orderBy)
+        // TotalPrice n'est pas mappé : on trie sur son expression SQL
+        SortKey<Order> sort = request.OrderByAs<OrdersOrderBy>() switch
         {
-            query = ApplyOrdersOrderBy(query, orderBy, request.OrderDirection);
+            OrdersOrderBy.UserId => new SortKey<Order, Guid>(o => o.UserId, o => o.Id, "UserId"),
+            OrdersOrderBy.ArticleId => new SortKey<Order, Guid>(o => o.ArticleId, o => o.Id, "ArticleId"),
+            OrdersOrderBy.Quantity => new SortKey<Order, int>(o => o.Quantity, o => o.Id, "Quantity"),
+            OrdersOrderBy.TotalPrice => new SortKey<Order, decimal>(o => o.Quantity * o.Article.Price, o => o.Id, "TotalPrice"),
+            _ => new SortKey<Order, Guid>(o => o.Id, o => o.Id, "Id")
+        };
+
+        return await ReadPageAsync(query, sort, o => new
+        {
+            o.Id,
+            o.UserId,
+            o.ArticleId,
+            o.Quantity,
+            o.TotalPrice
+        }, request, timings, phase);
+    }
 
+    /// <summary>
+    /// Count according to CountMode, then one page ordered by (sort key, Id): OFFSET without cursor,
+    /// otherwise a seek on (key, Id) past the cursor, which the (key, Id) order lets an index serve.
+    /// One extra row is read to know whether there is a next page.
+    /// </summary>
+    private static async Task<PaginatedResult<dynamic>> ReadPageAsync<T, TRow>(IQueryable<T> query, SortKey<T> sort,
+        Expression<Func<T, TRow>> projection, QueryBuilderRequest request, QueryTimings timings, Stopwatch phase)
+    {
+        var descending = request.OrderDirection == OrderDirection.Descending;
+        var page = request.Cursor is null
+            ? sort.Order(query, descending).Skip((request.Page - 1) * request.PageSize)
+            : sort.Order(sort.After(query, request.Cursor, descending), descending);
+        timings.BuildMs += QueryTimings.Lap(phase);
+
+        int? totalCount = null;
+        var estimated = false;
+        if (request.CountMode == CountMode.Exact)
+        {
+            totalCount = await query.CountAsync();
         }
+        else if (request.CountMode == CountMode.Estimate)
+        {
+            var counted = await query.Take(QueryBuilderRequest.EstimateCountCap + 1).CountAsync();
+            estimated = counted > QueryBuilderRequest.EstimateCountCap;
+            totalCount = Math.Min(counted, QueryBuilderRequest.EstimateCountCap);
+        }
+        timings.CountQueryMs = QueryTimings.Lap(phase);
 
-        var totalCount = await query.CountAsync();
-        var items = await query
-            .Skip((request.Page - 1) * request.PageSize)
-            .Take(request.PageSize)
-            .Select(o => new
-            {
-                o.Id,
-                o.UserId,
-                o.ArticleId,
-                o.Quantity,
-                o.TotalPrice
-            })
+        var rows = await page
+            .Take(request.PageSize + 1)
+            .Select(projection)
             .ToListAsync();
+        timings.DataQueryMs = QueryTimings.Lap(phase);
+
+        var hasMore = rows.Count > request.PageSize;
+        if (hasMore)
+            rows.RemoveAt(rows.Count - 1);
+        var items = rows.Cast<dynamic>().ToList();
+        timings.MaterializationMs = QueryTimings.Lap(phase);
+        timings.RowsReturned = items.Count;
 
         return new PaginatedResult<dynamic>
         {
-            Items = items.Cast<dynamic>().ToList(),
+            Items = items,
             TotalCount = totalCount,
+            TotalCountIsEstimate = estimated,
+            NextCursor = hasMore ? sort.Cursor(rows[^1]!) : null,
             Page = request.Page,
             PageSize = request.PageSize
         };
     }
 
+    /// <summary>
+    /// Shape of the LINQ expression built for request. EF Core caches the compiled query per shape
+    /// (values are captured as parameters) and Npgsql auto-prepares the resulting SQL.
+    /// </summary>
+    /// <param name="request"></param>
+    /// <param name="resolvedCircle">The circle was passed by the caller (same SQL as a cached circle)</param>
+    /// <returns></returns>
+    private string QueryShape(QueryBuilderRequest request, bool resolvedCircle = false)
+    {
+        var circle = !(request.UserId.HasValue && request.FollowingLevel > 0) ? "none"
+            : resolvedCircle || UseCircleCache(request) ? "cache" : request.Traversal.ToString();
+        var filters = string.Join(",", request.Filters.Select(f => $"{f.FieldId}:{f.Operator}"));
+        return $"{request.Entity}|circle={circle}|filters={filters}|order={request.OrderByField}:{request.OrderDirection}|seek={request.Cursor is not null}|count={request.CountMode}";
+    }
+
+    /// <summary>
+    /// The circle cache is opt-in per request and never used by the Legacy traversal
+    /// </summary>
+    private bool UseCircleCache(QueryBuilderRequest request) =>
+        request.CircleCache && _circles.Enabled && request.Traversal != TraversalMode.Legacy;
+
+    /// <summary>
+    /// Follower circle from the circle cache; missing levels are expanded one hop at a time from the deepest cached one
+    /// </summary>
+    /// <param name="request"></param>
+    /// <param name="timings"></param>
+    /// <param name="phase"></param>
+    /// <returns></returns>
+    private async Task<Guid[]> CachedCircleAsync(QueryBuilderRequest request, QueryTimings timings, Stopwatch phase)
+    {
+        timings.BuildMs += QueryTimings.Lap(phase);
+        var (circle, hit) = await _circles.GetOrBuildAsync(Database.Postgres, request.UserId!.Value, request.FollowingLevel!.Value,
+            async frontier => await _context.UserFollows
+                .Where(f => frontier.Contains(f.FollowerId))
+                .Select(f => f.FollowingId)
+                .Distinct()
+                .ToListAsync());
+        timings.TraversalMs = QueryTimings.Lap(phase);
+        timings.TraversedUsers = circle.Length;
+        timings.CircleCacheHit = hit;
+        return circle;
+    }
+
+    /// <summary>
+    /// Follower circles of several (user, level) pairs with one multi-source BFS over UserFollows
+    /// (each user's edges read once for all the circles, see FollowerCircleBatch)
+    /// </summary>
+    /// <param name="circles"></param>
+    /// <returns></returns>
+    public Task<Dictionary<(Guid UserId, int Level), Guid[]>> ResolveCirclesAsync(IEnumerable<(Guid UserId, int Level)> circles) =>
+        FollowerCircleBatch.ResolveAsync(circles, async users => (await _context.UserFollows
+                .Where(f => users.Contains(f.FollowerId))
+                .Select(f => new { f.FollowerId, f.FollowingId })
+                .ToListAsync())
+            .Select(f => (f.FollowerId, f.FollowingId))
+            .ToList());
+
+    /// <summary>
+    /// Users reachable from userId in 1..levels FOLLOWS hops, as a composable subquery.
+    /// follower_circle (AddFollowerCircleFunction migration) is a BFS with a visited set kept in a local array:
+    /// each user is stored once and only the users new at a level are joined to UserFollows for the next one,
+    /// so the work grows with the circle size. A recursive CTE can't do that (UNION only deduplicates
+    /// (id, depth) pairs, and users already found are re-expanded at every deeper level).
+    /// </summary>
+    /// <param name="userId"></param>
+    /// <param name="levels"></param>
+    /// <returns></returns>
+    private IQueryable<Guid> ReachableUsersQuery(Guid userId, int levels)
+    {
+        return _context.Database.SqlQuery<Guid>($"""
+            SELECT circle.user_id AS "Value"
+            FROM follower_circle({userId}, {levels}) AS circle
+            """);
+    }
+
     /// <summary>
     /// 
     /// </summary>
@@ -265,11 +421,32 @@ public class PostgresDbService : IDbService
             UsersFields.Id => query.Where(u => u.Id == Guid.Parse(filter.Value.ToString())),
             UsersFields.UserName => query.Where(u => u.Name.Contains(filter.Value.ToString())),
             UsersFields.Email => query.Where(u => u.Email.Contains(filter.Value.ToString())),
-            UsersFields.FollowersCount => query.Where(u => u.Followers.Any()),
+            UsersFields.FollowersCount => WhereCount(query, u => u.FollowersCount, filter),
+            UsersFields.FollowingCount => WhereCount(query, u => u.FollowingCount, filter),
             _ => query
         };
     }
 
+    /// <summary>
+    /// count (operator) value, the value as a parameter: a range on the (count, Id) indexes
+    /// </summary>
+    private static IQueryable<User> WhereCount(IQueryable<User> query, Expression<Func<User, int>> count, QueryFilter filter)
+    {
+        var value = filter.IntValue();
+        Expression<Func<int>> parameter = () => value;
+
+        Expression body = filter.Operator switch
+        {
+            FilterOperator.Equals => Expression.Equal(count.Body, parameter.Body),
+            FilterOperator.GreaterThan => Expression.GreaterThan(count.Body, parameter.Body),
+            FilterOperator.GreaterThanOrEqual => Expression.GreaterThanOrEqual(count.Body, parameter.Body),
+            FilterOperator.LessThan => Expression.LessThan(count.Body, parameter.Body),
+            FilterOperator.LessThanOrEqual => Expression.LessThanOrEqual(count.Body, parameter.Body),
+            _ => throw new ArgumentException($"Operator {filter.Operator} is not supported on a count field")
+        };
+        return query.Where(Expression.Lambda<Func<User, bool>>(body, count.Parameters));
+    }
+
     private static IQueryable<Order> ApplyOrdersFilter(IQueryable<Order> query, QueryFilter filter)
     {
         var field = (OrdersFields)filter.FieldId;
@@ -283,51 +460,70 @@ public class PostgresDbService : IDbService
         };
     }
 
-    private IQueryable<Article> ApplyArticlesOrderBy(IQueryable<Article> query, ArticlesOrderBy field, OrderDirection direction)
+    /// <summary>
+    /// Sort key of an entity query: ORDER BY key, Id and the keyset predicate on (key, Id)
+    /// </summary>
+    private abstract class SortKey<T>
     {
-        return (field, direction) switch
-        {
-            (ArticlesOrderBy.Id, OrderDirection.Ascending) => query.OrderBy(a => a.Id),
-            (ArticlesOrderBy.Id, OrderDirection.Descending) => query.OrderByDescending(a => a.Id),
-            (ArticlesOrderBy.Name, OrderDirection.Ascending) => query.OrderBy(a => a.Name),
-            (ArticlesOrderBy.Name, OrderDirection.Descending) => query.OrderByDescending(a => a.Name),
-            (ArticlesOrderBy.Price, OrderDirection.Ascending) => query.OrderBy(a => a.Price),
-            (ArticlesOrderBy.Price, OrderDirection.Descending) => query.OrderByDescending(a => a.Price),
-            _ => query.OrderByDescending(a => a.Id) // Default
-        };
+        public abstract IQueryable<T> Order(IQueryable<T> query, bool descending);
+
+        public abstract IQueryable<T> After(IQueryable<T> query, string cursor, bool descending);
+
+        public abstract string Cursor(object row);
     }
 
-    private IQueryable<User> ApplyUsersOrderBy(IQueryable<User> query, UsersOrderBy field, OrderDirection direction)
+    /// <summary>
+    /// key / id select the columns, rowProperty is the same value in the projected row (for NextCursor)
+    /// </summary>
+    private sealed class SortKey<T, TKey>(Expression<Func<T, TKey>> key, Expression<Func<T, Guid>> id, string rowProperty) : SortKey<T>
     {
-        return (field, direction) switch
+        public override IQueryable<T> Order(IQueryable<T> query, bool descending) => descending
+            ? query.OrderByDescending(key).ThenByDescending(id)
+            : query.OrderBy(key).ThenBy(id);
+
+        /// <summary>
+        /// Row value comparison (key, "Id") &gt; (@key, @id), &lt; when descending, cursor values as parameters
+        /// </summary>
+        public override IQueryable<T> After(IQueryable<T> query, string cursor, bool descending)
         {
-            (UsersOrderBy.Id, OrderDirection.Ascending) => query.OrderBy(u => u.Id),
-            (UsersOrderBy.Id, OrderDirection.Descending) => query.OrderByDescending(u => u.Id),
-            (UsersOrderBy.UserName, OrderDirection.Ascending) => query.OrderBy(u => u.Name),
-            (UsersOrderBy.FollowersCount, OrderDirection.Descending) => query.OrderByDescending(u => u.Followers.Count),
-            _ => query.OrderByDescending(u => u.Id)
-        };
+            var (cursorKey, cursorId) = PageCursor.Decode(cursor);
+            var lastKey = cursorKey.Deserialize<TKey>()!;
+            var lastId = Guid.Parse(cursorId);
+
+            Expression<Func<TKey, Guid, bool>> seek = descending
+                ? (k, i) => EF.Functions.LessThan(ValueTuple.Create(k, i), ValueTuple.Create(lastKey, lastId))
+                : (k, i) => EF.Functions.GreaterThan(ValueTuple.Create(k, i), ValueTuple.Create(lastKey, lastId));
+
+            var item = key.Parameters[0];
+            var body = new ReplaceParameters(new()
+            {
+                [seek.Parameters[0]] = key.Body,
+                [seek.Parameters[1]] = new ReplaceParameters(new() { [id.Parameters[0]] = item }).Visit(id.Body)
+            }).Visit(seek.Body);
+
+            return query.Where(Expression.Lambda<Func<T, bool>>(body, item));
+        }
+
+        public override string Cursor(object row)
+        {
+            var type = row.GetType();
+            return PageCursor.Encode(type.GetProperty(rowProperty)!.GetValue(row), type.GetProperty("Id")!.GetValue(row)!.ToString()!);
+        }
     }
 
-    private IQueryable<Order> ApplyOrdersOrderBy(IQueryable<Order> query, OrdersOrderBy field, OrderDirection direction)
+    private sealed class ReplaceParameters(Dictionary<ParameterExpression, Expression> replacements) : ExpressionVisitor
     {
-        return (field, direction) switch
-        {
-            (OrdersOrderBy.Id, OrderDirection.Ascending) => query.OrderBy(o => o.Id),
-            (OrdersOrderBy.Id, OrderDirection.Descending) => query.OrderByDescending(o => o.Id),
-            (OrdersOrderBy.Quantity, OrderDirection.Ascending) => query.OrderBy(o => o.Quantity),
-            (OrdersOrderBy.Quantity, OrderDirection.Descending) => query.OrderByDescending(o => o.Quantity),
-            (OrdersOrderBy.TotalPrice, OrderDirection.Descending) => query.OrderByDescending(o => o.TotalPrice),
-            _ => query.OrderByDescending(o => o.Id)
-        };
+        protected override Expression VisitParameter(ParameterExpression node) =>
+            replacements.TryGetValue(node, out var replacement) ? replacement : node;
     }
 
     /// <summary>
     /// 
     /// </summary>
     /// <param name="articles"></param>
+    /// <param name="fresh">Unused: the bulk insert never checks for existing rows</param>
     /// <returns></returns>
-    public async Task BulkImportArticles([FromBody] List<ArticleDto> articles)
+    public async Task BulkImportArticles([FromBody] List<ArticleDto> articles, bool fresh = false)
     {
         var entities = articles.Select(a => new Article
         {
@@ -343,8 +539,9 @@ public class PostgresDbService : IDbService
     /// 
     /// </summary>
     /// <param name="users"></param>
+    /// <param name="fresh">Unused: the bulk insert never checks for existing rows</param>
     /// <returns></returns>
-    public async Task BulkImportUsers([FromBody] List<UserDto> users)
+    public async Task BulkImportUsers([FromBody] List<UserDto> users, bool fresh = false)
     {
         var entities = users.Select(u => new User
         {
@@ -371,7 +568,142 @@ public class PostgresDbService : IDbService
             Quantity = o.Quantity
         }).ToList();
 
+        await using var transaction = await _context.Database.BeginTransactionAsync();
         await _context.BulkInsertAsync(entities);
+        await UpdatePurchaseAggregatesAsync(orders);
+        await transaction.CommitAsync();
+    }
+
+    /// <summary>
+    /// Adds the batch's (user, article) pairs to UserPurchases and increments ArticleBuyerStats
+    /// by the pairs actually inserted: a user buying the same article twice counts once.
+    /// Stats rows are upserted in ArticleId order so concurrent batches lock them in the same order.
+    /// </summary>
+    /// <param name="orders"></param>
+    /// <returns></returns>
+    private async Task UpdatePurchaseAggregatesAsync(List<OrderDto> orders)
+    {
+        var userIds = orders.Select(o => o.UserId).ToArray();
+        var articleIds = orders.Select(o => o.ArticleId).ToArray();
+
+        await _context.Database.ExecuteSqlAsync($"""
+            WITH inserted AS (
+                INSERT INTO "UserPurchases" ("UserId", "ArticleId")
+                SELECT DISTINCT purchase.user_id, purchase.article_id
+                FROM unnest({userIds}, {articleIds}) AS purchase(user_id, article_id)
+                ON CONFLICT DO NOTHING
+                RETURNING "ArticleId"
+            )
+            INSERT INTO "ArticleBuyerStats" ("ArticleId", "Buyers")
+            SELECT "ArticleId", count(*)
+            FROM inserted
+            GROUP BY "ArticleId"
+            ORDER BY "ArticleId"
+            ON CONFLICT ("ArticleId") DO UPDATE SET "Buyers" = "ArticleBuyerStats"."Buyers" + EXCLUDED."Buyers"
+            """);
+    }
+
+    /// <summary>
+    /// Recomputes UserPurchases / ArticleBuyerStats from Orders (data imported before the aggregates existed)
+    /// </summary>
+    /// <returns></returns>
+    public async Task RebuildViralAggregatesAsync()
+    {
+        await using var transaction = await _context.Database.BeginTransactionAsync();
+        await _context.Database.ExecuteSqlRawAsync("""
+            TRUNCATE "UserPurchases", "ArticleBuyerStats";
+
+            INSERT INTO "UserPurchases" ("UserId", "ArticleId")
+            SELECT DISTINCT "UserId", "ArticleId" FROM "Orders";
+
+            INSERT INTO "ArticleBuyerStats" ("ArticleId", "Buyers")
+            SELECT "ArticleId", count(*) FROM "UserPurchases" GROUP BY "ArticleId";
+            """);
+        await transaction.CommitAsync();
+    }
+
+    /// <summary>
+    /// Top products by distinct buyers in the level-n circle of userId, with the buyers per level
+    /// (each user counted at its closest level). Reads the UserPurchases / ArticleBuyerStats
+    /// aggregates instead of scanning Orders.
+    /// </summary>
+    /// <param name="userId"></param>
+    /// <param name="level"></param>
+    /// <param name="top"></param>
+    /// <returns></returns>
+    public async Task<ViralProductsResult> GetViralProductsAsync(Guid userId, int level, int top)
+    {
+        var stopwatch = Stopwatch.StartNew();
+
+        var rows = await _context.Database.SqlQuery<ViralProductRow>($"""
+            WITH circle AS MATERIALIZED (
+                SELECT user_id AS id, depth FROM follower_circle({userId}, {level})
+            ),
+            per_level AS (
+                SELECT p."ArticleId" AS article_id, c.depth, count(*)::int AS buyers
+                FROM circle c
+                JOIN "UserPurchases" p ON p."UserId" = c.id
+                GROUP BY p."ArticleId", c.depth
+            ),
+            top_articles AS (
+                SELECT article_id, sum(buyers) AS buyers
+                FROM per_level
+                GROUP BY article_id
+                ORDER BY buyers DESC, article_id
+                LIMIT {top}
+            )
+            SELECT cs.size AS "CircleSize", t.article_id AS "ArticleId", a."Name",
+                   coalesce(s."Buyers", 0) AS "TotalBuyers", l.depth AS "Level", l.buyers AS "Buyers"
+            FROM (SELECT count(*)::int AS size FROM circle) cs
+            LEFT JOIN top_articles t ON true
+            LEFT JOIN per_level l ON l.article_id = t.article_id
+            LEFT JOIN "Articles" a ON a."Id" = t.article_id
+            LEFT JOIN "ArticleBuyerStats" s ON s."ArticleId" = t.article_id
+            """).ToListAsync();
+
+        var items = rows
+            .Where(r => r.ArticleId.HasValue)
+            .GroupBy(r => r.ArticleId!.Value)
+            .Select(g =>
+            {
+                var byLevel = new int[level];
+                foreach (var row in g)
+                    byLevel[row.Level!.Value - 1] = row.Buyers!.Value;
+                return new ViralProduct
+                {
+                    ArticleId = g.Key,
+                    Name = g.First().Name ?? "",
+                    Buyers = byLevel.Sum(),
+                    BuyersByLevel = byLevel.ToList(),
+                    TotalBuyers = g.First().TotalBuyers
+                };
+            })
+            .OrderByDescending(p => p.Buyers)
+            .ThenBy(p => p.ArticleId.ToString())
+            .ToList();
+
+        stopwatch.Stop();
+        return new ViralProductsResult
+        {
+            UserId = userId,
+            Level = level,
+            CircleSize = rows.FirstOrDefault()?.CircleSize ?? 0,
+            Items = items,
+            RequestTimeInMilliseconds = stopwatch.ElapsedMilliseconds
+        };
+    }
+
+    /// <summary>
+    /// One (article, level) line of the viral products query; article columns are null when no one in the circle bought anything
+    /// </summary>
+    private sealed class ViralProductRow
+    {
+        public int CircleSize { get; set; }
+        public Guid? ArticleId { get; set; }
+        public string? Name { get; set; }
+        public int TotalBuyers { get; set; }
+        public int? Level { get; set; }
+        public int? Buyers { get; set; }
     }
 
 
@@ -379,8 +711,9 @@ public class PostgresDbService : IDbService
     /// 
     /// </summary>
     /// <param name="follows"></param>
+    /// <param name="fresh">Unused: the bulk insert never checks for existing rows</param>
     /// <returns></returns>
-    public async Task BulkImportSocialGraph([FromBody] List<FollowDto> follows)
+    public async Task BulkImportSocialGraph([FromBody] List<FollowDto> follows, bool fresh = false)
     {
         var entities = follows
             .GroupBy(f => new { f.FollowerId, f.FollowingId })
@@ -391,7 +724,64 @@ public class PostgresDbService : IDbService
             })
             .ToList();
 
-        await _context.BulkInsertAsync(entities, b => b.IncludeGraph = false);
+        try
+        {
+            await using var transaction = await _context.Database.BeginTransactionAsync();
+            await _context.BulkInsertAsync(entities, b => b.IncludeGraph = false);
+            await UpdateFollowCountersAsync(entities);
+            await transaction.CommitAsync();
+        }
+        finally
+        {
+            _circles.Invalidate(Database.Postgres, follows.Select(f => f.FollowerId));
+        }
+    }
+
+    /// <summary>
+    /// Adds the batch's edges to Users.FollowersCount / FollowingCount. The bulk insert fails on an
+    /// existing edge, so every edge of a committed batch is new. Users are locked in Id order first
+    /// so concurrent batches sharing users cannot deadlock.
+    /// </summary>
+    /// <param name="follows"></param>
+    /// <returns></returns>
+    private async Task UpdateFollowCountersAsync(List<UserFollow> follows)
+    {
+        var followerIds = follows.Select(f => f.FollowerId).ToArray();
+        var followingIds = follows.Select(f => f.FollowingId).ToArray();
+
+        await _context.Database.ExecuteSqlAsync($"""
+            WITH delta AS (
+                SELECT id, count(*) FILTER (WHERE followed)::int AS followers, count(*) FILTER (WHERE NOT followed)::int AS following
+                FROM (
+                    SELECT unnest({followingIds}) AS id, true AS followed
+                    UNION ALL
+                    SELECT unnest({followerIds}), false
+                ) edges
+                GROUP BY id
+            ),
+            locked AS (
+                SELECT u."Id" FROM "Users" u JOIN delta ON delta.id = u."Id" ORDER BY u."Id" FOR UPDATE OF u
+            )
+            UPDATE "Users" u
+            SET "FollowersCount" = u."FollowersCount" + delta.followers,
+                "FollowingCount" = u."FollowingCount" + delta.following
+            FROM delta
+            JOIN locked ON locked."Id" = delta.id
+            WHERE u."Id" = delta.id
+            """);
+    }
+
+    /// <summary>
+    /// Recomputes Users.FollowersCount / FollowingCount from UserFollows
+    /// </summary>
+    /// <returns></returns>
+    public async Task RebuildFollowCountersAsync()
+    {
+        await _context.Database.ExecuteSqlRawAsync("""
+            UPDATE "Users" u
+            SET "FollowersCount" = (SELECT count(*) FROM "UserFollows" f WHERE f."FollowingId" = u."Id"),
+                "FollowingCount" = (SELECT count(*) FROM "UserFollows" f WHERE f."FollowerId" = u."Id")
+            """);
     }
 
 }
\ No newline at end of file
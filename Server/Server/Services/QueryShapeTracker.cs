@@ -0,0 +1,53 @@
+﻿using Server.Models.Queries.Enums;
+using Server.Models.Responses;
+using System.Collections.Concurrent;
+
+namespace Server.Services;
+
+/// <summary>
+/// Counts query shapes per backend (singleton). Only says whether this process already produced the same
+/// query text / shape: not whether Neo4j or Npgsql still has its plan (evictions, restarts, MaxAutoPrepare)
+/// </summary>
+public class QueryShapeTracker
+{
+    // Au-delà, les nouvelles formes sont comptées comme nouvelles sans être mémorisées
+    private const int MaxTrackedShapes = 10_000;
+
+    private readonly ConcurrentDictionary<Database, Counter> _counters = new();
+
+    private sealed class Counter
+    {
+        public readonly ConcurrentDictionary<string, byte> Shapes = new();
+        public long Executions;
+        public long Reused;
+    }
+
+    /// <summary>
+    /// Records one execution of shape; true when this process had already executed it
+    /// </summary>
+    public bool Record(Database database, string shape)
+    {
+        var counter = _counters.GetOrAdd(database, _ => new Counter());
+        Interlocked.Increment(ref counter.Executions);
+
+        if (counter.Shapes.ContainsKey(shape))
+        {
+            Interlocked.Increment(ref counter.Reused);
+            return true;
+        }
+        if (counter.Shapes.Count < MaxTrackedShapes)
+            counter.Shapes.TryAdd(shape, 0);
+        return false;
+    }
+
+    /// <summary>
+    /// Current counters per backend
+    /// </summary>
+    public Dictionary<string, QueryShapeStats> Snapshot() =>
+        _counters.ToDictionary(kv => kv.Key.ToString(), kv => new QueryShapeStats
+        {
+            Executions = Interlocked.Read(ref kv.Value.Executions),
+            Reused = Interlocked.Read(ref kv.Value.Reused),
+            DistinctShapes = kv.Value.Shapes.Count
+        });
+}
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import aiohttp
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BASE_URL = os.getenv("SERVER_URL", "http://localhost:3001")
+API_ENDPOINT = f"{BASE_URL}/api/querybuilder/execute"
+
+# Familles de requêtes du README : payload QueryBuilder en fonction (user, produit, niveau)
+FAMILIES: Dict[str, Callable[[str, str, int], Dict[str, Any]]] = {
+    # Produits commandés par le cercle de followers (niveau 1..n)
+    "circle": lambda user_id, article_id, level: {
+        "entity": "Articles", "userId": user_id, "followingLevel": level, "pageSize": 20,
+    },
+    # Même requête, filtrée sur un produit
+    "circle-product": lambda user_id, article_id, level: {
+        "entity": "Articles", "userId": user_id, "followingLevel": level, "pageSize": 20,
+        "filters": [{"fieldId": 0, "operator": "Equals", "value": article_id}],  # ArticlesFields.Id
+    },
+    # Nombre d'acheteurs d'un produit dans le cercle de niveau n (totalCount)
+    "buyers": lambda user_id, article_id, level: {
+        "entity": "Orders", "userId": user_id, "followingLevel": level, "pageSize": 1,
+        "filters": [{"fieldId": 2, "operator": "Equals", "value": article_id}],  # OrdersFields.ArticleId
+    },
+}
+
+# Endpoints analytiques dédiés (GET /api/analytics/...) : paramètres en fonction de (user, produit, niveau)
+ANALYTICS_FAMILIES: Dict[str, Tuple[str, Callable[[str, str, int], Dict[str, Any]]]] = {
+    # Top 10 des produits achetés par le plus d'users distincts du cercle de niveau n
+    "viral": ("viral-products", lambda user_id, article_id, level: {"userId": user_id, "level": level, "top": 10}),
+}
+
+# Champs `timings` renvoyés par le serveur pour chaque base (ms)
+SERVER_TIMINGS = ["buildMs", "traversalMs", "dataQueryMs", "countQueryMs", "materializationMs"]
+
+def percentile(values: List[float], q: float) -> float:
+    """Percentile `q` (0-100) par rang le plus proche, 0 si vide"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+async def sample_ids(session: aiohttp.ClientSession, entity: str, count: int) -> List[str]:
+    """Ids réels (page 1 de Postgres) servant de points de départ aux requêtes"""
+    payload = {"entity": entity, "pageSize": count}
+    async with session.post(f"{API_ENDPOINT}?targets=Postgres", json=payload) as resp:
+        resp.raise_for_status()
+        results = await resp.json()
+    return [item["id"] for item in results[0]["items"]]
+
+async def timed_query(session: aiohttp.ClientSession, target: str, payload: Dict[str, Any],
+                      analytics: Optional[str] = None) -> Dict[str, Any]:
+    """Une requête chronométrée côté client ; les erreurs sont comptées, pas levées.
+
+    `analytics` : endpoint GET /api/analytics/<analytics> (payload en paramètres), au lieu du QueryBuilder.
+    """
+    start = time.perf_counter()
+    try:
+        if analytics:
+            request = session.get(f"{BASE_URL}/api/analytics/{analytics}", params={**payload, "targets": target})
+        else:
+            request = session.post(f"{API_ENDPOINT}?targets={target}", json=payload)
+        async with request as resp:
+            body = await resp.read()
+            latency = time.perf_counter() - start
+            if resp.status != 200:
+                return {"ok": False, "latency": latency, "error": f"HTTP {resp.status}"}
+            result = json.loads(body)[0]
+            if analytics:
+                # Pas de `timings` par phase : seul le temps total serveur est connu
+                return {"ok": True, "latency": latency, "total": result["circleSize"], "timings": {}}
+            return {"ok": True, "latency": latency, "total": result["totalCount"], "timings": result.get("timings") or {}}
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return {"ok": False, "latency": time.perf_counter() - start, "error": type(e).__name__}
+
+async def run_case(session, target: str, family: str, level: int, users: List[str], articles: List[str],
+                   warmup: int, iterations: int, concurrency: int, rng: random.Random,
+                   traversal: str = "SetBased", circle_cache: bool = False) -> Dict[str, Any]:
+    """Warm-up séquentiel puis `iterations` requêtes, au plus `concurrency` en vol"""
+    analytics, build = ANALYTICS_FAMILIES.get(family) or (None, FAMILIES[family])
+    payloads = [build(rng.choice(users), rng.choice(articles), level) for _ in range(warmup + iterations)]
+    if not analytics:
+        payloads = [{**payload, "traversal": traversal, "circleCache": circle_cache} for payload in payloads]
+
+    for payload in payloads[:warmup]:
+        await timed_query(session, target, payload, analytics)
+
+    queue = asyncio.Queue()
+    for payload in payloads[warmup:]:
+        queue.put_nowait(payload)
+    samples = []
+
+    async def worker():
+        while not queue.empty():
+            samples.append(await timed_query(session, target, queue.get_nowait(), analytics))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    latencies = [s["latency"] * 1000 for s in samples if s["ok"]]
+    totals = [s["total"] for s in samples if s["ok"]]
+    errors = [s["error"] for s in samples if not s["ok"]]
+    timings = [s["timings"] for s in samples if s["ok"]]
+    server = {name: {"p50": round(percentile([t.get(name, 0.0) for t in timings], 50), 2),
+                     "p95": round(percentile([t.get(name, 0.0) for t in timings], 95), 2)}
+              for name in SERVER_TIMINGS}
+    # Latence client hors temps serveur : HTTP + (dé)sérialisation JSON
+    overhead = [s["latency"] * 1000 - sum(s["timings"].get(name, 0.0) for name in SERVER_TIMINGS)
+                for s in samples if s["ok"] and s["timings"]]
+    return {
+        "target": target, "family": family, "level": level, "concurrency": concurrency, "traversal": traversal,
+        "circle_cache": circle_cache,
+        "requests": len(samples), "errors": len(errors), "error_kinds": sorted(set(errors)),
+        "wall_s": round(wall, 3), "throughput_rps": round(len(samples) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 1), "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1), "max_ms": round(max(latencies, default=0.0), 1),
+        "mean_total": round(sum(totals) / len(totals), 1) if totals else 0.0,
+        "server": server, "overhead_p50_ms": round(percentile(overhead, 50), 1),
+        "shape_reuse_rate": round(sum(1 for t in timings if t.get("queryShapeReuse")) / len(timings), 3) if timings else 0.0,
+        "circle_cache_hit_rate": round(sum(1 for t in timings if t.get("circleCacheHit")) / len(timings), 3) if timings else 0.0,
+    }
+
+def print_scaling(results: List[Dict[str, Any]], targets: List[str], levels: List[int]):
+    """Latence p50 / p95 en fonction de followingLevel, par famille et par base"""
+    print(f"\n{'famille':<15} {'cible':<9} " + " ".join(f"{'niv ' + str(level):>17}" for level in levels))
+    for family in [*FAMILIES, *ANALYTICS_FAMILIES]:
+        for target in targets:
+            row = {r["level"]: r for r in results if r["family"] == family and r["target"] == target}
+            if not row:
+                continue
+            cells = []
+            for level in levels:
+                r = row.get(level)
+                if r is None:
+                    cells.append(f"{'-':>17}")
+                elif r["errors"] == r["requests"]:
+                    cells.append(f"{'échec':>17}")
+                else:
+                    cells.append(f"{r['p50_ms']:>8.0f}/{r['p95_ms']:<8.0f}")
+            print(f"{family:<15} {target:<9} " + " ".join(cells))
+
+async def main():
+    parser = argparse.ArgumentParser(description="Latence et débit des requêtes QueryBuilder, Postgres vs Neo4j")
+    parser.add_argument("--targets", default="Postgres,Neo4j")
+    parser.add_argument("--families", default=",".join([*FAMILIES, *ANALYTICS_FAMILIES]))
+    parser.add_argument("--levels", default="1,2,3,4", help="Valeurs de followingLevel, ex. 1,2,3,4,5")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--sample", type=int, default=100, help="Nombre d'users / produits de départ tirés")
+    parser.add_argument("--timeout", type=float, default=60, help="Timeout par requête (s)")
+    parser.add_argument("--max-p95", type=float, default=30_000,
+                        help="Au-delà de ce p95 (ms), les niveaux suivants ne sont plus testés pour la cible")
+    parser.add_argument("--traversal", default="SetBased", choices=["SetBased", "Legacy"],
+                        help="Résolution du cercle : ensembliste dédupliquée par niveau, ou stratégie d'origine")
+    parser.add_argument("--circle-cache", action="store_true",
+                        help="Autorise le cache de cercles du serveur (désactivé par défaut : temps bruts des bases)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    targets = [t for t in args.targets.split(",") if t]
+    families = [f for f in args.families.split(",") if f]
+    levels = [int(level) for level in args.levels.split(",") if level]
+    rng = random.Random(args.seed)
+
+    print(f"ServerBenchmark QueryBuilder API - {datetime.now().strftime('%H:%M:%S')}")
+    print(f"Serveur: {BASE_URL} | warm-up={args.warmup} | iterations={args.iterations} | concurrency={args.concurrency}")
+    print("=" * 80)
+
+    results = []
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    connector = aiohttp.TCPConnector(limit=max(args.concurrency, 10))
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        users = await sample_ids(session, "Users", args.sample)
+        articles = await sample_ids(session, "Articles", args.sample)
+        if not users or not articles:
+            print("Base vide : lancer le seeder avant le benchmark")
+            return
+
+        for family in families:
+            for target in targets:
+                for level in levels:
+                    result = await run_case(session, target, family, level, users, articles,
+                                            args.warmup, args.iterations, args.concurrency, rng, args.traversal,
+                                            args.circle_cache)
+                    results.append(result)
+                    print(f"{family:<15} {target:<9} niveau {level}: {result['throughput_rps']:>8.1f} req/s "
+                          f"p50={result['p50_ms']:.0f}ms p95={result['p95_ms']:.0f}ms p99={result['p99_ms']:.0f}ms "
+                          f"erreurs={result['errors']}/{result['requests']} total moyen={result['mean_total']}")
+                    server = result["server"]
+                    print(f"{'':<25} serveur p50: build={server['buildMs']['p50']:.1f} "
+                          f"traversal={server['traversalMs']['p50']:.1f} data={server['dataQueryMs']['p50']:.1f} "
+                          f"count={server['countQueryMs']['p50']:.1f} materialize={server['materializationMs']['p50']:.1f} "
+                          f"| HTTP+JSON={result['overhead_p50_ms']:.1f} ms | formes réutilisées={result['shape_reuse_rate']:.0%}"
+                          + (f" | cache cercles={result['circle_cache_hit_rate']:.0%}" if args.circle_cache else ""))
+                    # La base « tombe » : inutile d'aller plus profond
+                    if result["errors"] == result["requests"] or result["p95_ms"] > args.max_p95:
+                        print(f"   {target} abandonné au-delà du niveau {level} pour {family}")
+                        break
+
+    print_scaling(results, targets, levels)
+
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        async with session.get(f"{BASE_URL}/api/querybuilder/shape-stats") as resp:
+            if resp.status == 200:
+                print("\nFormes de requêtes déjà exécutées par le serveur (depuis son démarrage)")
+                for backend, stats in (await resp.json()).items():
+                    print(f"   {backend:<9} {stats['reused']}/{stats['executions']} réutilisées ({stats['reuseRate']:.1%}), "
+                          f"{stats['distinctShapes']} formes distinctes")
+        if args.circle_cache:
+            async with session.get(f"{BASE_URL}/api/querybuilder/circle-cache") as resp:
+                if resp.status == 200:
+                    print("\nCache de cercles (depuis le démarrage du serveur)")
+                    for backend, stats in (await resp.json()).items():
+                        print(f"   {backend:<9} {stats['hits']} hits / {stats['misses']} miss ({stats['hitRate']:.1%}), "
+                              f"{stats['extended']} étendus, {stats['evictions']} évictions, "
+                              f"{stats['invalidations']} invalidations, {stats['entries']} entrées / {stats['storedIds']} ids")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"server": BASE_URL, "args": vars(args), "results": results}, f, indent=2)
+        print(f"\nRésultats: {args.output}")
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nBenchmark interrompu")
+        sys.exit(0)
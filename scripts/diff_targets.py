@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import aiohttp
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from querybuilder_pages import iter_pages
+
+BASE_URL = os.getenv("SERVER_URL", "http://localhost:3001")
+API_ENDPOINT = f"{BASE_URL}/api/querybuilder/execute"
+
+TARGETS = ("Postgres", "Neo4j")
+
+# orderByField imposé par entité. Les deux bases trient sur (clé, id) et l'ordre d'un uuid Postgres est celui
+# de sa forme texte côté Neo4j : les flux arrivent dans le même ordre. Orders est trié et regroupé par user :
+# Neo4j n'a qu'un BOUGHT par couple (user, article), sans l'id de la commande.
+ORDER_BY = {"Users": "Id", "Articles": "Id", "Orders": "UserId"}
+
+def canonical(entity: str, item: Dict[str, Any]) -> Tuple[str, str, tuple]:
+    """(clé de groupe, identité dans le groupe, valeurs comparées) d'une ligne, quelle que soit la base"""
+    # Neo4j renvoie les users sous une clé `user`
+    item = {k.lower(): v for k, v in (item.get("user") or item).items()}
+    if entity == "Users":
+        return item["id"].lower(), item["id"].lower(), (item.get("name"), item.get("email"),
+                                                        item.get("followerscount"), item.get("followingcount"))
+    if entity == "Articles":
+        return item["id"].lower(), item["id"].lower(), (item.get("name"), round(float(item["price"]), 2))
+    return item["userid"].lower(), item["articleid"].lower(), (item.get("quantity"), round(float(item["totalprice"]), 2))
+
+def row_hash(*parts) -> int:
+    return int.from_bytes(hashlib.blake2b(repr(parts).encode(), digest_size=8).digest(), "little")
+
+class Side:
+    """Flux d'une base : pages préchargées dans une file bornée, lignes regroupées par clé, empreinte"""
+
+    def __init__(self, session: aiohttp.ClientSession, target: str, entity: str, payload: Dict[str, Any], prefetch: int):
+        self.target, self.entity = target, entity
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=prefetch)
+        self.task = asyncio.create_task(self._fetch(session, payload))
+        self.rows = self.pages = 0
+        # Somme des hachages des lignes (mod 2^64) : indépendante de l'ordre, comparable d'un run à l'autre
+        self.fingerprint = 0
+
+    async def _fetch(self, session: aiohttp.ClientSession, payload: Dict[str, Any]):
+        try:
+            async for page in iter_pages(session, payload, self.target, count_mode="Skip"):
+                await self.queue.put(page["items"])
+            await self.queue.put(None)
+        except Exception as e:
+            await self.queue.put(e)
+
+    async def _items(self) -> AsyncIterator[Dict[str, Any]]:
+        while (items := await self.queue.get()) is not None:
+            if isinstance(items, Exception):
+                raise items
+            self.pages += 1
+            for item in items:
+                yield item
+
+    async def groups(self) -> AsyncIterator[Tuple[str, Dict[str, List[tuple]]]]:
+        """(clé, {identité: [valeurs]}) par clé croissante ; seul le groupe courant est en mémoire"""
+        key, members = None, {}
+        async for item in self._items():
+            row_key, ident, values = canonical(self.entity, item)
+            self.rows += 1
+            if row_key != key:
+                if key is not None:
+                    if row_key < key:
+                        raise RuntimeError(f"{self.target}: clés hors d'ordre ({row_key} après {key})")
+                    yield key, members
+                key, members = row_key, {}
+            members.setdefault(ident, []).append(values)
+        if key is not None:
+            yield key, members
+
+    def add(self, key: str, members: Dict[str, List[tuple]]):
+        for ident, values in members.items():
+            # Orders : couples distincts (user, article), comme les BOUGHT de Neo4j
+            self.fingerprint = (self.fingerprint + row_hash(key, ident, *(() if self.entity == "Orders" else values[0]))) % 2**64
+
+    def close(self):
+        self.task.cancel()
+
+def compare_members(entity: str, pg: List[tuple], neo: List[tuple]) -> bool:
+    """Orders : Neo4j garde la quantité / le prix de la dernière commande du couple, qui doit être l'une de Postgres"""
+    if entity == "Orders":
+        return len(neo) == 1 and neo[0] in pg
+    return pg == neo
+
+async def diff_case(session: aiohttp.ClientSession, case: Dict[str, Any], page_size: int, prefetch: int,
+                    max_diffs: int) -> Dict[str, Any]:
+    """Parcours complet des deux bases en parallèle et fusion triée des groupes ; mémoire bornée par les pages en file"""
+    entity = case["request"]["entity"]
+    payload = {**case["request"], "pageSize": page_size, "orderByField": ORDER_BY[entity], "orderDirection": "Ascending"}
+    payload.pop("page", None)
+    pg, neo = (Side(session, target, entity, payload, prefetch) for target in TARGETS)
+    diffs, diff_count = [], 0
+
+    def report(kind: str, key: str, ident: str, pg_values=None, neo_values=None):
+        nonlocal diff_count
+        diff_count += 1
+        if len(diffs) < max_diffs:
+            diffs.append({"kind": kind, "key": key, "id": ident, "Postgres": pg_values, "Neo4j": neo_values})
+
+    start = time.perf_counter()
+    try:
+        pg_groups, neo_groups = pg.groups(), neo.groups()
+        a, b = await anext(pg_groups, None), await anext(neo_groups, None)
+        while a is not None or b is not None:
+            if b is None or (a is not None and a[0] < b[0]):
+                pg.add(*a)
+                for ident, values in a[1].items():
+                    report("Postgres seul", a[0], ident, pg_values=values)
+                a = await anext(pg_groups, None)
+            elif a is None or b[0] < a[0]:
+                neo.add(*b)
+                for ident, values in b[1].items():
+                    report("Neo4j seul", b[0], ident, neo_values=values)
+                b = await anext(neo_groups, None)
+            else:
+                pg.add(*a)
+                neo.add(*b)
+                for ident in sorted(a[1].keys() | b[1].keys()):
+                    if ident not in b[1]:
+                        report("Postgres seul", a[0], ident, pg_values=a[1][ident])
+                    elif ident not in a[1]:
+                        report("Neo4j seul", b[0], ident, neo_values=b[1][ident])
+                    elif not compare_members(entity, a[1][ident], b[1][ident]):
+                        report("valeurs", a[0], ident, a[1][ident], b[1][ident])
+                a, b = await anext(pg_groups, None), await anext(neo_groups, None)
+        error = None
+    except Exception as e:
+        error = str(e)
+    finally:
+        pg.close()
+        neo.close()
+
+    elapsed = time.perf_counter() - start
+    return {"name": case["name"], "request": case["request"], "error": error, "diff_count": diff_count, "diffs": diffs,
+            "rows": {"Postgres": pg.rows, "Neo4j": neo.rows}, "pages": {"Postgres": pg.pages, "Neo4j": neo.pages},
+            "fingerprint": {"Postgres": f"{pg.fingerprint:016x}", "Neo4j": f"{neo.fingerprint:016x}"},
+            "wall_s": round(elapsed, 3), "rows_per_s": round((pg.rows + neo.rows) / elapsed) if elapsed else 0}
+
+async def sample_ids(session: aiohttp.ClientSession, entity: str, count: int) -> List[str]:
+    """Ids réels (page 1 de Postgres) servant de points de départ"""
+    async with session.post(f"{API_ENDPOINT}?targets=Postgres", json={"entity": entity, "pageSize": count,
+                                                                      "countMode": "Skip"}) as resp:
+        resp.raise_for_status()
+        return [item["id"] for item in (await resp.json())[0]["items"]]
+
+async def build_cases(session: aiohttp.ClientSession, args) -> List[Dict[str, Any]]:
+    """Entités complètes + cercles (users tirés x niveaux x entités), ou requêtes d'un fichier de fixture.py"""
+    entities = [e for e in args.entities.split(",") if e]
+    mode = {"traversal": args.traversal, "circleCache": args.circle_cache}
+    if args.expected:
+        with open(args.expected) as f:
+            queries = json.load(f)["queries"]
+        return [{"name": q["name"], "request": {**q["request"], **mode}} for q in queries
+                if "request" in q and q["request"]["entity"] in entities]
+
+    cases = [{"name": entity.lower(), "request": {"entity": entity}} for entity in entities] if args.full else []
+    levels = [int(level) for level in args.levels.split(",") if level]
+    for user_id in await sample_ids(session, "Users", args.sample):
+        for level in levels:
+            for entity in entities:
+                cases.append({"name": f"{entity.lower()}-{user_id[:8]}-l{level}",
+                              "request": {"entity": entity, "userId": user_id, "followingLevel": level, **mode}})
+    return cases
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare ligne à ligne les résultats complets de Postgres et Neo4j")
+    parser.add_argument("--entities", default="Users,Articles,Orders")
+    parser.add_argument("--levels", default="1,2,3")
+    parser.add_argument("--sample", type=int, default=20, help="Users de départ tirés (page 1 de Postgres)")
+    parser.add_argument("--full", action="store_true", help="Compare aussi chaque entité entière (sans cercle)")
+    parser.add_argument("--expected", default=None, help="Rejoue les requêtes QueryBuilder d'un fichier de Seeder/fixture.py")
+    parser.add_argument("--traversal", default="SetBased", choices=["SetBased", "Legacy"])
+    parser.add_argument("--circle-cache", action="store_true")
+    parser.add_argument("--page-size", type=int, default=5000)
+    parser.add_argument("--prefetch", type=int, default=2, help="Pages en file par base et par cas (borne la mémoire)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Cas comparés en parallèle")
+    parser.add_argument("--max-diffs", type=int, default=20, help="Lignes divergentes conservées par cas")
+    parser.add_argument("--output", default=None, help="Fichier JSON des résultats")
+    args = parser.parse_args()
+
+    connector = aiohttp.TCPConnector(limit=max(2 * args.concurrency, 10))
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None), connector=connector) as session:
+        cases = await build_cases(session, args)
+        print(f"Serveur: {BASE_URL} | {len(cases)} cas | pageSize={args.page_size} | concurrency={args.concurrency}")
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def run(case):
+            async with semaphore:
+                result = await diff_case(session, case, args.page_size, args.prefetch, args.max_diffs)
+            status = "ERREUR" if result["error"] else ("OK" if not result["diff_count"] else "KO")
+            print(f"{status:<6} {result['name']:<32} PG={result['rows']['Postgres']:>9} Neo={result['rows']['Neo4j']:>9} "
+                  f"lignes, {result['diff_count']} écarts, {result['wall_s']:.1f}s ({result['rows_per_s']} lignes/s)")
+            for diff in result["diffs"]:
+                row = diff["key"] if diff["id"] == diff["key"] else f"{diff['key']} / {diff['id']}"
+                print(f"   {diff['kind']:<13} {row}: PG={diff['Postgres']} Neo={diff['Neo4j']}")
+            if result["error"]:
+                print(f"   {result['error']}")
+            return result
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(run(case) for case in cases))
+        elapsed = time.perf_counter() - start
+
+    rows = sum(r["rows"]["Postgres"] + r["rows"]["Neo4j"] for r in results)
+    failed = [r for r in results if r["error"] or r["diff_count"]]
+    print(f"\n{len(results) - len(failed)}/{len(results)} cas identiques, {rows} lignes comparées en {elapsed:.1f}s "
+          f"({rows / elapsed if elapsed else 0:.0f} lignes/s)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"server": BASE_URL, "args": vars(args), "results": results}, f, indent=2)
+        print(f"Résultats: {args.output}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    asyncio.run(main())
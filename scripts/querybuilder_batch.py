@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import aiohttp
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, AsyncIterator, Dict, List
+
+BASE_URL = os.getenv("SERVER_URL", "http://localhost:3001")
+API_ENDPOINT = f"{BASE_URL}/api/querybuilder/execute"
+BATCH_ENDPOINT = f"{BASE_URL}/api/querybuilder/batch"
+
+# Champs d'un PaginatedResult comparés entre /batch et /execute (les temps varient d'un appel à l'autre)
+COMPARED_FIELDS = ["items", "totalCount", "totalCountIsEstimate", "nextCursor", "page", "pageSize", "error"]
+
+async def iter_batch(session: aiohttp.ClientSession, requests: List[Dict[str, Any]], targets: str = "Both",
+                     max_parallelism: int = 4) -> AsyncIterator[Dict[str, Any]]:
+    """Résultats d'un POST /api/querybuilder/batch au fil de l'eau, dans l'ordre où le serveur les termine.
+
+    Chaque élément vaut {"index": position de la requête, "results": un PaginatedResult par base}.
+    """
+    url = f"{BATCH_ENDPOINT}?targets={targets}&maxParallelism={max_parallelism}"
+    async with session.post(url, json=requests) as resp:
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status}: {(await resp.text())[:200]}")
+        # NDJSON : une ligne par requête, découpée à la main (une page peut dépasser le tampon de readline)
+        pending: List[bytes] = []
+        async for chunk in resp.content.iter_any():
+            *complete, rest = chunk.split(b"\n")
+            for piece in complete:
+                line = b"".join(pending) + piece
+                pending = []
+                if line.strip():
+                    yield json.loads(line)
+            pending.append(rest)
+        tail = b"".join(pending)
+        if tail.strip():
+            yield json.loads(tail)
+
+async def sample_ids(session: aiohttp.ClientSession, count: int) -> List[str]:
+    """Users de départ (page 1 de Postgres)"""
+    async with session.post(f"{API_ENDPOINT}?targets=Postgres", json={"entity": "Users", "pageSize": count,
+                                                                      "countMode": "Skip"}) as resp:
+        resp.raise_for_status()
+        return [item["id"] for item in (await resp.json())[0]["items"]]
+
+async def run_individual(session: aiohttp.ClientSession, requests: List[Dict[str, Any]], target: str,
+                         concurrency: int, circle_cache: bool) -> Dict[str, Any]:
+    """Une requête /execute par user, `concurrency` en vol"""
+    semaphore = asyncio.Semaphore(concurrency)
+    totals: List[Any] = [None] * len(requests)
+
+    async def one(index: int, request: Dict[str, Any]):
+        async with semaphore:
+            async with session.post(f"{API_ENDPOINT}?targets={target}", json={**request, "circleCache": circle_cache}) as resp:
+                result = (await resp.json())[0]
+            totals[index] = result.get("error") or result["totalCount"]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i, r) for i, r in enumerate(requests)))
+    return {"wall_s": time.perf_counter() - start, "totals": totals}
+
+async def run_batch(session: aiohttp.ClientSession, requests: List[Dict[str, Any]], target: str,
+                    max_parallelism: int) -> Dict[str, Any]:
+    """Les mêmes requêtes en un seul appel /batch"""
+    totals: List[Any] = [None] * len(requests)
+    first = None
+    start = time.perf_counter()
+    async for item in iter_batch(session, requests, target, max_parallelism):
+        first = first or time.perf_counter() - start
+        result = item["results"][0]
+        totals[item["index"]] = result.get("error") or result["totalCount"]
+    return {"wall_s": time.perf_counter() - start, "first_s": first or 0.0, "totals": totals}
+
+async def check_fixture(session: aiohttp.ClientSession, path: str, targets: List[str], concurrency: int,
+                        max_parallelism: int) -> int:
+    """Requêtes QueryBuilder d'un fichier de Seeder/fixture.py, en un /batch et une à une par /execute.
+
+    Chaque résultat du lot doit être identique à celui de /execute (page, curseur, total) et son totalCount
+    égal à la réponse attendue. Retourne le nombre de requêtes en écart.
+    """
+    with open(path) as f:
+        queries = [query for query in json.load(f)["queries"] if "request" in query]
+    requests = [query["request"] for query in queries]
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    for target in targets:
+        async def one(request: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                async with session.post(f"{API_ENDPOINT}?targets={target}", json=request) as resp:
+                    resp.raise_for_status()
+                    return (await resp.json())[0]
+
+        individual = await asyncio.gather(*(one(request) for request in requests))
+        batched: List[Any] = [None] * len(requests)
+        async for item in iter_batch(session, requests, target, max_parallelism):
+            batched[item["index"]] = item["results"][0]
+
+        mismatches = 0
+        for query, single, batch in zip(queries, individual, batched):
+            if batch is None:
+                diffs = ["absent de la réponse /batch"]
+            else:
+                diffs = [f"{field}: /execute {single.get(field)!r}, /batch {batch.get(field)!r}"
+                         for field in COMPARED_FIELDS if single.get(field) != batch.get(field)]
+                if batch.get("totalCount") != query["expected"]["totalCount"]:
+                    diffs.append(f"totalCount attendu {query['expected']['totalCount']}, obtenu {batch.get('totalCount')}")
+            if diffs:
+                mismatches += 1
+                print(f"  ✗ {target} {query['name']}: " + " | ".join(diffs))
+        failures += mismatches
+        print(f"{target:<9} {len(queries) - mismatches}/{len(queries)} requêtes identiques à /execute et conformes")
+    return failures
+
+async def main():
+    parser = argparse.ArgumentParser(description="Batch QueryBuilder (/batch) contre N appels /execute")
+    parser.add_argument("--users", type=int, default=100, help="Requêtes par batch (une par user tiré)")
+    parser.add_argument("--entity", default="Articles", choices=["Articles", "Users", "Orders"])
+    parser.add_argument("--level", type=int, default=3)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--targets", default="Postgres,Neo4j")
+    parser.add_argument("--concurrency", type=int, default=8, help="Appels /execute en vol")
+    parser.add_argument("--max-parallelism", type=int, default=8, help="Requêtes exécutées en parallèle par /batch")
+    parser.add_argument("--circle-cache", action="store_true", help="Autorise le cache de cercles pour les appels /execute")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None, help="Fichier JSON de résultats")
+    parser.add_argument("--check", default=None, metavar="EXPECTED",
+                        help="Vérifie /batch contre /execute sur les requêtes d'un fichier de fixture.py, sans benchmark")
+    args = parser.parse_args()
+
+    if args.check:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None)) as session:
+            failures = await check_fixture(session, args.check, [t for t in args.targets.split(",") if t],
+                                           args.concurrency, args.max_parallelism)
+        sys.exit(1 if failures else 0)
+
+    print(f"Serveur: {BASE_URL} | {args.users} x {args.entity} niveau {args.level} | "
+          f"concurrency={args.concurrency} | maxParallelism={args.max_parallelism}")
+    results = []
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None)) as session:
+        users = await sample_ids(session, args.users)
+        requests = [{"entity": args.entity, "userId": user_id, "followingLevel": args.level, "pageSize": args.page_size}
+                    for user_id in users]
+
+        for target in [t for t in args.targets.split(",") if t]:
+            individual, batch = [], []
+            for _ in range(args.repeat):
+                individual.append(await run_individual(session, requests, target, args.concurrency, args.circle_cache))
+                batch.append(await run_batch(session, requests, target, args.max_parallelism))
+
+            mismatches = sum(a != b for a, b in zip(individual[-1]["totals"], batch[-1]["totals"]))
+            one_by_one = statistics.median(r["wall_s"] for r in individual)
+            batched = statistics.median(r["wall_s"] for r in batch)
+            first = statistics.median(r["first_s"] for r in batch)
+            results.append({"target": target, "requests": len(requests), "individual_s": round(one_by_one, 3),
+                            "batch_s": round(batched, 3), "batch_first_s": round(first, 3),
+                            "speedup": round(one_by_one / batched, 2) if batched else 0, "mismatches": mismatches})
+            print(f"{target:<9} individuel {one_by_one:.2f}s ({len(requests) / one_by_one:.1f} req/s) | "
+                  f"batch {batched:.2f}s (1er résultat {first * 1000:.0f}ms) | x{one_by_one / batched:.2f} | "
+                  f"totalCount différents: {mismatches}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"server": BASE_URL, "args": vars(args), "results": results}, f, indent=2)
+        print(f"\nRésultats: {args.output}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
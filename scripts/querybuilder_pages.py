@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import aiohttp
+import os
+import time
+from typing import Any, AsyncIterator, Dict
+
+BASE_URL = os.getenv("SERVER_URL", "http://localhost:3001")
+API_ENDPOINT = f"{BASE_URL}/api/querybuilder/execute"
+
+async def iter_pages(session: aiohttp.ClientSession, payload: Dict[str, Any], target: str = "Postgres",
+                     count_mode: str = "Skip") -> AsyncIterator[Dict[str, Any]]:
+    """Toutes les pages d'une requête QueryBuilder, en suivant `nextCursor` (pagination par clé).
+
+    La première page part de `payload` tel quel ; les suivantes ne renvoient que le curseur.
+    `count_mode` ne vaut que pour la première page : les suivantes ne recomptent pas (Skip).
+    """
+    body = {**payload, "countMode": count_mode}
+    body.pop("cursor", None)
+    while True:
+        async with session.post(f"{API_ENDPOINT}?targets={target}", json=body) as resp:
+            resp.raise_for_status()
+            page = (await resp.json())[0]
+        if page.get("error"):
+            raise RuntimeError(f"{target}: {page['error']}")
+        yield page
+        if not page.get("nextCursor"):
+            return
+        body = {**payload, "cursor": page["nextCursor"], "countMode": "Skip"}
+
+async def iter_offset_pages(session: aiohttp.ClientSession, payload: Dict[str, Any],
+                            target: str = "Postgres") -> AsyncIterator[Dict[str, Any]]:
+    """Même parcours en pagination par OFFSET (page=1..n), pour comparaison"""
+    page_number = 1
+    while True:
+        body = {**payload, "page": page_number, "countMode": "Skip"}
+        async with session.post(f"{API_ENDPOINT}?targets={target}", json=body) as resp:
+            resp.raise_for_status()
+            page = (await resp.json())[0]
+        if page.get("error"):
+            raise RuntimeError(f"{target}: {page['error']}")
+        yield page
+        if not page.get("hasNextPage"):
+            return
+        page_number += 1
+
+async def walk(pages: AsyncIterator[Dict[str, Any]]) -> Dict[str, Any]:
+    """Parcourt les pages : lignes, ids distincts, latence de la première et de la dernière page"""
+    rows, ids, latencies = 0, set(), []
+    start = time.perf_counter()
+    async for page in pages:
+        latencies.append(time.perf_counter() - start)
+        rows += len(page["items"])
+        ids.update(str(item.get("id", item.get("user", {}).get("id"))) for item in page["items"])
+        start = time.perf_counter()
+    return {"pages": len(latencies), "rows": rows, "distinct": len(ids),
+            "first_ms": latencies[0] * 1000 if latencies else 0.0,
+            "last_ms": latencies[-1] * 1000 if latencies else 0.0,
+            "total_s": sum(latencies)}
+
+async def main():
+    parser = argparse.ArgumentParser(description="Parcours complet d'une entité QueryBuilder : curseur vs OFFSET")
+    parser.add_argument("--entity", default="Orders", choices=["Articles", "Users", "Orders"])
+    parser.add_argument("--targets", default="Postgres,Neo4j")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--order-by", type=int, default=None, help="Valeur de OrderByField (enum de l'entité)")
+    parser.add_argument("--direction", default="Ascending", choices=["Ascending", "Descending"])
+    parser.add_argument("--offset", action="store_true", help="Parcourt aussi en OFFSET pour comparer")
+    args = parser.parse_args()
+
+    payload = {"entity": args.entity, "pageSize": args.page_size, "orderDirection": args.direction}
+    if args.order_by is not None:
+        payload["orderByField"] = args.order_by
+
+    print(f"Serveur: {BASE_URL} | {args.entity} | pageSize={args.page_size}")
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None)) as session:
+        for target in [t for t in args.targets.split(",") if t]:
+            modes = [("curseur", iter_pages(session, payload, target))]
+            if args.offset:
+                modes.append(("offset", iter_offset_pages(session, payload, target)))
+            for name, pages in modes:
+                r = await walk(pages)
+                print(f"{target:<9} {name:<8} {r['pages']:>6} pages {r['rows']:>10} lignes "
+                      f"({r['distinct']} distinctes) en {r['total_s']:.1f}s | "
+                      f"1re page {r['first_ms']:.0f}ms, dernière {r['last_ms']:.0f}ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,6 +5,10 @@ from uuid import uuid5, NAMESPACE_DNS
 URL = "http://localhost:3001/api/QueryBuilder/execute?targets=Both"
 HEADERS = {'Content-Type': 'application/json'}
 
+# Temps serveur (champ `timings` de chaque PaginatedResult), cumulés sur toute la batterie
+TIMING_FIELDS = ["buildMs", "traversalMs", "dataQueryMs", "countQueryMs", "materializationMs"]
+SERVER_TIMINGS = {"PG": [], "Neo": []}
+
 def get_id(name: str):
     return str(uuid5(NAMESPACE_DNS, name))
 
@@ -27,6 +31,12 @@ def validate_results(test_name, role, formula, payload, expected_count, expected
 
     pg_res, neo_res = results[0], results[1]
 
+    for backend, res in (("PG", pg_res), ("Neo", neo_res)):
+        timings = res.get('timings') or {}
+        SERVER_TIMINGS[backend].append(timings)
+        print(f"   Temps serveur {backend:<3}: " + " ".join(f"{f[:-2]}={timings.get(f, 0.0):.1f}ms" for f in TIMING_FIELDS)
+              + f" | rows={timings.get('rowsReturned', 0)}")
+
     counts_ok = (pg_res['totalCount'] == neo_res['totalCount'] == expected_count)
     status = "OK" if counts_ok else "NO"
     print(f"{status} Count - Attendu: {expected_count} | PG: {pg_res['totalCount']} | Neo: {neo_res['totalCount']}")
@@ -148,4 +158,12 @@ validate_results(
     },
     expected_count=1,
     expected_values={"name": "Produit Viral"}
-)
\ No newline at end of file
+)
+
+# --- SYNTHÈSE DES TEMPS SERVEUR ---
+print(f"\n{'='*60}")
+print("TEMPS SERVEUR CUMULÉS (ms)")
+print(f"{'='*60}")
+print(f"{'':<5}" + "".join(f"{f[:-2]:>16}" for f in TIMING_FIELDS))
+for backend, samples in SERVER_TIMINGS.items():
+    print(f"{backend:<5}" + "".join(f"{sum(t.get(f, 0.0) for t in samples):>16.1f}" for f in TIMING_FIELDS))
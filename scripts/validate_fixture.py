@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import aiohttp
+import json
+import os
+import sys
+import time
+from itertools import product
+from typing import Any, Dict, List
+
+BASE_URL = os.getenv("SERVER_URL", "http://localhost:3001")
+API_ENDPOINT = f"{BASE_URL}/api/querybuilder/execute"
+
+# Champs comparés pour chaque produit de /api/analytics/viral-products
+VIRAL_FIELDS = ["articleId", "name", "buyers", "buyersByLevel", "totalBuyers"]
+
+async def fetch(session: aiohttp.ClientSession, target: str, query: Dict[str, Any], mode: Dict[str, Any]) -> Dict[str, Any]:
+    """Résultat d'une requête du fichier attendu sur une base, dans un mode de résolution du cercle"""
+    if "analytics" in query:
+        request = session.get(f"{BASE_URL}/api/analytics/{query['analytics']}",
+                              params={**{k: str(v) for k, v in query["params"].items()}, "targets": target})
+    else:
+        request = session.post(f"{API_ENDPOINT}?targets={target}", json={**query["request"], **mode})
+    async with request as resp:
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status}: {(await resp.text())[:200]}")
+        result = (await resp.json())[0]
+    if result.get("error"):
+        raise RuntimeError(result["error"])
+    return result
+
+def differences(query: Dict[str, Any], result: Dict[str, Any]) -> List[str]:
+    """Écarts entre la réponse attendue et le résultat, vide si conforme"""
+    expected = query["expected"]
+    if "analytics" in query:
+        diffs = [] if result["circleSize"] == expected["circleSize"] else [
+            f"circleSize attendu {expected['circleSize']}, obtenu {result['circleSize']}"]
+        actual = [{**{field: item.get(field) for field in VIRAL_FIELDS}, "articleId": str(item["articleId"]).lower()}
+                  for item in result["items"]]
+        if actual != expected["items"]:
+            for rank in range(max(len(actual), len(expected["items"]))):
+                want = expected["items"][rank] if rank < len(expected["items"]) else None
+                got = actual[rank] if rank < len(actual) else None
+                if want != got:
+                    diffs.append(f"rang {rank + 1}: attendu {want}, obtenu {got}")
+        return diffs
+
+    diffs = [] if result["totalCount"] == expected["totalCount"] else [
+        f"totalCount attendu {expected['totalCount']}, obtenu {result['totalCount']}"]
+    if "followersCount" in expected:
+        items = result.get("items") or []
+        # Neo4j peut renvoyer l'utilisateur sous une clé `user`
+        item = (items[0].get("user") or items[0]) if items else {}
+        got = next((value for key, value in item.items() if key.lower() == "followerscount"), None)
+        if got != expected["followersCount"]:
+            diffs.append(f"followersCount attendu {expected['followersCount']}, obtenu {got}")
+    return diffs
+
+async def check(session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, target: str,
+                query: Dict[str, Any], mode: Dict[str, Any]) -> Dict[str, Any]:
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            diffs = differences(query, await fetch(session, target, query, mode))
+        except Exception as e:
+            diffs = [f"erreur: {e}"]
+        return {"query": query["name"], "target": target, "mode": mode, "ok": not diffs, "diffs": diffs,
+                "ms": round((time.perf_counter() - start) * 1000, 1)}
+
+async def main():
+    parser = argparse.ArgumentParser(description="Vérifie Postgres et Neo4j contre les réponses attendues de Seeder/fixture.py")
+    parser.add_argument("--expected", default="fixture_expected.json")
+    parser.add_argument("--targets", default="Postgres,Neo4j")
+    parser.add_argument("--traversals", default="SetBased,Legacy", help="Modes de résolution du cercle à vérifier")
+    parser.add_argument("--circle-cache", default="false,true", help="Valeurs de circleCache à vérifier")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=300, help="Timeout par requête (s)")
+    parser.add_argument("--skip-global", action="store_true",
+                        help="Ignore les comptes globaux (bases contenant d'autres données que la fixture)")
+    parser.add_argument("--output", default=None, help="Fichier JSON des résultats")
+    args = parser.parse_args()
+
+    with open(args.expected) as f:
+        expected = json.load(f)
+    queries = [q for q in expected["queries"] if not (args.skip_global and q["name"] in ("users", "orders"))]
+    targets = [t for t in args.targets.split(",") if t]
+    modes = [{"traversal": traversal, "circleCache": cache == "true"}
+             for traversal, cache in product(args.traversals.split(","), args.circle_cache.split(","))]
+
+    print(f"Fixture {expected['spec']['name']}: {expected['counts']['users']} users, {len(queries)} requêtes "
+          f"x {len(targets)} bases x {len(modes)} modes ({BASE_URL})")
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    connector = aiohttp.TCPConnector(limit=max(args.concurrency, 10))
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=args.timeout), connector=connector) as session:
+        # L'endpoint analytique n'a pas de mode de traversée : une seule vérification par base
+        tasks = [check(session, semaphore, target, query, {} if "analytics" in query else mode)
+                 for target in targets for query in queries
+                 for mode in (modes[:1] if "analytics" in query else modes)]
+        results = await asyncio.gather(*tasks)
+
+    failures = [r for r in results if not r["ok"]]
+    for r in failures:
+        mode = ", ".join(f"{k}={v}" for k, v in r["mode"].items()) or "analytics"
+        print(f"KO {r['target']:<9} {r['query']:<28} [{mode}]")
+        for diff in r["diffs"]:
+            print(f"   {diff}")
+
+    for target in targets:
+        ran = [r for r in results if r["target"] == target]
+        passed = sum(r["ok"] for r in ran)
+        print(f"{target:<9} {passed}/{len(ran)} OK, {sum(r['ms'] for r in ran) / 1000:.1f}s cumulées")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"server": BASE_URL, "args": vars(args), "results": results}, f, indent=2)
+        print(f"\nRésultats: {args.output}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    asyncio.run(main())